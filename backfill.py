@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Usage: poetry run backfill --zone DE --zone FR --data-type production --start "2023-01-01" --end "2023-02-01"
+"""
+
+from datetime import datetime, timezone
+from logging import DEBUG, basicConfig, getLogger
+from pathlib import Path
+
+import click
+
+from parsers.lib.backfill import (
+    BackfillCheckpoint,
+    deduplicate,
+    refetch_frequency_of,
+    split_windows,
+)
+from parsers.lib.parsers import PARSER_KEY_TO_DICT
+from parsers.lib.scheduling import (
+    DEFAULT_HOST_CONCURRENCY,
+    DEFAULT_MAX_IN_FLIGHT,
+    HostLimits,
+    parser_source,
+    run_async,
+)
+from parsers.lib.serializers import SERIALIZERS, get_serializer
+from parsers.lib.session import get_session
+
+logger = getLogger(__name__)
+basicConfig(level=DEBUG, format="%(asctime)s %(levelname)-8s %(name)-30s %(message)s")
+
+
+def _parse_datetime(value: str) -> datetime:
+    dt = datetime.fromisoformat(value)
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+@click.command()
+@click.option("--zone", "zones", multiple=True, required=True)
+@click.option("--data-type", "data_types", multiple=True, default=["production"])
+@click.option("--start", required=True, help="ISO 8601 string, such as 2023-01-01")
+@click.option("--end", required=True, help="ISO 8601 string, such as 2023-02-01")
+@click.option("--output", default="backfill", show_default=True)
+@click.option(
+    "--format",
+    "output_format",
+    default="jsonl",
+    show_default=True,
+    type=click.Choice(list(SERIALIZERS)),
+)
+@click.option("--max-in-flight", default=DEFAULT_MAX_IN_FLIGHT, show_default=True)
+@click.option(
+    "--host-concurrency",
+    default=None,
+    help='Per host limits such as "entsoe.eu=8,EIA=4"',
+)
+@click.option(
+    "--default-host-concurrency", default=DEFAULT_HOST_CONCURRENCY, show_default=True
+)
+def backfill(
+    zones: tuple[str, ...],
+    data_types: tuple[str, ...],
+    start: str,
+    end: str,
+    output: str,
+    output_format: str,
+    max_in_flight: int,
+    host_concurrency: str | None,
+    default_host_concurrency: int,
+):
+    """Fetches historical data for every zone and data type between start and end.
+
+    The range is split in windows of each parser's REFETCH_FREQUENCY, which are
+    fetched concurrently. Completed windows are checkpointed under
+    OUTPUT/windows so rerunning the same command resumes the backfill.
+    \n
+    Examples
+    -------
+    >>> poetry run backfill --zone DE --data-type production --start 2023-01-01 --end 2023-02-01
+    >>> poetry run backfill --zone "DE->FR" --data-type exchange --start 2023-01-01 --end 2023-01-08
+    """
+    start_dt, end_dt = _parse_datetime(start), _parse_datetime(end)
+    checkpoint = BackfillCheckpoint(str(Path(output) / "windows"))
+    serializer = get_serializer(output_format)
+    session = get_session()
+
+    matrix = {}
+    for zone in zones:
+        for data_type in data_types:
+            parsers = PARSER_KEY_TO_DICT.get(data_type)
+            if parsers is None:
+                raise click.BadParameter(
+                    f"unknown data type {data_type}", param_hint="--data-type"
+                )
+            if zone not in parsers:
+                raise click.BadParameter(
+                    f"no {data_type} parser for {zone}", param_hint="--zone"
+                )
+            parser = parsers[zone]
+            targets = split_windows(start_dt, end_dt, refetch_frequency_of(parser))
+            matrix[(zone, data_type)] = targets
+
+    windows = [
+        (zone, data_type, target)
+        for (zone, data_type), targets in matrix.items()
+        for target in targets
+        if not checkpoint.is_done(zone, data_type, target)
+    ]
+    logger.info(
+        f"{len(windows)} windows to fetch, "
+        f"{sum(len(t) for t in matrix.values()) - len(windows)} already done"
+    )
+
+    def fetch_window(window) -> bool:
+        zone, data_type, target = window
+        parser = PARSER_KEY_TO_DICT[data_type][zone]
+        args = (
+            zone.split("->")
+            if data_type in ["exchange", "exchangeForecast"]
+            else [zone]
+        )
+        try:
+            res = parser(*args, session=session, target_datetime=target, logger=logger)
+        except Exception as e:
+            logger.error(f"Failed to fetch {zone} {data_type} at {target}: {e}")
+            return False
+        checkpoint.save(zone, data_type, target, res)
+        return True
+
+    results = run_async(
+        windows,
+        fetch_window,
+        lambda window: parser_source(window[0], window[1]),
+        HostLimits.from_string(host_concurrency, default_host_concurrency),
+        max_in_flight,
+    )
+
+    for (zone, data_type), targets in matrix.items():
+        done = [t for t in targets if checkpoint.is_done(zone, data_type, t)]
+        events = deduplicate(checkpoint.load(zone, data_type, t) for t in done)
+        events = [e for e in events if start_dt <= e["datetime"] <= end_dt]
+        output_path = Path(output) / zone / data_type
+        output_path.mkdir(parents=True, exist_ok=True)
+        file_name = f"{zone}_{data_type}_{start_dt:%Y%m%d%H%M}_{end_dt:%Y%m%d%H%M}"
+        (output_path / (file_name + serializer.extension)).write_bytes(
+            serializer.serialize(data_type, events)
+        )
+        missing = len(targets) - len(done)
+        print(
+            f"{zone} {data_type}: {len(events)} datapoints"
+            + (f", {missing} windows failed" if missing else "")
+        )
+
+    if not all(results):
+        raise click.ClickException("Some windows failed, rerun to resume.")
+
+
+if __name__ == "__main__":
+    # pylint: disable=no-value-for-parameter
+    print(backfill())
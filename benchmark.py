@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Usage: poetry run benchmark --case ENTSOE --threshold 0.25 [--slow]
+"""
+
+import logging
+import sys
+
+import click
+
+from parsers.lib.benchmark import (
+    DEFAULT_MIN_SECONDS,
+    DEFAULT_REPEAT,
+    DEFAULT_THRESHOLD,
+    compare,
+    read_baseline,
+    run_case,
+    write_baseline,
+)
+from parsers.test.benchmarks import BASELINE_FILE, CASES
+
+
+@click.command()
+@click.option(
+    "--case",
+    "patterns",
+    multiple=True,
+    help="Only run the cases whose name contains this text",
+)
+@click.option("--repeat", default=DEFAULT_REPEAT, show_default=True)
+@click.option(
+    "--threshold",
+    default=DEFAULT_THRESHOLD,
+    envvar="BENCHMARK_THRESHOLD",
+    show_default=True,
+    help="Relative increase of time or peak memory over the baseline failing a case",
+)
+@click.option(
+    "--min-delta-ms",
+    default=DEFAULT_MIN_SECONDS * 1000,
+    envvar="BENCHMARK_MIN_DELTA_MS",
+    show_default=True,
+    help="Increase of time under which a case never fails, as timings are noisy",
+)
+@click.option("--slow", is_flag=True, help="Also run the slow cases")
+@click.option(
+    "--baseline",
+    default=str(BASELINE_FILE),
+    show_default=True,
+    help="Baseline of this machine, recorded by its first run",
+)
+@click.option(
+    "--update-baseline",
+    is_flag=True,
+    help="Store the results as the new baseline instead of comparing them",
+)
+def benchmark(
+    patterns, repeat, threshold, min_delta_ms, slow, baseline, update_baseline
+):
+    """Replays recorded payloads through parsers and reports their time and
+    peak memory, failing on regressions against the baseline."""
+    # Parsers log every datapoint they drop, which would be measured too.
+    logging.disable(logging.WARNING)
+    cases = [
+        case
+        for case in CASES
+        if (slow or not case.slow)
+        and (not patterns or any(pattern in case.name for pattern in patterns))
+    ]
+    expected = read_baseline(baseline)
+    results = []
+    click.echo(f"{'case':<45} {'time (ms)':>12} {'peak (KiB)':>12} {'events':>8}")
+    for case in cases:
+        result = run_case(case, repeat)
+        results.append(result)
+        line = (
+            f"{result.name:<45} {result.seconds * 1000:>12.2f} "
+            f"{result.peak_bytes / 1024:>12.1f} {result.events:>8}"
+        )
+        if result.name in expected:
+            line += f"  (x{result.seconds / expected[result.name]['seconds']:.2f})"
+        click.echo(line)
+
+    if update_baseline:
+        write_baseline(baseline, results)
+        click.echo(f"Baseline of {len(results)} cases written to {baseline}")
+        return
+
+    # The baseline is recorded locally, cases run for the first time join it.
+    new_results = [result for result in results if result.name not in expected]
+    if new_results:
+        write_baseline(baseline, new_results)
+        click.echo(f"Baseline of {len(new_results)} new cases written to {baseline}")
+
+    regressions = compare(results, expected, threshold, min_delta_ms / 1000)
+    for regression in regressions:
+        click.echo(f"Regression: {regression}", err=True)
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    # pylint: disable=no-value-for-parameter
+    benchmark()
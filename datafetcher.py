@@ -4,8 +4,13 @@ from typing import Any, Callable, Dict, List, Optional, Union
 import os
 from pathlib import Path
 import json 
+from requests import Session
+from electricitymap.contrib.lib.tracing import phase
 from electricitymap.contrib.lib.types import ZoneKey
+from parsers.lib.batching import BatchCalls, batch_parser
 from parsers.lib.parsers import PARSER_KEY_TO_DICT
+from parsers.lib.serializers import get_serializer
+from parsers.lib.session import get_session
 from parsers.lib.quality import (
     ValidationError,
     validate_consumption,
@@ -17,10 +22,13 @@ load_dotenv()
 
 outputBaseDirectory = os.environ['OUTPUT_RAW_DIRECTORY']
 
+# Format of the saved outputs: repr, jsonl or parquet (`parquet` extra)
+outputFormat = os.environ.get('OUTPUT_FORMAT', 'repr')
+
 logger = getLogger(__name__)
 basicConfig(level=ERROR, format="%(asctime)s %(levelname)-8s %(name)-30s %(message)s")
 
-def retrieveData(zone: ZoneKey, data_type: str, target_datetime: Optional[str]):
+def retrieveData(zone: ZoneKey, data_type: str, target_datetime: Optional[str], session: Session | None = None, batches: BatchCalls | None = None):
 
     print(f"Retrieving {zone} {data_type}")
 
@@ -42,9 +50,17 @@ def retrieveData(zone: ZoneKey, data_type: str, target_datetime: Optional[str]):
     else:
         args = [zone]
     
-    res = parser(
-        *args, target_datetime=parsed_target_datetime, logger=getLogger(__name__)
-    )
+    batch = batch_parser(data_type, zone) if batches is not None else None
+    if batch is not None:
+        # One call of the batch parser serves the jobs of all its zones
+        res = batches.call(
+            batch, zone, session=session or get_session(), target_datetime=parsed_target_datetime, logger=getLogger(__name__)
+        )
+    else:
+        # Parsers reuse the warm connections of the process-wide pooled session
+        res = parser(
+            *args, session=session or get_session(), target_datetime=parsed_target_datetime, logger=getLogger(__name__)
+        )
 
     if not res:
         raise ValueError(f"Error: parser returned nothing ({res})")
@@ -94,32 +110,29 @@ def retrieveData(zone: ZoneKey, data_type: str, target_datetime: Optional[str]):
     if parsed_target_datetime is not None:
         outputFileName = '' + outputFileName + '_' + parsed_target_datetime.isoformat(timespec="seconds").replace('+00:00','').replace(':','-').replace('T', ' ')
     
-    outputFileName = outputFileName + '.txt'
+    serializer = get_serializer(outputFormat)
+    outputFileName = outputFileName + serializer.extension
     outputDirectory = outputBaseDirectory + zone + "/" + data_type + "/"
     outputFileName = outputDirectory + outputFileName
 
     if isinstance(res, dict):
         res = [res]
-    for event in res:
-        try:
-            if data_type == "production":
-                validate_production(event, zone)
-            elif data_type == "consumption":
-                validate_consumption(event, zone)
-            elif data_type == "exchange":
-                validate_exchange(event, zone)
-        except ValidationError as e:
-            logger.warning(f"Validation failed @ {event['datetime']}: {e}")
+    with phase("validate"):
+        for event in res:
+            try:
+                if data_type == "production":
+                    validate_production(event, zone)
+                elif data_type == "consumption":
+                    validate_consumption(event, zone)
+                elif data_type == "exchange":
+                    validate_exchange(event, zone)
+            except ValidationError as e:
+                logger.warning(f"Validation failed @ {event['datetime']}: {e}")
 
     if os.environ['OUTPUT_RAW'] == 'true':
         Path(outputDirectory).mkdir(parents=True, exist_ok=True)
-        if isinstance(res, dict):
-            with open(r''+outputFileName, 'w') as fp:
-                for item in res:
-                    fp.write("%s\n" % item)
-        else:
-            with open(r''+outputFileName, 'w') as fp:
-                fp.write(res)
+        with phase("serialize"), open(r''+outputFileName, 'wb') as fp:
+            fp.write(serializer.serialize(data_type, res))
                 
 
     return res
@@ -2,6 +2,7 @@
 
 from copy import deepcopy
 from pathlib import Path
+from typing import Any
 
 from electricitymap.contrib.config.co2eq_parameters import generate_co2eq_parameters
 from electricitymap.contrib.config.reading import (
@@ -9,6 +10,7 @@ from electricitymap.contrib.config.reading import (
     read_exchanges_config,
     read_zones_config,
 )
+from electricitymap.contrib.config.snapshot import config_hash, load_snapshot
 from electricitymap.contrib.config.types import BoundingBox
 from electricitymap.contrib.config.zones import (
     generate_all_neighbours,
@@ -20,8 +22,52 @@ from electricitymap.contrib.lib.types import ZoneKey
 
 CONFIG_DIR = Path(__file__).parent.parent.parent.parent.joinpath("config").resolve()
 
-ZONES_CONFIG = read_zones_config(CONFIG_DIR)
-EXCHANGES_CONFIG = read_exchanges_config(CONFIG_DIR)
+
+def _resolve_config(config_dir: Path) -> dict[str, Any]:
+    """Reads the YAML config files and derives the config constants from them."""
+    zones_config = read_zones_config(config_dir)
+    exchanges_config = read_exchanges_config(config_dir)
+    defaults = read_defaults(config_dir)
+    # Moves the CO2eq parameters out of the zones config.
+    co2eq_parameters = generate_co2eq_parameters(defaults, zones_config)
+    return {
+        "zones": zones_config,
+        "exchanges": exchanges_config,
+        "defaults": defaults,
+        "co2eq_parameters": co2eq_parameters,
+        "bounding_boxes": zone_bounding_boxes(zones_config),
+        "parents": zone_parents(zones_config),
+        "neighbours": generate_zone_neighbours(zones_config, exchanges_config),
+        "all_neighbours": generate_all_neighbours(exchanges_config),
+    }
+
+
+def _load_config(config_dir: Path) -> tuple[str, dict[str, Any]]:
+    key = config_hash(config_dir)
+    return key, load_snapshot(
+        "config", config_dir, key, lambda: _resolve_config(config_dir)
+    )
+
+
+CONFIG_HASH, _config = _load_config(CONFIG_DIR)
+
+ZONES_CONFIG: dict[ZoneKey, Any] = _config["zones"]
+EXCHANGES_CONFIG: dict[str, Any] = _config["exchanges"]
+
+
+def reload_config():
+    """Reads the zones and exchanges config again, updating them in place.
+
+    Modules that imported ZONES_CONFIG or EXCHANGES_CONFIG see the new config,
+    the constants derived from them at import time are not updated.
+    """
+    global CONFIG_HASH
+    CONFIG_HASH, config = _load_config(CONFIG_DIR)
+    ZONES_CONFIG.clear()
+    ZONES_CONFIG.update(config["zones"])
+    EXCHANGES_CONFIG.clear()
+    EXCHANGES_CONFIG.update(config["exchanges"])
+
 
 EU_ZONES = [
     "AT",
@@ -89,28 +135,26 @@ EU_ZONES = [
 EU_ZONES_CONFIG = {k: v for k, v in ZONES_CONFIG.items() if k in EU_ZONES}
 
 # Prepare the CO2eq parameters config dicts.
-defaults = read_defaults(CONFIG_DIR)
+defaults = _config["defaults"]
 (
     co2eq_parameters_all,
     co2eq_parameters_direct,
     co2eq_parameters_lifecycle,
-) = generate_co2eq_parameters(defaults, ZONES_CONFIG)
+) = _config["co2eq_parameters"]
 CO2EQ_PARAMETERS_DIRECT = {**co2eq_parameters_all, **co2eq_parameters_direct}
 CO2EQ_PARAMETERS_LIFECYCLE = {**co2eq_parameters_all, **co2eq_parameters_lifecycle}
 CO2EQ_PARAMETERS = CO2EQ_PARAMETERS_LIFECYCLE  # Global LCA is the default
 
 # Make a dict mapping each zone to its bounding box.
-ZONE_BOUNDING_BOXES: dict[ZoneKey, BoundingBox] = zone_bounding_boxes(ZONES_CONFIG)
+ZONE_BOUNDING_BOXES: dict[ZoneKey, BoundingBox] = _config["bounding_boxes"]
 
 # Make a mapping from subzone to the parent zone (full zone).
-ZONE_PARENT: dict[ZoneKey, ZoneKey] = zone_parents(ZONES_CONFIG)
+ZONE_PARENT: dict[ZoneKey, ZoneKey] = _config["parents"]
 
 # Zone neighbours are zones that are connected by exchanges.
-ZONE_NEIGHBOURS: dict[ZoneKey, list[ZoneKey]] = generate_zone_neighbours(
-    ZONES_CONFIG, EXCHANGES_CONFIG
-)
+ZONE_NEIGHBOURS: dict[ZoneKey, list[ZoneKey]] = _config["neighbours"]
 
-ALL_NEIGHBOURS: dict[ZoneKey, list[ZoneKey]] = generate_all_neighbours(EXCHANGES_CONFIG)
+ALL_NEIGHBOURS: dict[ZoneKey, list[ZoneKey]] = _config["all_neighbours"]
 
 
 def emission_factors(zone_key: ZoneKey) -> dict[str, float]:
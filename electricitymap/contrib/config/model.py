@@ -12,13 +12,16 @@ from pydantic import (
 )
 from pydantic.utils import import_string
 
+from electricitymap.contrib import config
 from electricitymap.contrib.config import (
     CO2EQ_PARAMETERS_DIRECT,
     CO2EQ_PARAMETERS_LIFECYCLE,
+    CONFIG_DIR,
     EXCHANGES_CONFIG,
     ZONE_NEIGHBOURS,
     ZONES_CONFIG,
 )
+from electricitymap.contrib.config.snapshot import load_snapshot
 from electricitymap.contrib.config.types import Point
 from electricitymap.contrib.lib.types import ZoneKey
 
@@ -320,10 +323,30 @@ def _load_config_model() -> ConfigModel:
     for zone_key, zone in ZONES_CONFIG.items():
         zone["key"] = zone_key
 
-    return ConfigModel(exchanges=EXCHANGES_CONFIG, zones=ZONES_CONFIG)
+    # The validated models are snapshotted along with the config they're built from.
+    return load_snapshot(
+        "config_model",
+        CONFIG_DIR,
+        config.CONFIG_HASH,
+        lambda: ConfigModel(exchanges=EXCHANGES_CONFIG, zones=ZONES_CONFIG),
+    )
 
 
 CONFIG_MODEL = _load_config_model()
-CO2EQ_CONFIG_MODEL = CO2eqConfigModel(
-    direct=CO2EQ_PARAMETERS_DIRECT, lifecycle=CO2EQ_PARAMETERS_LIFECYCLE
+
+
+def reload_config_model():
+    """Rebuilds CONFIG_MODEL in place from the current zones and exchanges config."""
+    config_model = _load_config_model()
+    CONFIG_MODEL.exchanges = config_model.exchanges
+    CONFIG_MODEL.zones = config_model.zones
+
+
+CO2EQ_CONFIG_MODEL = load_snapshot(
+    "co2eq_config_model",
+    CONFIG_DIR,
+    config.CONFIG_HASH,
+    lambda: CO2eqConfigModel(
+        direct=CO2EQ_PARAMETERS_DIRECT, lifecycle=CO2EQ_PARAMETERS_LIFECYCLE
+    ),
 )
@@ -0,0 +1,121 @@
+"""Snapshots of the resolved config, to skip reading the YAML files on import.
+
+Reading the ~800 zone and exchange YAML files and validating them takes
+seconds, which every CLI and worker process pays on import. The resolved
+config is instead pickled into a snapshot file keyed by the paths, sizes and
+modification times of the config files and of the code resolving them, so
+that checking a snapshot only takes a `stat` per file. A snapshot is loaded
+with a single read when its key matches, otherwise the config is resolved from
+the YAML files and the snapshot written again.
+
+Snapshots are written to CONFIG_SNAPSHOT_DIR, by default a directory per
+config directory in the user cache directory (XDG_CACHE_HOME, `~/.cache`), and
+disabled when it is set to an empty string. They can be built ahead, e.g. in a
+Docker image, with `poetry run build_config_snapshot`.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+# Bump to invalidate every snapshot, e.g. when their content changes shape.
+SNAPSHOT_VERSION = 2
+
+# Code resolving the config, a change of which makes the snapshots stale.
+_SOURCE_DIR = Path(__file__).parent
+
+
+def _cache_dir() -> Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home().joinpath(".cache")
+    return Path(cache_home).joinpath("electricitymap-contrib", "config_snapshot")
+
+
+def snapshot_dir(config_dir: Path) -> Path | None:
+    directory = os.environ.get("CONFIG_SNAPSHOT_DIR")
+    if directory is None:
+        # Checkouts of the repository don't overwrite each other's snapshots.
+        digest = hashlib.blake2b(str(config_dir).encode(), digest_size=8)
+        return _cache_dir().joinpath(digest.hexdigest())
+    return Path(directory) if directory else None
+
+
+def _config_files(config_dir: Path) -> Iterable[Path]:
+    yield config_dir.joinpath("defaults.yaml")
+    yield from sorted(config_dir.joinpath("zones").glob("*.yaml"))
+    yield from sorted(config_dir.joinpath("exchanges").glob("*.yaml"))
+    yield from sorted(_SOURCE_DIR.glob("*.py"))
+
+
+def config_hash(config_dir: Path) -> str:
+    """Hash of the paths, sizes and modification times of the config files and
+    of the code resolving them."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(SNAPSHOT_VERSION).encode())
+    for path in _config_files(config_dir):
+        stat = path.stat()
+        digest.update(
+            f"{path.parent.name}/{path.name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode()
+        )
+    return digest.hexdigest()
+
+
+def read_snapshot(path: Path, key: str) -> Any | None:
+    """Returns the content of the snapshot at `path` if it was built for `key`."""
+    try:
+        with open(path, "rb") as f:
+            snapshot_key, content = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        logger.warning(f"Ignoring unreadable config snapshot {path}", exc_info=True)
+        return None
+    return content if snapshot_key == key else None
+
+
+def write_snapshot(path: Path, key: str, content: Any):
+    # Written aside and moved in place as processes may read it concurrently.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump((key, content), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(name: str, config_dir: Path, key: str, build: Callable[[], T]) -> T:
+    """Returns the snapshot `name` built for `key`, or builds and writes it.
+
+    A snapshot that can't be written (e.g. read-only file system) is only
+    logged, the config is then resolved from the YAML files on every import.
+    """
+    directory = snapshot_dir(config_dir)
+    if directory is None:
+        return build()
+    path = directory.joinpath(f"{name}.pickle")
+    content = read_snapshot(path, key)
+    if content is None:
+        content = build()
+        try:
+            write_snapshot(path, key, content)
+        except OSError as e:
+            logger.warning(f"Could not write the config snapshot {path}: {e}")
+    return content
+
+
+def main():
+    """Builds the config snapshots, if not up to date."""
+    # Importing the config writes the snapshots when stale.
+    from electricitymap.contrib.config import CONFIG_DIR
+    from electricitymap.contrib.config.model import CONFIG_MODEL
+
+    print(
+        f"Config snapshot of {len(CONFIG_MODEL.zones)} zones and "
+        f"{len(CONFIG_MODEL.exchanges)} exchanges written to {snapshot_dir(CONFIG_DIR)}"
+    )
@@ -17,6 +17,7 @@ from electricitymap.contrib.lib.models.events import (
     TotalConsumption,
     TotalProduction,
 )
+from electricitymap.contrib.lib.tracing import timed
 from electricitymap.contrib.lib.types import ZoneKey
 
 
@@ -137,6 +138,7 @@ class AggregatableEventList(EventList, ABC):
 class ExchangeList(AggregatableEventList):
     events: list[Exchange]
 
+    @timed("model")
     def append(
         self,
         zoneKey: ZoneKey,
@@ -152,6 +154,7 @@ class ExchangeList(AggregatableEventList):
             self.events.append(event)
 
     @staticmethod
+    @timed("merge")
     def merge_exchanges(
         ungrouped_exchanges: list["ExchangeList"], logger: Logger
     ) -> "ExchangeList":
@@ -188,6 +191,7 @@ class ExchangeList(AggregatableEventList):
 class ProductionBreakdownList(AggregatableEventList):
     events: list[ProductionBreakdown]
 
+    @timed("model")
     def append(
         self,
         zoneKey: ZoneKey,
@@ -204,6 +208,7 @@ class ProductionBreakdownList(AggregatableEventList):
             self.events.append(event)
 
     @staticmethod
+    @timed("merge")
     def merge_production_breakdowns(
         ungrouped_production_breakdowns: list["ProductionBreakdownList"],
         logger: Logger,
@@ -250,6 +255,7 @@ class ProductionBreakdownList(AggregatableEventList):
 class TotalProductionList(EventList):
     events: list[TotalProduction]
 
+    @timed("model")
     def append(
         self,
         zoneKey: ZoneKey,
@@ -268,6 +274,7 @@ class TotalProductionList(EventList):
 class TotalConsumptionList(EventList):
     events: list[TotalConsumption]
 
+    @timed("model")
     def append(
         self,
         zoneKey: ZoneKey,
@@ -286,6 +293,7 @@ class TotalConsumptionList(EventList):
 class PriceList(EventList):
     events: list[Price]
 
+    @timed("model")
     def append(
         self,
         zoneKey: ZoneKey,
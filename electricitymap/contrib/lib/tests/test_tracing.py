@@ -0,0 +1,109 @@
+import pickle
+import unittest
+from unittest.mock import patch
+
+from requests_mock import ANY, GET, Adapter
+
+from electricitymap.contrib.lib.tracing import (
+    call_traced,
+    current_trace,
+    phase,
+    timed,
+    traced,
+)
+from parsers.lib.session import PooledSession
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = patch("electricitymap.contrib.lib.tracing.perf_counter", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_no_trace(self):
+        self.assertIsNone(current_trace())
+        with phase("parse"):
+            pass
+        self.assertEqual(timed("parse")(lambda x: x + 1)(1), 2)
+
+    def test_nested_phases_are_exclusive(self):
+        with traced("DE production", "ENTSOE") as trace:
+            self.clock.now += 1
+            with phase("parse"):
+                self.clock.now += 2
+                with phase("model"):
+                    self.clock.now += 3
+                self.clock.now += 4
+        self.assertEqual(trace.total, 10)
+        self.assertEqual(trace.phases, {"parse": 6, "model": 3, "other": 1})
+
+    def test_timed(self):
+        @timed("validate")
+        def validate():
+            self.clock.now += 2
+
+        with traced() as trace:
+            validate()
+            validate()
+        self.assertEqual(trace.phases["validate"], 4)
+        self.assertEqual(trace.phases["other"], 0)
+
+    def test_record(self):
+        with traced() as trace:
+            self.clock.now += 1
+        trace.record("serialize", 2)
+        self.assertEqual(trace.total, 3)
+        self.assertEqual(trace.phases, {"other": 1, "serialize": 2})
+
+    def test_call_traced(self):
+        result, trace = call_traced("DE price", "ENTSOE", lambda x: x * 2, 21)
+        self.assertEqual(result, 42)
+        self.assertEqual(trace.key, "DE price")
+        self.assertIsNone(current_trace())
+
+    def test_failed_call_keeps_its_trace(self):
+        def fail():
+            with phase("parse"):
+                self.clock.now += 1
+                raise ValueError("no data")
+
+        with self.assertRaises(ValueError) as context:
+            call_traced("DE price", "ENTSOE", fail)
+        self.assertEqual(context.exception.trace.phases["parse"], 1)
+        # Traces are sent back from worker processes along with the exception.
+        restored = pickle.loads(pickle.dumps(context.exception))
+        self.assertEqual(restored.trace.phases["parse"], 1)
+
+
+class TestHttpTracing(unittest.TestCase):
+    def test_requests_are_traced(self):
+        session = PooledSession()
+        adapter = Adapter()
+        adapter.register_uri(GET, ANY, content=b"12345")
+        session.mount("https://", adapter)
+        with traced() as trace:
+            session.get("https://example.com/data")
+        self.assertIn("network", trace.phases)
+        self.assertEqual(len(trace.requests), 1)
+        request = trace.requests[0]
+        self.assertEqual(request["method"], "GET")
+        self.assertEqual(request["host"], "example.com")
+        self.assertEqual(request["status"], 200)
+        self.assertEqual(request["bytes"], 5)
+        self.assertGreaterEqual(request["total"], 0)
+
+    def test_untraced_requests(self):
+        session = PooledSession()
+        adapter = Adapter()
+        adapter.register_uri(GET, ANY, text="ok")
+        session.mount("https://", adapter)
+        self.assertEqual(session.get("https://example.com/").text, "ok")
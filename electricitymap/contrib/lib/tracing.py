@@ -0,0 +1,169 @@
+"""Opt-in timing of the phases of a parser run.
+
+A `JobTrace` is started for a parser run with `traced`, after which the code
+it runs can mark its phases (e.g. `parse`, `model`, `validate`) with `phase` or
+`timed`. Phases nest and their times are exclusive: the time spent in a nested
+phase is not counted in the enclosing one. Time spent outside of any phase is
+reported as `other`. HTTP requests are timed as the `network` phase, with the
+connection stages recorded through `record_request_stage`.
+
+When no trace is active, marking a phase costs a single context variable lookup.
+"""
+
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+from typing import Any, TypeVar
+from urllib.parse import urlsplit
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+NETWORK_PHASE = "network"
+OTHER_PHASE = "other"
+
+
+class JobTrace:
+    """Time spent by a single parser run in each phase and HTTP request."""
+
+    def __init__(self, key: str = "", module: str = ""):
+        self.key = key
+        self.module = module
+        self.phases: dict[str, float] = {}
+        self.requests: list[dict[str, Any]] = []
+        self.total = 0.0
+        self._stack: list[list] = []
+        self._started = perf_counter()
+
+    def enter(self, name: str):
+        now = perf_counter()
+        if self._stack:
+            parent = self._stack[-1]
+            self.phases[parent[0]] = self.phases.get(parent[0], 0) + now - parent[1]
+        self._stack.append([name, now])
+
+    def exit(self):
+        now = perf_counter()
+        name, started = self._stack.pop()
+        self.phases[name] = self.phases.get(name, 0) + now - started
+        if self._stack:
+            self._stack[-1][1] = now
+
+    def finish(self):
+        self.total = perf_counter() - self._started
+        in_phases = sum(t for name, t in self.phases.items() if name != OTHER_PHASE)
+        self.phases[OTHER_PHASE] = max(self.total - in_phases, 0)
+
+    def record(self, name: str, seconds: float):
+        """Adds a phase timed outside of the trace, e.g. once the run is over."""
+        self.phases[name] = self.phases.get(name, 0) + seconds
+        self.total += seconds
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "key": self.key,
+            "module": self.module,
+            "total": self.total,
+            "phases": self.phases,
+            "requests": self.requests,
+        }
+
+
+_trace: ContextVar[JobTrace | None] = ContextVar("trace", default=None)
+_request: ContextVar[dict[str, Any] | None] = ContextVar("request", default=None)
+
+
+def current_trace() -> JobTrace | None:
+    return _trace.get()
+
+
+@contextmanager
+def traced(key: str = "", module: str = "") -> Iterator[JobTrace]:
+    """Traces the phases of the code run in the block."""
+    trace = JobTrace(key, module)
+    token = _trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _trace.reset(token)
+        trace.finish()
+
+
+def call_traced(key: str, module: str, function: Callable, *args, **kwargs):
+    """Calls `function` in a new trace and returns its result and the trace.
+
+    The trace of a failed call is attached to the exception as `trace`, so that
+    it can be sent back from a worker process too.
+    """
+    with traced(key, module) as trace:
+        try:
+            result = function(*args, **kwargs)
+        except Exception as e:
+            e.trace = trace
+            raise
+    return result, trace
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    trace = _trace.get()
+    if trace is None:
+        yield
+        return
+    trace.enter(name)
+    try:
+        yield
+    finally:
+        trace.exit()
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Decorator marking every call of the function as a `name` phase."""
+
+    def wrap(function: F) -> F:
+        @wraps(function)
+        def wrapped(*args, **kwargs):
+            trace = _trace.get()
+            if trace is None:
+                return function(*args, **kwargs)
+            trace.enter(name)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                trace.exit()
+
+        return wrapped  # type: ignore[return-value]
+
+    return wrap
+
+
+@contextmanager
+def http_request(method: str, url: str) -> Iterator[dict[str, Any] | None]:
+    """Times an HTTP request as a `network` phase.
+
+    Yields the dict recording the request, for the caller to add the status
+    and size of the response, or None when no trace is active.
+    """
+    trace = _trace.get()
+    if trace is None:
+        yield None
+        return
+    request = {"method": method.upper(), "host": urlsplit(url).hostname or ""}
+    token = _request.set(request)
+    trace.enter(NETWORK_PHASE)
+    started = perf_counter()
+    try:
+        yield request
+    finally:
+        request["total"] = perf_counter() - started
+        trace.exit()
+        _request.reset(token)
+        trace.requests.append(request)
+
+
+def record_request_stage(stage: str, seconds: float):
+    """Adds the time spent in a stage (e.g. `connect`) to the current request."""
+    request = _request.get()
+    if request is not None:
+        request[stage] = request.get(stage, 0) + seconds
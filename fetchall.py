@@ -1,27 +1,145 @@
 from logging import DEBUG, basicConfig
 from datafetcher import retrieveData
-from datetime import datetime, timezone
+from parsers.lib.parsers import PARSER_KEY_TO_DICT
+from electricitymap.contrib.config import CONFIG_DIR
+from datetime import datetime, timedelta, timezone
 import json
-import pytesseract
-from zipfile import ZipFile, ZIP_DEFLATED
 import warnings
-from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from threading import Lock
 import os
+import sys
+import time
+from threading import Lock
+from parsers.lib.archive import ArchiveWriter, check_codec
+from parsers.lib.batching import BatchCalls, batch_parser
+from parsers.lib.cache import CachedSession
+from parsers.lib.cassette import RECORD, REPLAY, Cassette, ReplayLatency, install_cassette
+from parsers.lib.daemon import FileWatcher, JobScheduler, Schedule, reload_configuration
+from parsers.lib.freshness import FreshnessState
+from parsers.lib.history import JobHistory
+from parsers.lib.instrumentation import RunInstrumentation
+from parsers.lib.serializers import get_serializer
+from parsers.lib.simulator import install_simulator
+from parsers.lib.memory import MB, call_with_memory, check_profile
+from parsers.lib.scheduling import DEFAULT_CPU_BOUND_PARSERS, DEFAULT_HOST_CONCURRENCY, DEFAULT_JOB_TIMEOUT, DEFAULT_MAX_IN_FLIGHT, DEFAULT_MAX_JOBS_PER_WORKER, DEFAULT_MEMORY_HEAVY_PARSERS, HostLimits, JobTimeouts, RecyclingProcessPool, WorkloadClassifier, call_with_cpu_time, create_process_pool, job_key, longest_first, parser_function_name, parser_source, run_async, run_threads
+from parsers.lib.session import DEFAULT_POOL_MAXSIZE, DEFAULT_REQUEST_TIMEOUT, PooledSession, get_session
+from electricitymap.contrib.lib.tracing import call_traced
 from dotenv import load_dotenv
 load_dotenv()
 
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
-pytesseract.pytesseract.tesseract_cmd = os.environ['TESSERACT_EXE']
 
 fetchersFile = os.environ['FETCHERS_FILE']
 zipFileDirectory= os.environ['OUTPUT_ZIP_DIRECTORY']
 resultsFileDirectory= os.environ['OUTPUT_RESULTS_DIRECTORY']
 
+# 'threads' runs jobs on a fixed thread pool, 'asyncio' keeps up to MAX_IN_FLIGHT jobs
+# running at once with at most HOST_CONCURRENCY (e.g. "entsoe.eu=8,EIA=4") per upstream host
+fetchMode = os.environ.get('FETCH_MODE', 'threads')
+maxInFlight = int(os.environ.get('MAX_IN_FLIGHT', DEFAULT_MAX_IN_FLIGHT))
+hostLimits = HostLimits.from_string(os.environ.get('HOST_CONCURRENCY'), int(os.environ.get('DEFAULT_HOST_CONCURRENCY', DEFAULT_HOST_CONCURRENCY)))
+
+# Jobs running for longer than JOB_TIMEOUT seconds (or HOST_TIMEOUTS, e.g. "RU=60,IEMOP=120", for
+# their upstream host) are abandoned, and so is every job still queued or running once the run has
+# lasted RUN_BUDGET seconds. 0 disables the deadline. Requests time out after REQUEST_TIMEOUT seconds.
+jobTimeouts = JobTimeouts.from_string(os.environ.get('HOST_TIMEOUTS'), float(os.environ.get('JOB_TIMEOUT', DEFAULT_JOB_TIMEOUT)))
+runBudget = float(os.environ.get('RUN_BUDGET', 0)) or None
+requestTimeout = float(os.environ.get('REQUEST_TIMEOUT', DEFAULT_REQUEST_TIMEOUT)) or None
+
+# Keep-alive connections kept per upstream host, shared by every job of the run
+poolMaxSize = int(os.environ.get('POOL_MAXSIZE', DEFAULT_POOL_MAXSIZE))
+
+# Identical upstream documents are only downloaded once per run, 0 disables the cache
+responseCacheTtl = int(os.environ.get('RESPONSE_CACHE_TTL', 300))
+
+# Compression of the archive entries: deflate, zstd (`archive` extra) or none
+archiveCodec = os.environ.get('ARCHIVE_CODEC', 'deflate')
+try:
+    check_codec(archiveCodec)
+except (ImportError, ValueError) as e:
+    sys.exit(f"ARCHIVE_CODEC={archiveCodec}: {e}")
+
+# Format of the archive entries: repr, jsonl or parquet (`parquet` extra)
+outputFormat = os.environ.get('OUTPUT_FORMAT', 'repr')
+
+# CPU-bound jobs (CPU_BOUND_PARSERS modules, or jobs whose history shows they mostly use the CPU)
+# run on PROCESS_WORKERS warm worker processes, 0 keeps every job on threads
+processWorkers = int(os.environ.get('PROCESS_WORKERS', 0))
+cpuBoundParsers = os.environ.get('CPU_BOUND_PARSERS', ','.join(DEFAULT_CPU_BOUND_PARSERS)).split(',')
+
+# 'rss' or 'tracemalloc' records the memory peak of every job in the results file and in the job
+# history ('tracemalloc' also catches short peaks but slows parsers down), '' turns profiling off
+memoryProfile = os.environ.get('MEMORY_PROFILE', '')
+if memoryProfile:
+    try:
+        check_profile(memoryProfile)
+    except ValueError as e:
+        sys.exit(f"MEMORY_PROFILE={memoryProfile}: {e}")
+
+# Jobs of MEMORY_HEAVY_PARSERS modules, and jobs whose profiled memory peak exceeds JOB_MEMORY_CEILING MB,
+# run on MEMORY_WORKERS isolated worker processes replaced every MEMORY_WORKER_MAX_JOBS jobs, 0 disables
+jobMemoryCeiling = float(os.environ.get('JOB_MEMORY_CEILING', 0))
+memoryHeavyParsers = os.environ.get('MEMORY_HEAVY_PARSERS', ','.join(DEFAULT_MEMORY_HEAVY_PARSERS)).split(',')
+memoryWorkers = int(os.environ.get('MEMORY_WORKERS', 1))
+memoryWorkerMaxJobs = int(os.environ.get('MEMORY_WORKER_MAX_JOBS', DEFAULT_MAX_JOBS_PER_WORKER))
+
+# Rolling wall clock time, CPU time and memory peak of every job, kept between runs
+jobHistoryFile = os.environ.get('JOB_HISTORY_FILE', resultsFileDirectory + 'JobHistory.json')
+
+# 'longest-first' starts the jobs that took the longest in previous runs first so that slow
+# parsers don't run alone at the end of the run, 'file' keeps the FETCHERS_FILE order
+jobOrder = os.environ.get('JOB_ORDER', 'longest-first')
+
+# Skip jobs that can't have new data yet given their last datapoint, publication delay and refetch window
+freshnessScheduling = os.environ.get('FRESHNESS_SCHEDULING', 'false') == 'true'
+freshnessStateFile = os.environ.get('FRESHNESS_STATE_FILE', resultsFileDirectory + 'FreshnessState.json')
+
+# `python fetchall.py --daemon` keeps running and fetches every job of FETCHERS_FILE on the cadence
+# of its data type, overridden by FETCH_SCHEDULE in seconds (e.g. "price=3600,production=300").
+# The config and FETCHERS_FILE are reloaded when they change.
+fetchSchedule = os.environ.get('FETCH_SCHEDULE')
+daemonPollInterval = float(os.environ.get('DAEMON_POLL_INTERVAL', 5))
+
+# Time the parse/model/validate/serialize/network phases and the HTTP connection stages of every
+# job, written to Instrumentation_<start>.json and as a Prometheus textfile (node exporter collector)
+instrumentation = os.environ.get('INSTRUMENTATION', 'false') == 'true'
+instrumentationTextfile = os.environ.get('INSTRUMENTATION_TEXTFILE', resultsFileDirectory + 'parsers.prom')
+
+# 'record' stores every HTTP response of the run in CASSETTE_DIR, 'replay' serves them back instead
+# of reaching the upstreams, delayed by CASSETTE_LATENCY seconds ("0.2:0.1" for 0.2s +/- 0.1s, or
+# "recorded") and per host by CASSETTE_HOST_LATENCY (e.g. "api.eia.gov=0.5:0.2")
+cassetteMode = os.environ.get('CASSETTE_MODE', '')
+cassetteDir = os.environ.get('CASSETTE_DIR', resultsFileDirectory + 'cassette')
+cassetteLatency = ReplayLatency.from_string(os.environ.get('CASSETTE_HOST_LATENCY'), os.environ.get('CASSETTE_LATENCY'))
+cassette = Cassette(cassetteDir) if cassetteMode in (RECORD, REPLAY) else None
+if cassetteMode == REPLAY:
+    # Parsers build their queries from the current time, the whole process replays the run at the
+    # time it was recorded
+    cassette.replay_clock().__enter__()
+
+# Send the requests to the ENTSOE, EIA, ELEXON and IESO hosts to a local upstream simulator
+# (`poetry run simulate`) instead, e.g. "http://127.0.0.1:8090", to load test a run
+upstreamSimulatorUrl = os.environ.get('UPSTREAM_SIMULATOR_URL')
+
+# Jobs of parsers with a `fetch_<data>_for_all_zones` entry point (ONS, RU, OPENNEM) share a single
+# upstream fetch per run instead of fetching it once per zone
+sourceBatching = os.environ.get('SOURCE_BATCHING', 'true') == 'true'
+
 basicConfig(level=DEBUG, format="%(asctime)s %(levelname)-8s %(name)-30s %(message)s")
 
+def prepareSession(session):
+    if cassette is not None:
+        install_cassette(session, cassette, cassetteMode, cassetteLatency)
+    if upstreamSimulatorUrl:
+        from parsers.test.simulator import SIMULATED_HOSTS
+        install_simulator(session, upstreamSimulatorUrl, SIMULATED_HOSTS)
+    return session
+
+# Parsers running in worker processes use the shared sessions
+prepareSession(get_session())
+prepareSession(get_session(legacy=True))
+
 class Job:
   def __init__(self, command):
     self.command = command
@@ -29,10 +147,75 @@ class Job:
     self.success = None
     self.started = None
     self.ended = None
+    self.timedOut = False
+    self.memoryPeak = None
+    # Held while the job settles its outcome, which the watchdog may abandon concurrently
+    self.lock = Lock()
+
+class FetchServices:
+  # Session, process pool and state shared by the runs of a process
+  def __init__(self):
+    if responseCacheTtl > 0:
+        self.session = CachedSession(ttl=timedelta(seconds=responseCacheTtl), timeout=requestTimeout, pool_maxsize=poolMaxSize)
+    else:
+        self.session = PooledSession(requestTimeout, poolMaxSize)
+    prepareSession(self.session)
+
+    self.history = JobHistory(jobHistoryFile)
+    self.classifier = None
+    self.processPool = None
+    self.memoryPool = None
+    if processWorkers > 0 or jobMemoryCeiling > 0:
+        self.classifier = WorkloadClassifier(cpuBoundParsers, self.history, memory_heavy_parsers=memoryHeavyParsers, memory_ceiling=jobMemoryCeiling * MB)
+    if processWorkers > 0:
+        self.processPool = create_process_pool(processWorkers, preload=["datafetcher", "fetchall"])
+    if jobMemoryCeiling > 0 and memoryWorkers > 0:
+        self.memoryPool = RecyclingProcessPool(memoryWorkers, memoryWorkerMaxJobs, preload=["datafetcher", "fetchall"])
+
+    self.freshness = None
+    if freshnessScheduling:
+        self.freshness = FreshnessState(freshnessStateFile)
+
+  def save(self):
+    self.history.save()
+    if self.freshness is not None:
+        self.freshness.save()
+
+  def reloadProcessPool(self):
+    # Worker processes loaded the config when they started
+    if self.processPool is not None:
+        self.processPool.shutdown(wait=False, cancel_futures=True)
+        self.processPool = create_process_pool(processWorkers, preload=["datafetcher", "fetchall"])
+    if self.memoryPool is not None:
+        self.memoryPool.shutdown(wait=False, cancel_futures=True)
+        self.memoryPool = RecyclingProcessPool(memoryWorkers, memoryWorkerMaxJobs, preload=["datafetcher", "fetchall"])
+
+  def close(self, wait=True):
+    if self.processPool is not None:
+        self.processPool.shutdown(wait=wait, cancel_futures=True)
+    if self.memoryPool is not None:
+        self.memoryPool.shutdown(wait=wait, cancel_futures=True)
+    self.session.close()
+
+class FetchRun:
+  def __init__(self, startTime, archive, serializer, services):
+    self.startTime = startTime
+    # Jobs are scheduled at the start of the run, they may wait for a worker
+    self.scheduledAt = datetime.fromisoformat(startTime)
+    self.archive = archive
+    self.serializer = serializer
+    self.session = services.session
+    self.history = services.history
+    self.classifier = services.classifier
+    self.processPool = services.processPool
+    self.memoryPool = services.memoryPool
+    self.freshness = services.freshness
+    self.instrumentation = RunInstrumentation() if instrumentation else None
+    self.batches = BatchCalls() if sourceBatching else None
     
 
-def fetchAllData():
-   
+def readJobs():
+
     f = open(fetchersFile, "r", encoding="utf8")
     jobs = []
 
@@ -40,10 +223,51 @@ def fetchAllData():
         if line is not None and len(line) > 10:
             jobs.append(Job(line))
 
-    batchProcess(jobs, 8)
+    f.close()
+    return jobs
+
+def fetchAllData():
+   
+    batchProcess(readJobs(), 8)
     return ""
 
-def runFetcher(zipFileLocation, job, startTime, lock):
+def runDaemon(numThreads=8):
+
+    services = FetchServices()
+    scheduler = JobScheduler(Schedule.from_string(fetchSchedule))
+    watcher = FileWatcher([CONFIG_DIR, fetchersFile])
+
+    def loadJobs():
+        commands = {}
+        for job in readJobs():
+            args = job.command.split(" ")
+            commands[(args[1].strip(), args[2].strip())] = job.command
+        scheduler.update(commands, time.monotonic())
+        return commands
+
+    commands = loadJobs()
+    try:
+        while True:
+            if watcher.changed():
+                print("Configuration changed, reloading")
+                reload_configuration()
+                services.reloadProcessPool()
+                commands = loadJobs()
+
+            due = scheduler.due(time.monotonic())
+            if due:
+                batchProcess([Job(commands[key]) for key in due], numThreads, services)
+                if isinstance(services.session, CachedSession):
+                    # Only share documents within a batch, and don't keep expired ones around
+                    services.session.clear()
+            else:
+                nextRun = scheduler.next_run()
+                wait = daemonPollInterval if nextRun is None else nextRun - time.monotonic()
+                time.sleep(max(min(wait, daemonPollInterval), 0))
+    finally:
+        services.close(wait=False)
+
+def runFetcher(run, job):
 
     job.ran = 'true'
     job.started = datetime.now(timezone.utc)
@@ -53,53 +277,190 @@ def runFetcher(zipFileLocation, job, startTime, lock):
     dataType = args[2].strip()
     targetDateTime = None
 
+    trace = None
     try:
-        res = retrieveData(zone, dataType, targetDateTime)
-        outputFileName = '' + zone + '_' + dataType + '_' + startTime.replace('+00:00','').replace(':','-') 
+        call = [call_with_cpu_time, retrieveData, zone, dataType, targetDateTime]
+        if memoryProfile:
+            call = [call_with_memory, memoryProfile] + call
+        if run.instrumentation is not None:
+            call = [call_traced, job_key(zone, dataType), jobModule(zone, dataType)] + call
+
+        # Batched jobs stay in this process, where they share the calls of their batch
+        batched = run.batches is not None and batch_parser(dataType, zone) is not None
+        pool = None
+        if run.memoryPool is not None and run.classifier.is_memory_heavy(zone, dataType) and not batched:
+            pool = run.memoryPool
+        elif run.processPool is not None and run.classifier.is_cpu_bound(zone, dataType) and not batched:
+            pool = run.processPool
+
+        if pool is not None:
+            # Sessions can't be shared with other processes, the parser opens its own
+            res = pool.submit(*call).result()
+        else:
+            res = call[0](*call[1:], run.session, run.batches)
+        if run.instrumentation is not None:
+            res, trace = res
+        if memoryProfile:
+            res, job.memoryPeak = res
+        res, cpuTime = res
+
+        with job.lock:
+            if job.timedOut:
+                # Abandoned by the watchdog, its late result is discarded
+                return job
+            # Completed, the watchdog leaves it alone from now on. Serializing and
+            # queueing the entry happen outside the lock, they can block on a full archive
+            job.success = 'true'
+
+        if run.history is not None:
+            run.history.record(job_key(zone, dataType), (datetime.now(timezone.utc) - job.started).total_seconds(), cpuTime, job.memoryPeak)
+
+        if run.freshness is not None:
+            run.freshness.record(zone, dataType, job.started, res, run.scheduledAt)
+
+        outputFileName = '' + zone + '_' + dataType + '_' + run.startTime.replace('+00:00','').replace(':','-') 
         
         if targetDateTime is not None:
             outputFileName = '' + outputFileName + '_' + targetDateTime.isoformat(timespec="seconds").replace('+00:00','').replace(':','-').replace('T', ' ')
         
-        linesToSave = str(res)
-        with lock:
-            with ZipFile(zipFileLocation, 'a', compression=ZIP_DEFLATED) as myzip:
-                myzip.writestr(outputFileName + ".txt", linesToSave)
+        serializeStarted = time.perf_counter()
+        run.archive.write(outputFileName + run.serializer.extension, run.serializer.serialize(dataType, res))
+        if trace is not None:
+            trace.record('serialize', time.perf_counter() - serializeStarted)
 
-        job.success = 'true'
+        job.ended = datetime.now(timezone.utc)
 
     except Exception as e:
         print(f"No data retrieved for {zone} {dataType}") 
         print(e)
-        job.success = 'false'
+        with job.lock:
+            if job.timedOut:
+                return job
+            job.success = 'false'
+            job.ended = datetime.now(timezone.utc)
+        trace = trace or getattr(e, 'trace', None)
+        job.memoryPeak = getattr(e, 'memory_peak', None)
     
-    job.ended = datetime.now(timezone.utc)
+    if trace is not None:
+        run.instrumentation.add(trace)
 
     return job   
 
+def abandonJob(run, job):
+
+    with job.lock:
+        if job.success is not None:
+            # Completed while the watchdog was abandoning it
+            return job
+        job.timedOut = True
+        job.success = 'timeout'
+        # Partial timing: the job ran from job.started until it was abandoned
+        job.ended = datetime.now(timezone.utc)
+    print(f"Timed out: {job.command.strip()}")
+    if job.ran is None:
+        # Never started before the run budget ran out
+        job.ran = 'false'
+    elif run.history is not None:
+        # The job took at least this long, so that it starts early next time
+        run.history.record(commandKey(job), (job.ended - job.started).total_seconds())
+    return job
+
+def commandKey(job):
+
+    return job_key(*commandZoneAndType(job))
+
+def commandZoneAndType(job):
+    args = job.command.split(" ")
+    return args[1].strip(), args[2].strip()
+
+def jobModule(zone, dataType):
+    try:
+        return parser_function_name(zone, dataType).split(".")[0]
+    except KeyError:
+        return zone
+
+def jobTimeout(job):
+
+    return jobTimeouts.timeout(jobHost(job))
+
+def isJobDue(freshness, job):
+
+    args = job.command.split(" ")
+    zone = args[1].strip()
+    dataType = args[2].strip()
+
+    parser = PARSER_KEY_TO_DICT.get(dataType, {}).get(zone)
+    return parser is None or freshness.should_run(zone, dataType, parser)
+
+def jobHost(job):
+
+    args = job.command.split(" ")
+    zone = args[1].strip()
+    dataType = args[2].strip()
+
+    try:
+        return parser_source(zone, dataType)
+    except KeyError:
+        # Unknown parser, runFetcher will report the failure
+        return zone
+
 
-def batchProcess(jobs, numThreads=8):   
+def batchProcess(jobs, numThreads=8, services=None):   
 
     startTime = datetime.now(timezone.utc).isoformat(timespec="seconds")
     zipFileLocation = zipFileDirectory + "ElectricData_" + startTime.replace('+00:00','').replace(':','-') + ".zip" 
 
-    with ZipFile(zipFileLocation, 'a', compression=ZIP_DEFLATED) as myzip:
-        myzip.writestr("StartDate.txt", datetime.now(timezone.utc).isoformat(timespec="seconds"))
-    
-    lock = Lock()
-    results=[]
-    with ThreadPoolExecutor(max_workers=numThreads) as executor:
-        futures=[]
+    archive = ArchiveWriter(zipFileLocation, codec=archiveCodec)
+    archive.start()
+    archive.write("StartDate.txt", datetime.now(timezone.utc).isoformat(timespec="seconds"))
+
+    # The daemon keeps its services between runs, a single run owns them
+    ownServices = services is None
+    if ownServices:
+        services = FetchServices()
+    run = FetchRun(startTime, archive, get_serializer(outputFormat), services)
+
+    skipped=[]
+    if run.freshness is not None:
+        dueJobs = []
         for job in jobs:
-            future = executor.submit(runFetcher, zipFileLocation, job, startTime, lock)
-            futures.append(future)
-        for f in futures:
-            results.append(f.result())
+            if isJobDue(run.freshness, job):
+                dueJobs.append(job)
+            else:
+                job.ran = 'false'
+                job.success = 'skipped'
+                skipped.append(job)
+        jobs = dueJobs
+
+    if run.batches is not None:
+        # Batch parsers querying each zone separately only fetch the zones of this run
+        run.batches = BatchCalls([commandZoneAndType(job) for job in jobs])
+
+    if jobOrder == 'longest-first':
+        jobs = longest_first(jobs, commandKey, run.history)
+
+    results=[]
+    if fetchMode == 'asyncio':
+        results = run_async(jobs, lambda job: runFetcher(run, job), jobHost, hostLimits, maxInFlight, jobTimeout, lambda job: abandonJob(run, job), runBudget)
+    else:
+        results = run_threads(jobs, lambda job: runFetcher(run, job), numThreads, jobTimeout, lambda job: abandonJob(run, job), runBudget)
+
+    archive.close()
+    services.save()
+    if run.instrumentation is not None:
+        Path(resultsFileDirectory).mkdir(parents=True, exist_ok=True)
+        run.instrumentation.write_json(resultsFileDirectory + 'Instrumentation_' + startTime.replace('+00:00','').replace(':','-').replace('T', ' ') + ".json")
+        run.instrumentation.write_prometheus(instrumentationTextfile)
+    if ownServices:
+        # Don't wait for abandoned jobs still running in the worker processes
+        services.close(wait=not any(job.timedOut for job in results))
+    results.extend(skipped)
     
     Path(resultsFileDirectory).mkdir(parents=True, exist_ok=True)
     outfilePath = resultsFileDirectory + 'Results_' + startTime.replace('+00:00','').replace(':','-').replace('T', ' ') + ".txt"
 
     with open(r''+outfilePath, 'w') as fp:
-        fp.write("Command\tRan\tSuccess\tStarted\tEnded\tTime\n")
+        fp.write("Command\tRan\tSuccess\tStarted\tEnded\tTime" + ("\tPeakMemoryMB" if memoryProfile else "") + "\n")
         for res in results:
 
             startedText = ""
@@ -116,9 +477,18 @@ def batchProcess(jobs, numThreads=8):
                 timeDiff = int((res.ended - res.started).total_seconds() * 1000)
 
             
-            fp.write("" + res.command.strip() + "\t" + res.ran + "\t" + res.success + "\t" + startedText + "\t" + endedText + "\t" + str(timeDiff) + "\n")
+            memoryText = ""
+            if memoryProfile and res.memoryPeak is not None:
+                memoryText = "\t" + str(round(res.memoryPeak / MB, 1))
+            elif memoryProfile:
+                memoryText = "\t"
+
+            fp.write("" + res.command.strip() + "\t" + res.ran + "\t" + res.success + "\t" + startedText + "\t" + endedText + "\t" + str(timeDiff) + memoryText + "\n")
             
 
 if __name__ == "__main__":
-    # pylint: disable=no-value-for-parameter
-    print(fetchAllData())
+    if "--daemon" in sys.argv[1:]:
+        runDaemon()
+    else:
+        # pylint: disable=no-value-for-parameter
+        print(fetchAllData())
@@ -28,8 +28,13 @@ from electricitymap.contrib.lib.models.events import (
 )
 from electricitymap.contrib.lib.types import ZoneKey
 from parsers.lib.config import refetch_frequency
+from parsers.lib.ratelimit import get_rate_limiter
 from parsers.lib.utils import get_token
 
+# EIA throttles keys sending more than 9000 requests per hour.
+EIA_RATE_PER_KEY = 9000 / 3600
+EIA_BURST_PER_KEY = 100
+
 # Reverse exchanges need to be multiplied by -1, since they are reported in the opposite direction
 REVERSE_EXCHANGES = [
     "US-CA->MX-BC",
@@ -469,8 +474,8 @@ def fetch_production_mix(
 ):
     all_production_breakdowns: list[ProductionBreakdownList] = []
 
-    if (zone_key == 'US-CAL-IID') and target_datetime is None:
-        target_datetime =  datetime.now() + timedelta(hours=-48)
+    if (zone_key == "US-CAL-IID") and target_datetime is None:
+        target_datetime = datetime.now() + timedelta(hours=-48)
 
     for production_mode, code in TYPES.items():
         negative_threshold = NEGATIVE_PRODUCTION_THRESHOLDS_TYPE.get(
@@ -650,8 +655,10 @@ def _fetch(
     target_datetime: datetime | None = None,
     logger: Logger = getLogger(__name__),
 ):
-    # get EIA API key
-    API_KEY = get_token("EIA_KEY")
+    # EIA_KEY may hold several comma separated keys to spread requests over
+    limiter = get_rate_limiter(
+        "EIA_KEY", get_token("EIA_KEY").split(","), EIA_RATE_PER_KEY, EIA_BURST_PER_KEY
+    )
 
     if target_datetime:
         try:
@@ -664,12 +671,14 @@ def _fetch(
         eia_ts_format = "%Y-%m-%dT%H"
         end = target_datetime.astimezone(utc) + timedelta(hours=1)
         start = end - timedelta(days=1)
-        url = f"{url_prefix}&api_key={API_KEY}&start={start.strftime(eia_ts_format)}&end={end.strftime(eia_ts_format)}"
+        query = (
+            f"&start={start.strftime(eia_ts_format)}&end={end.strftime(eia_ts_format)}"
+        )
     else:
-        url = f"{url_prefix}&api_key={API_KEY}&sort[0][column]=period&sort[0][direction]=desc&length=24"
+        query = "&sort[0][column]=period&sort[0][direction]=desc&length=24"
 
     s = session or Session()
-    req = s.get(url)
+    req = limiter.request(lambda key: s.get(f"{url_prefix}&api_key={key}{query}"))
     raw_data = req.json()
     if raw_data.get("response", {}).get("data", None) is None:
         return []
@@ -12,19 +12,20 @@ Generation Forecast
 Consumption Forecast
 """
 import itertools
-import re
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from logging import Logger, getLogger
-from random import shuffle
+from threading import Lock
+from time import monotonic
 from typing import Any
 
-import arrow
 import numpy as np
-from bs4 import BeautifulSoup
 from requests import Response, Session
 
 from electricitymap.contrib.config import ZoneKey
 from electricitymap.contrib.lib.models.event_lists import (
+    ExchangeList,
     PriceList,
     ProductionBreakdownList,
 )
@@ -33,9 +34,14 @@ from electricitymap.contrib.lib.models.events import (
     ProductionMix,
     StorageMix,
 )
+from electricitymap.contrib.lib.tracing import timed
 from parsers.lib.config import refetch_frequency
 
+from .lib.batching import parser_keys
+from .lib.entsoe import read_timeseries, reason_text
 from .lib.exceptions import ParserException
+from .lib.ratelimit import get_rate_limiter
+from .lib.session import get_session
 from .lib.utils import get_token
 from .lib.validation import validate
 
@@ -50,6 +56,18 @@ EU_PROXY = "https://eu-proxy-jfnx5klx2a-ew.a.run.app{endpoint}?host={host}"
 ENTSOE_ENDPOINT = ENTSOE_HOST + ENDPOINT
 ENTSOE_EU_PROXY_ENDPOINT = EU_PROXY.format(endpoint=ENDPOINT, host=ENTSOE_HOST)
 
+# ENTSOE allows 400 requests per minute and per token, a full bucket plus a
+# minute of refill stays below that.
+ENTSOE_RATE_PER_TOKEN = 350 / 60
+ENTSOE_BURST_PER_TOKEN = 40
+# Reason of the acknowledgements sent instead of an empty document.
+NO_MATCHING_DATA = "No matching data found"
+# Queries in flight per token when many domains or psr types are fetched at
+# once (production per unit, batch entry points).
+ENTSOE_CONCURRENCY_PER_TOKEN = 4
+# Psr types without any unit in a domain are not queried again for a while.
+ENTSOE_EMPTY_PSR_TYPE_TTL = timedelta(hours=6)
+
 ENTSOE_PARAMETER_DESC = {
     "B01": "Biomass",
     "B02": "Fossil Brown coal/Lignite",
@@ -509,28 +527,27 @@ def query_ENTSOE(
     )
 
     # Due to rate limiting, we need to spread our requests across different tokens
-    tokens = get_token(env_var).split(",")
-    # Shuffle the tokens so that we don't always use the same one first.
-    shuffle(tokens)
-    last_response_if_all_fail = None
-    # Try each token until we get a valid response
-    for token in tokens:
-        params["securityToken"] = token
-        response: Response = session.get(url, params=params)
-        if response.ok:
-            return response.text
-        else:
-            last_response_if_all_fail = response
+    limiter = get_rate_limiter(
+        env_var,
+        get_token(env_var).split(","),
+        ENTSOE_RATE_PER_TOKEN,
+        ENTSOE_BURST_PER_TOKEN,
+    )
+    # The least loaded token is used, other tokens are only tried when it is
+    # rate limited, rejected (revoked or invalid) or the API fails.
+    response: Response = limiter.request(
+        lambda token: session.get(url, params={**params, "securityToken": token})
+    )
+    if response.ok:
+        return response.text
+    last_response_if_all_fail = response
     # If we get here, all tokens failed to fetch valid data
     # and we will check the last response for a error message.
     exception_message = None
     if last_response_if_all_fail is not None:
-        soup = BeautifulSoup(last_response_if_all_fail.text, "html.parser")
-        text = soup.find_all("text")
-        if len(text):
-            error_text = soup.find_all("text")[0].prettify()
-            if "No matching data found" in error_text:
-                exception_message = "No matching data found"
+        error_text = reason_text(last_response_if_all_fail.text)
+        if error_text and NO_MATCHING_DATA in error_text:
+            exception_message = NO_MATCHING_DATA
         if exception_message is None:
             exception_message = f"Status code: [{last_response_if_all_fail.status_code}]. Reason: {last_response_if_all_fail.reason}"
 
@@ -708,20 +725,35 @@ def query_wind_solar_production_forecast(
     )
 
 
-def datetime_from_position(
-    start: arrow.Arrow, position: int, resolution: str
-) -> datetime:
-    """Finds time granularity of data."""
-
-    m = re.search(r"PT(\d+)([M])", resolution)
-    if m is not None:
-        digits = int(m.group(1))
-        scale = m.group(2)
-        if scale == "M":
-            return start.shift(minutes=(position - 1) * digits).datetime
-    raise NotImplementedError("Could not recognise resolution %s" % resolution)
+class _Documents:
+    """Documents queried for a target datetime, each one downloaded once
+    however many zones need it, including by concurrent threads."""
+
+    def __init__(self, session: Session, target_datetime: datetime | None):
+        self.session = session
+        self.target_datetime = target_datetime
+        self._lock = Lock()
+        self._documents: dict[tuple, Future] = {}
+
+    def get(self, query: Callable[..., str | None], domain: str) -> str | None:
+        """Returns `query(domain, session, target_datetime)`, raising its
+        exception if it failed."""
+        with self._lock:
+            future = self._documents.get((query, domain))
+            owner = future is None
+            if owner:
+                future = self._documents[(query, domain)] = Future()
+        if owner:
+            try:
+                future.set_result(
+                    query(domain, self.session, target_datetime=self.target_datetime)
+                )
+            except BaseException as e:
+                future.set_exception(e)
+        return future.result()
 
 
+@timed("parse")
 def parse_scalar(
     xml_text: str,
     only_inBiddingZone_Domain: bool = False,
@@ -729,25 +761,19 @@ def parse_scalar(
 ) -> tuple[list[float], list[datetime]] | None:
     if not xml_text:
         return None
-    soup = BeautifulSoup(xml_text, "html.parser")
     # Get all points
     values = []
     datetimes = []
-    for timeseries in soup.find_all("timeseries"):
-        resolution = str(timeseries.find_all("resolution")[0].contents[0])
-        datetime_start = arrow.get(timeseries.find_all("start")[0].contents[0])
+    for timeseries in read_timeseries(xml_text):
         if only_inBiddingZone_Domain:
-            if not len(timeseries.find_all("inBiddingZone_Domain.mRID".lower())):
+            if not timeseries.has("inBiddingZone_Domain.mRID"):
                 continue
         elif only_outBiddingZone_Domain:
-            if not len(timeseries.find_all("outBiddingZone_Domain.mRID".lower())):
+            if not timeseries.has("outBiddingZone_Domain.mRID"):
                 continue
-        for entry in timeseries.find_all("point"):
-            position = int(entry.find_all("position")[0].contents[0])
-            value = float(entry.find_all("quantity")[0].contents[0])
-            datetime = datetime_from_position(datetime_start, position, resolution)
-            values.append(value)
-            datetimes.append(datetime)
+        for dt, point in timeseries.points():
+            values.append(float(point.values["quantity"]))
+            datetimes.append(dt)
 
     return values, datetimes
 
@@ -773,6 +799,7 @@ def create_production_storage(
     return production, None
 
 
+@timed("parse")
 def parse_production(
     xml: str,
     logger: Logger,
@@ -785,35 +812,23 @@ def parse_production(
         return ProductionBreakdownList.merge_production_breakdowns(
             all_production_breakdowns, logger
         )
-    soup = BeautifulSoup(xml, "html.parser")
-
     # Each timeserie is dedicated to a different fuel type.
-    for timeseries in soup.find_all("timeseries"):
+    for timeseries in read_timeseries(xml):
         production_breakdowns = ProductionBreakdownList(logger)
-        resolution = str(timeseries.find_all("resolution")[0].contents[0])
-        datetime_start: arrow.Arrow = arrow.get(
-            timeseries.find_all("start")[0].contents[0]
-        )
-        fuel_code = str(
-            timeseries.find_all("mktpsrtype")[0].find_all("psrtype")[0].contents[0]
-        )
-
-        for entry in timeseries.find_all("point"):
-            quantity = float(entry.find_all("quantity")[0].contents[0])
-            position = int(entry.find_all("position")[0].contents[0])
-            # Since all values in ENTSOE are positive, we need to check if
-            # the value is production or consumption so we can set the quantity
-            # to a negative value if it is consumption.
-            is_production = (
-                len(timeseries.find_all("inBiddingZone_Domain.mRID".lower())) > 0
-            )
-            datetime = datetime_from_position(datetime_start, position, resolution)
+        fuel_code = timeseries.psr_type
+        # Since all values in ENTSOE are positive, we need to check if
+        # the value is production or consumption so we can set the quantity
+        # to a negative value if it is consumption.
+        is_production = timeseries.has("inBiddingZone_Domain.mRID")
+
+        for dt, point in timeseries.points():
+            quantity = float(point.values["quantity"])
             production, storage = create_production_storage(
                 fuel_code, quantity if is_production else -quantity, logger, zoneKey
             )
             production_breakdowns.append(
                 zoneKey=zoneKey,
-                datetime=datetime,
+                datetime=dt,
                 source=SOURCE,
                 sourceType=source_type,
                 production=production,
@@ -825,6 +840,7 @@ def parse_production(
     )
 
 
+@timed("parse")
 def parse_self_consumption(xml_text: str):
     """
     Parses the XML text and returns a dict of datetimes to the total self-consumption
@@ -840,72 +856,40 @@ def parse_self_consumption(xml_text: str):
 
     if not xml_text:
         return None
-    soup = BeautifulSoup(xml_text, "html.parser")
     res = {}
-    for timeseries in soup.find_all("timeseries"):
-        is_consumption = (
-            len(timeseries.find_all("outBiddingZone_Domain.mRID".lower())) > 0
-        )
+    for timeseries in read_timeseries(xml_text):
+        is_consumption = timeseries.has("outBiddingZone_Domain.mRID")
         if not is_consumption:
             continue
-        psr_type = str(
-            timeseries.find_all("mktpsrtype")[0].find_all("psrtype")[0].contents[0]
-        )
-        if psr_type in ENTSOE_STORAGE_PARAMETERS:
+        if timeseries.psr_type in ENTSOE_STORAGE_PARAMETERS:
             continue
-        resolution = str(timeseries.find_all("resolution")[0].contents[0])
-        datetime_start: arrow.Arrow = arrow.get(
-            timeseries.find_all("start")[0].contents[0]
-        )
 
-        for entry in timeseries.find_all("point"):
-            quantity = float(entry.find_all("quantity")[0].contents[0])
+        for dt, point in timeseries.points():
+            quantity = float(point.values["quantity"])
             if quantity == 0:
                 continue
-            position = int(entry.find_all("position")[0].contents[0])
-            datetime = datetime_from_position(datetime_start, position, resolution)
-            res[datetime] = res[datetime] + quantity if datetime in res else quantity
+            res[dt] = res[dt] + quantity if dt in res else quantity
 
     return res
 
 
+@timed("parse")
 def parse_production_per_units(xml_text: str) -> Any | None:
     values = {}
 
     if not xml_text:
         return None
-    soup = BeautifulSoup(xml_text, "html.parser")
     # Get all points
-    for timeseries in soup.find_all("timeseries"):
-        resolution = str(timeseries.find_all("resolution")[0].contents[0])
-        datetime_start: arrow.Arrow = arrow.get(
-            timeseries.find_all("start")[0].contents[0]
-        )
-        is_production = (
-            len(timeseries.find_all("inBiddingZone_Domain.mRID".lower())) > 0
-        )
-        psr_type = str(
-            timeseries.find_all("mktpsrtype")[0].find_all("psrtype")[0].contents[0]
-        )
-        unit_key = str(
-            timeseries.find_all("mktpsrtype")[0]
-            .find_all("powersystemresources")[0]
-            .find_all("mrid")[0]
-            .contents[0]
-        )
-        unit_name = str(
-            timeseries.find_all("mktpsrtype")[0]
-            .find_all("powersystemresources")[0]
-            .find_all("name")[0]
-            .contents[0]
-        )
+    for timeseries in read_timeseries(xml_text):
+        is_production = timeseries.has("inBiddingZone_Domain.mRID")
+        psr_type = timeseries.psr_type
+        unit_key = timeseries.header["MktPSRType/PowerSystemResources/mRID"]
+        unit_name = timeseries.header["MktPSRType/PowerSystemResources/name"]
         if not is_production:
             continue
-        for entry in timeseries.find_all("point"):
-            quantity = float(entry.find_all("quantity")[0].contents[0])
-            position = int(entry.find_all("position")[0].contents[0])
-            datetime = datetime_from_position(datetime_start, position, resolution)
-            key = (unit_key, datetime)
+        for dt, point in timeseries.points():
+            quantity = float(point.values["quantity"])
+            key = (unit_key, dt)
             if key in values:
                 if is_production:
                     values[key]["production"] += quantity
@@ -913,7 +897,7 @@ def parse_production_per_units(xml_text: str) -> Any | None:
                     values[key]["production"] -= quantity
             else:
                 values[key] = {
-                    "datetime": datetime,
+                    "datetime": dt,
                     "production": quantity,
                     "productionType": ENTSOE_PARAMETER_BY_GROUP[psr_type],
                     "unitKey": unit_key,
@@ -923,48 +907,34 @@ def parse_production_per_units(xml_text: str) -> Any | None:
     return values.values()
 
 
+@timed("parse")
 def parse_exchange(
     xml_text: str,
     is_import: bool,
-    quantities: list[float] | None = None,
-    datetimes: list[datetime] | None = None,
-) -> tuple[list[float], list[datetime]] | None:
+    flows: dict[datetime, float] | None = None,
+) -> dict[datetime, float]:
+    """
+    Adds the flows of an exchange document to `flows`, keyed by datetime.
+    Imports are added and exports subtracted, so that the flows of both
+    directions and of every A05 TimeSeries of a datetime are summed.
+    """
+    flows = {} if flows is None else flows
     if not xml_text:
-        return None
-    quantities = quantities or []
-    datetimes = datetimes or []
-    soup = BeautifulSoup(xml_text, "html.parser")
-    # Get all points
-    for timeseries in soup.find_all("timeseries"):
-        resolution = str(timeseries.find_all("resolution")[0].contents[0])
-        datetime_start: arrow.Arrow = arrow.get(
-            timeseries.find_all("start")[0].contents[0]
-        )
-        # Only use contract_marketagreement.type == A01 (Total to avoid double counting some columns)
-        if (
-            timeseries.find_all("contract_marketagreement.type")
-            and timeseries.find_all("contract_marketagreement.type")[0].contents[0]
-            != "A05"
-        ):
+        return flows
+    sign = 1 if is_import else -1
+    for timeseries in read_timeseries(xml_text):
+        # Only use contract_marketagreement.type == A05 (Total to avoid double counting some columns)
+        contract_type = timeseries.get("contract_MarketAgreement.type")
+        if contract_type is not None and contract_type != "A05":
             continue
 
-        for entry in timeseries.find_all("point"):
-            quantity = float(entry.find_all("quantity")[0].contents[0])
-            if not is_import:
-                quantity *= -1
-            position = int(entry.find_all("position")[0].contents[0])
-            datetime = datetime_from_position(datetime_start, position, resolution)
-            # Find out whether or not we should update the net production
-            try:
-                i = datetimes.index(datetime)
-                quantities[i] += quantity
-            except ValueError:  # Not in list
-                quantities.append(quantity)
-                datetimes.append(datetime)
+        for dt, point in timeseries.points():
+            flows[dt] = flows.get(dt, 0) + sign * float(point.values["quantity"])
 
-    return quantities, datetimes
+    return flows
 
 
+@timed("parse")
 def parse_prices(
     xml_text: str,
     zoneKey: ZoneKey,
@@ -972,21 +942,14 @@ def parse_prices(
 ) -> PriceList:
     if not xml_text:
         return PriceList(logger)
-    soup = BeautifulSoup(xml_text, "html.parser")
     prices = PriceList(logger)
-    for timeseries in soup.find_all("timeseries"):
-        currency = str(timeseries.find_all("currency_unit.name")[0].contents[0])
-        resolution = str(timeseries.find_all("resolution")[0].contents[0])
-        datetime_start: arrow.Arrow = arrow.get(
-            timeseries.find_all("start")[0].contents[0]
-        )
-        for entry in timeseries.find_all("point"):
-            position = int(entry.find_all("position")[0].contents[0])
-            dt = datetime_from_position(datetime_start, position, resolution)
+    for timeseries in read_timeseries(xml_text):
+        currency = timeseries.header["currency_Unit.name"]
+        for dt, point in timeseries.points():
             prices.append(
                 zoneKey=zoneKey,
                 datetime=dt,
-                price=float(entry.find_all("price.amount")[0].contents[0]),
+                price=float(point.values["price.amount"]),
                 source="entsoe.eu",
                 currency=currency,
             )
@@ -1023,20 +986,13 @@ def validate_production(
     return True
 
 
-@refetch_frequency(timedelta(days=2))
-def fetch_consumption(
-    zone_key: str,
-    session: Session | None = None,
-    target_datetime: datetime | None = None,
-    logger: Logger = getLogger(__name__),
-):
-    """Gets consumption for a specified zone."""
-    session = session or Session()
+def _fetch_consumption(zone_key: str, documents: _Documents, logger: Logger):
+    target_datetime = documents.target_datetime
     domain = ENTSOE_DOMAIN_MAPPINGS[zone_key]
     # Grab consumption
     parsed = None
     try:
-        raw_consumption = query_consumption(domain, session, target_datetime)
+        raw_consumption = documents.get(query_consumption, domain)
     except Exception as e:
         raise ParserException(
             parser="ENTSOE.py",
@@ -1055,7 +1011,7 @@ def fetch_consumption(
         # self_consumption is a dict of datetimes to the total self-consumption value from all sources.
         # Only datetimes where the value > 0 are included.
         self_consumption = None
-        raw_production = query_production(domain, session, target_datetime)
+        raw_production = documents.get(query_production, domain)
         if raw_production is not None:
             self_consumption = parse_self_consumption(
                 raw_production,
@@ -1099,25 +1055,23 @@ def fetch_consumption(
 
 
 @refetch_frequency(timedelta(days=2))
-def fetch_production(
-    zone_key: ZoneKey,
+def fetch_consumption(
+    zone_key: str,
     session: Session | None = None,
     target_datetime: datetime | None = None,
     logger: Logger = getLogger(__name__),
-) -> list:
-    """
-    Gets values and corresponding datetimes for all production types in the specified zone.
-    Removes any values that are in the future or don't have a datetime associated with them.
-    """
-    if not session:
-        session = Session()
+):
+    """Gets consumption for a specified zone."""
+    session = session or Session()
+    return _fetch_consumption(zone_key, _Documents(session, target_datetime), logger)
+
+
+def _fetch_production(zone_key: ZoneKey, documents: _Documents, logger: Logger) -> list:
     non_aggregated_data: list[ProductionBreakdownList] = []
     for _zone_key in ZONE_KEY_AGGREGATES.get(zone_key, [zone_key]):
         domain = ENTSOE_DOMAIN_MAPPINGS[_zone_key]
         try:
-            raw_production = query_production(
-                domain, session, target_datetime=target_datetime
-            )
+            raw_production = documents.get(query_production, domain)
         except Exception as e:
             raise ParserException(
                 parser="ENTSOE.py",
@@ -1133,20 +1087,96 @@ def fetch_production(
         # Aggregated data are regrouped unde the same zone key.
         non_aggregated_data.append(parse_production(raw_production, logger, zone_key))
 
-    aggregated_zone_data = ProductionBreakdownList.merge_production_breakdowns(
-        non_aggregated_data, logger
-    ).to_list()
+    if len(non_aggregated_data) == 1:
+        # Already merged by parse_production
+        aggregated_zone_data = non_aggregated_data[0].to_list()
+    else:
+        aggregated_zone_data = ProductionBreakdownList.merge_production_breakdowns(
+            non_aggregated_data, logger
+        ).to_list()
     return list(filter(lambda x: validate_production(x, logger), aggregated_zone_data))
 
 
+@refetch_frequency(timedelta(days=2))
+def fetch_production(
+    zone_key: ZoneKey,
+    session: Session | None = None,
+    target_datetime: datetime | None = None,
+    logger: Logger = getLogger(__name__),
+) -> list:
+    """
+    Gets values and corresponding datetimes for all production types in the specified zone.
+    Removes any values that are in the future or don't have a datetime associated with them.
+    """
+    if not session:
+        session = Session()
+    return _fetch_production(zone_key, _Documents(session, target_datetime), logger)
+
+
+# Expiry (monotonic time) of the psr types found without any unit, keyed by
+# domain, psr type and year of the data, as units open and close over time.
+_empty_psr_types: dict[tuple[str, str, int], float] = {}
+_empty_psr_types_lock = Lock()
+
+
+def _is_empty_psr_type(key: tuple[str, str, int]) -> bool:
+    with _empty_psr_types_lock:
+        expires_at = _empty_psr_types.get(key)
+        if expires_at is not None and expires_at <= monotonic():
+            del _empty_psr_types[key]
+            expires_at = None
+        return expires_at is not None
+
+
+def _set_empty_psr_type(key: tuple[str, str, int]):
+    with _empty_psr_types_lock:
+        _empty_psr_types[key] = monotonic() + ENTSOE_EMPTY_PSR_TYPE_TTL.total_seconds()
+
+
+def _token_count(target_datetime: datetime | None) -> int:
+    env_var = "ENTSOE_TOKEN" if target_datetime is None else "ENTSOE_REFETCH_TOKEN"
+    return len([token for token in get_token(env_var).split(",") if token.strip()])
+
+
+def _fetch_units_of_psr_type(
+    psr_type: str,
+    zone_key: str,
+    domain: str,
+    session: Session,
+    target_datetime: datetime,
+) -> list[dict[str, Any]]:
+    empty_key = (domain, psr_type, target_datetime.year)
+    if _is_empty_psr_type(empty_key):
+        return []
+    try:
+        raw_production_per_units = query_production_per_units(
+            psr_type, domain, session, target_datetime
+        )
+        values = [
+            v for v in parse_production_per_units(raw_production_per_units) or [] if v
+        ]
+    except Exception as e:
+        if not (isinstance(e, ParserException) and e.args[0] == NO_MATCHING_DATA):
+            raise ParserException(
+                parser="ENTSOE.py",
+                message=f"Failed to fetch data for {psr_type} in {zone_key}",
+                zone_key=zone_key,
+            ) from e
+        values = []
+    if not values:
+        _set_empty_psr_type(empty_key)
+    return values
+
+
 @refetch_frequency(timedelta(days=1))
 def fetch_production_per_units(
     zone_key: str,
-    session: Session = Session(),
+    session: Session | None = None,
     target_datetime: datetime | None = None,
     logger: Logger = getLogger(__name__),
 ) -> list:
     """Returns all production units and production values."""
+    session = session or get_session()
 
     # If no target_datetime is specified, or the target datetime is less
     # than 5 days ago we set the target_datetime to 5 days ago.
@@ -1159,226 +1189,148 @@ def fetch_production_per_units(
         target_datetime = datetime.now(tz=timezone.utc) - timedelta(days=5)
 
     domain = ENTSOE_EIC_MAPPING[zone_key]
+    psr_types = list(ENTSOE_PARAMETER_DESC.keys())
+    max_workers = min(
+        len(psr_types),
+        ENTSOE_CONCURRENCY_PER_TOKEN * _token_count(target_datetime),
+    )
     data = []
-    # Iterate over all psr types
-    for k in ENTSOE_PARAMETER_DESC.keys():
-        try:
-            raw_production_per_units = query_production_per_units(
-                k, domain, session, target_datetime
-            )
-            if raw_production_per_units is not None:
-                values = parse_production_per_units(raw_production_per_units) or []
-                for v in values:
-                    if not v:
-                        continue
-                    v["source"] = "entsoe.eu"
-                    if v["unitName"] not in ENTSOE_UNITS_TO_ZONE:
-                        logger.warning(
-                            f"Unknown unit {v['unitName']} with id {v['unitKey']}"
-                        )
-                    else:
-                        v["zoneKey"] = ENTSOE_UNITS_TO_ZONE[v["unitName"]]
-                        if v["zoneKey"] == zone_key:
-                            data.append(v)
-        except Exception as e:
-            raise ParserException(
-                parser="ENTSOE.py",
-                message=f"Failed to fetch data for {k} in {zone_key}",
-                zone_key=zone_key,
-            ) from e
+    # Query all psr types concurrently, the rate limiter of the tokens spreads
+    # the queries over them.
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        values_per_psr_type = executor.map(
+            lambda psr_type: _fetch_units_of_psr_type(
+                psr_type, zone_key, domain, session, target_datetime
+            ),
+            psr_types,
+        )
+        for values in values_per_psr_type:
+            for v in values:
+                v["source"] = "entsoe.eu"
+                if v["unitName"] not in ENTSOE_UNITS_TO_ZONE:
+                    logger.warning(
+                        f"Unknown unit {v['unitName']} with id {v['unitKey']}"
+                    )
+                else:
+                    v["zoneKey"] = ENTSOE_UNITS_TO_ZONE[v["unitName"]]
+                    if v["zoneKey"] == zone_key:
+                        data.append(v)
 
     return data
 
 
-@refetch_frequency(timedelta(days=2))
-def fetch_exchange(
+def fetch_net_flows(
     zone_key1: str,
     zone_key2: str,
-    session: Session | None = None,
+    session: Session,
     target_datetime: datetime | None = None,
-    logger: Logger = getLogger(__name__),
-) -> list:
+    forecasted: bool = False,
+) -> dict[datetime, float]:
     """
-    Gets exchange status between two specified zones.
-    Removes any datapoints that are in the future.
+    Gets the net flows between two zones keyed by datetime, positive when
+    zone_key1 exports. Measured flows in the future are removed.
     """
-    if not session:
-        session = Session()
-    sorted_zone_keys = sorted([zone_key1, zone_key2])
-    key = "->".join(sorted_zone_keys)
+    key = "->".join(sorted([zone_key1, zone_key2]))
     if key in ENTSOE_EXCHANGE_DOMAIN_OVERRIDE:
         domain1, domain2 = ENTSOE_EXCHANGE_DOMAIN_OVERRIDE[key]
     else:
         domain1 = ENTSOE_DOMAIN_MAPPINGS[zone_key1]
         domain2 = ENTSOE_DOMAIN_MAPPINGS[zone_key2]
-    # Create a hashmap with key (datetime)
-    exchange_hashmap = {}
-    # Grab exchange
-    # Import
-    try:
-        raw_exchange = query_exchange(domain1, domain2, session, target_datetime)
-    except Exception as e:
+    query = query_exchange_forecast if forecasted else query_exchange
+    kind = "exchange forecast" if forecasted else "exchange"
+    flows: dict[datetime, float] = {}
+    # Import, then export
+    for is_import, in_domain, out_domain in [
+        (True, domain1, domain2),
+        (False, domain2, domain1),
+    ]:
+        try:
+            raw_exchange = query(
+                in_domain, out_domain, session, target_datetime=target_datetime
+            )
+        except Exception as e:
+            raise ParserException(
+                parser="ENTSOE.py",
+                message=f"Failed to fetch {kind} for {zone_key1} -> {zone_key2}",
+                zone_key=key,
+            ) from e
+        parse_exchange(raw_exchange, is_import, flows)
+
+    if not forecasted:
+        # Remove all dates in the future
+        now = datetime.now(timezone.utc)
+        flows = {dt: flow for dt, flow in flows.items() if dt <= now}
+    if not flows:
         raise ParserException(
             parser="ENTSOE.py",
-            message=f"Failed to fetch exchange for {zone_key1} -> {zone_key2}",
+            message=f"No {kind} data found for {zone_key1} -> {zone_key2}",
             zone_key=key,
-        ) from e
-    if raw_exchange is not None:
-        parsed = parse_exchange(
-            raw_exchange,
-            is_import=True,
         )
-        if parsed:
-            # Export
-            try:
-                raw_exchange = query_exchange(
-                    domain2, domain1, session, target_datetime
-                )
-            except Exception as e:
-                raise ParserException(
-                    parser="ENTSOE.py",
-                    message=f"Failed to fetch exchange for {zone_key1} -> {zone_key2}",
-                    zone_key=key,
-                ) from e
-            if raw_exchange is not None:
-                parsed = parse_exchange(
-                    xml_text=raw_exchange,
-                    is_import=False,
-                    quantities=parsed[0],
-                    datetimes=parsed[1],
-                )
-                if parsed:
-                    quantities, datetimes = parsed
-                    for i in range(len(quantities)):
-                        exchange_hashmap[datetimes[i]] = quantities[i]
+    # Flows are summed as imports into zone_key1
+    return {dt: -flow for dt, flow in flows.items()}
 
-        # Remove all dates in the future
-        exchange_dates = sorted(set(exchange_hashmap.keys()), reverse=True)
-        exchange_dates = list(filter(lambda x: x <= arrow.now(), exchange_dates))
-        if not len(exchange_dates):
-            raise ParserException(parser="ENTSOE.py", message="No exchange data found")
-        data = []
-        for exchange_date in exchange_dates:
-            net_flow = float(exchange_hashmap[exchange_date])
-            data.append(
-                {
-                    "sortedZoneKeys": key,
-                    "datetime": exchange_date,
-                    "netFlow": net_flow
-                    if zone_key1[0] == sorted_zone_keys
-                    else -1 * net_flow,
-                    "source": "entsoe.eu",
-                }
-            )
 
-        return data
-    else:
-        raise ParserException(
-            parser="entsoe.eu",
-            message=f"No exchange data found for {zone_key1} -> {zone_key2}",
+def _exchange_list(
+    zone_key1: str,
+    zone_key2: str,
+    net_flows: dict[datetime, float],
+    logger: Logger,
+    source_type: EventSourceType = EventSourceType.measured,
+) -> ExchangeList:
+    sorted_zone_keys = ZoneKey("->".join(sorted([zone_key1, zone_key2])))
+    exchanges = ExchangeList(logger)
+    for dt, net_flow in net_flows.items():
+        exchanges.append(
+            zoneKey=sorted_zone_keys,
+            datetime=dt,
+            source="entsoe.eu",
+            netFlow=net_flow,
+            sourceType=source_type,
         )
+    return exchanges
 
 
 @refetch_frequency(timedelta(days=2))
-def fetch_exchange_forecast(
+def fetch_exchange(
     zone_key1: str,
     zone_key2: str,
     session: Session | None = None,
     target_datetime: datetime | None = None,
     logger: Logger = getLogger(__name__),
 ) -> list:
-    """Gets exchange forecast between two specified zones."""
+    """
+    Gets exchange status between two specified zones.
+    Removes any datapoints that are in the future.
+    """
     if not session:
         session = Session()
-    sorted_zone_keys = sorted([zone_key1, zone_key2])
-    key = "->".join(sorted_zone_keys)
-    if key in ENTSOE_EXCHANGE_DOMAIN_OVERRIDE:
-        domain1, domain2 = ENTSOE_EXCHANGE_DOMAIN_OVERRIDE[key]
-    else:
-        domain1 = ENTSOE_DOMAIN_MAPPINGS[zone_key1]
-        domain2 = ENTSOE_DOMAIN_MAPPINGS[zone_key2]
-    # Create a hashmap with key (datetime)
-    exchange_hashmap = {}
-    # Grab exchange
-    # Import
-    parsed = None
-    try:
-        raw_exchange_forecast = query_exchange_forecast(
-            domain1, domain2, session, target_datetime=target_datetime
-        )
-    except Exception as e:
-        raise ParserException(
-            parser="ENTSOE.py",
-            message=f"Failed to fetch exchange forecast for {zone_key1} -> {zone_key2}",
-            zone_key=key,
-        ) from e
-    if raw_exchange_forecast is not None:
-        parsed = parse_exchange(
-            raw_exchange_forecast,
-            is_import=True,
-        )
-    if parsed is not None:
-        # Export
-        try:
-            raw_exchange_forecast = query_exchange_forecast(
-                domain2, domain1, session, target_datetime=target_datetime
-            )
-        except Exception as e:
-            raise ParserException(
-                parser="ENTSOE.py",
-                message=f"Failed to fetch exchange forecast for {zone_key1} -> {zone_key2}",
-                zone_key=key,
-            ) from e
-        if raw_exchange_forecast is not None:
-            parsed = parse_exchange(
-                xml_text=raw_exchange_forecast,
-                is_import=False,
-                quantities=parsed[0],
-                datetimes=parsed[1],
-            )
-        if parsed is not None:
-            quantities, datetimes = parsed
-            for i in range(len(quantities)):
-                exchange_hashmap[datetimes[i]] = quantities[i]
-
-    # Remove all dates in the future
-    sorted_zone_keys = sorted([zone_key1, zone_key2])
-    exchange_dates = list(sorted(set(exchange_hashmap.keys()), reverse=True))
-    if not len(exchange_dates):
-        raise ParserException(
-            parser="ENTSOE.py",
-            message=f"No exchange forecast data found for {zone_key1} -> {zone_key2}",
-        )
-    data = []
-    for exchange_date in exchange_dates:
-        netFlow = exchange_hashmap[exchange_date]
-        data.append(
-            {
-                "sortedZoneKeys": key,
-                "datetime": exchange_date,
-                "netFlow": netFlow
-                if zone_key1[0] == sorted_zone_keys
-                else -1 * netFlow,
-                "source": "entsoe.eu",
-            }
-        )
-    return data
+    net_flows = fetch_net_flows(zone_key1, zone_key2, session, target_datetime)
+    return _exchange_list(zone_key1, zone_key2, net_flows, logger).to_list()
 
 
 @refetch_frequency(timedelta(days=2))
-def fetch_price(
-    zone_key: ZoneKey,
+def fetch_exchange_forecast(
+    zone_key1: str,
+    zone_key2: str,
     session: Session | None = None,
     target_datetime: datetime | None = None,
     logger: Logger = getLogger(__name__),
 ) -> list:
-    """Gets day-ahead price for specified zone."""
+    """Gets exchange forecast between two specified zones."""
     if not session:
         session = Session()
+    net_flows = fetch_net_flows(
+        zone_key1, zone_key2, session, target_datetime, forecasted=True
+    )
+    return _exchange_list(
+        zone_key1, zone_key2, net_flows, logger, EventSourceType.forecasted
+    ).to_list()
+
 
+def _fetch_price(zone_key: ZoneKey, documents: _Documents, logger: Logger) -> list:
     domain = ENTSOE_PRICE_DOMAIN_MAPPINGS[zone_key]
     try:
-        raw_price_data = query_price(domain, session, target_datetime=target_datetime)
+        raw_price_data = documents.get(query_price, domain)
     except Exception as e:
         raise ParserException(
             parser="ENTSOE.py",
@@ -1394,6 +1346,19 @@ def fetch_price(
     return parse_prices(raw_price_data, zone_key, logger).to_list()
 
 
+@refetch_frequency(timedelta(days=2))
+def fetch_price(
+    zone_key: ZoneKey,
+    session: Session | None = None,
+    target_datetime: datetime | None = None,
+    logger: Logger = getLogger(__name__),
+) -> list:
+    """Gets day-ahead price for specified zone."""
+    if not session:
+        session = Session()
+    return _fetch_price(zone_key, _Documents(session, target_datetime), logger)
+
+
 @refetch_frequency(timedelta(days=2))
 def fetch_generation_forecast(
     zone_key: str,
@@ -1529,5 +1494,129 @@ def fetch_wind_solar_forecasts(
     return parsed.to_list()
 
 
+def _fetch_for_all_zones(
+    fetch: Callable[[str, _Documents, Logger], Any],
+    zone_keys: list[str],
+    queries: Callable[[str], list[tuple[Callable[..., str | None], str]]],
+    session: Session | None,
+    target_datetime: datetime | None,
+    logger: Logger,
+) -> dict[str, Any]:
+    """Calls `fetch` for each of `zone_keys` from a pool of threads, sharing the
+    documents they query.
+
+    The documents listed by `queries` for every zone are all queued before the
+    zones, so that they are queried concurrently and each zone is parsed as
+    soon as its documents are in. A zone failing to parse does not fail the
+    others, its exception is returned in place of its events.
+    """
+    documents = _Documents(session or get_session(), target_datetime)
+    # Each document once, in the order of the zones
+    to_query = list(
+        dict.fromkeys(
+            (query, domain)
+            for zone_key in zone_keys
+            for query, domain in queries(zone_key)
+        )
+    )
+    max_workers = min(
+        max(len(to_query), 1),
+        ENTSOE_CONCURRENCY_PER_TOKEN * _token_count(target_datetime),
+    )
+
+    def prefetch(query: Callable[..., str | None], domain: str):
+        try:
+            documents.get(query, domain)
+        except Exception:
+            # Raised again to the zones of the document
+            pass
+
+    def fetch_zone(zone_key: str) -> Any:
+        try:
+            return fetch(zone_key, documents, logger)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for query, domain in to_query:
+            executor.submit(prefetch, query, domain)
+        return dict(zip(zone_keys, executor.map(fetch_zone, zone_keys)))
+
+
+def _domains(mapping: dict[str, str], zone_keys: list[str]) -> list[str]:
+    # Zones without a domain fail on their own when fetched
+    return [mapping[zone_key] for zone_key in zone_keys if zone_key in mapping]
+
+
+def fetch_production_for_all_zones(
+    session: Session | None = None,
+    target_datetime: datetime | None = None,
+    logger: Logger = getLogger(__name__),
+    zone_keys: list[str] | None = None,
+) -> dict[str, list | Exception]:
+    """Gets the production of `zone_keys`, by default of every zone using
+    `fetch_production`."""
+    return _fetch_for_all_zones(
+        _fetch_production,
+        parser_keys("production", "ENTSOE.fetch_production")
+        if zone_keys is None
+        else zone_keys,
+        lambda zone_key: [
+            (query_production, domain)
+            for domain in _domains(
+                ENTSOE_DOMAIN_MAPPINGS, ZONE_KEY_AGGREGATES.get(zone_key, [zone_key])
+            )
+        ],
+        session,
+        target_datetime,
+        logger,
+    )
+
+
+def fetch_consumption_for_all_zones(
+    session: Session | None = None,
+    target_datetime: datetime | None = None,
+    logger: Logger = getLogger(__name__),
+    zone_keys: list[str] | None = None,
+) -> dict[str, Any]:
+    """Gets the consumption of `zone_keys`, by default of every zone using
+    `fetch_consumption`."""
+    return _fetch_for_all_zones(
+        _fetch_consumption,
+        parser_keys("consumption", "ENTSOE.fetch_consumption")
+        if zone_keys is None
+        else zone_keys,
+        lambda zone_key: [
+            (query, domain)
+            for domain in _domains(ENTSOE_DOMAIN_MAPPINGS, [zone_key])
+            for query in (query_consumption, query_production)
+        ],
+        session,
+        target_datetime,
+        logger,
+    )
+
+
+def fetch_price_for_all_zones(
+    session: Session | None = None,
+    target_datetime: datetime | None = None,
+    logger: Logger = getLogger(__name__),
+    zone_keys: list[str] | None = None,
+) -> dict[str, list | Exception]:
+    """Gets the day-ahead price of `zone_keys`, by default of every zone using
+    `fetch_price`."""
+    return _fetch_for_all_zones(
+        _fetch_price,
+        parser_keys("price", "ENTSOE.fetch_price") if zone_keys is None else zone_keys,
+        lambda zone_key: [
+            (query_price, domain)
+            for domain in _domains(ENTSOE_PRICE_DOMAIN_MAPPINGS, [zone_key])
+        ],
+        session,
+        target_datetime,
+        logger,
+    )
+
+
 if __name__ == "__main__":
     fetch_price(ZoneKey("FR"))
@@ -1,12 +1,14 @@
-from collections.abc import Callable
 from datetime import datetime, timedelta, timezone
 from logging import Logger, getLogger
 from typing import Literal
 
 from requests import Session
 
-from .ENTSOE import fetch_exchange as fetch_ENTSOE_exchange
-from .ENTSOE import fetch_exchange_forecast as fetch_ENTSOE_exchange_forecast
+from electricitymap.contrib.config import ZoneKey
+from electricitymap.contrib.lib.models.event_lists import ExchangeList
+from electricitymap.contrib.lib.models.events import EventSourceType
+
+from .ENTSOE import fetch_net_flows as fetch_ENTSOE_net_flows
 from .lib.config import refetch_frequency
 from .lib.exceptions import ParserException
 
@@ -16,11 +18,6 @@ by wrapping the ENTSOE.py parser and combining the data from the two
 to produce a single data list for the FR-COR->IT-SAR exchange.
 """
 
-EXCHANGE_FUNCTION_MAP: dict[str, Callable] = {
-    "exchange": fetch_ENTSOE_exchange,
-    "exchange_forecast": fetch_ENTSOE_exchange_forecast,
-}
-
 
 def fetch_data(
     zone_key1: str,
@@ -32,60 +29,32 @@ def fetch_data(
 ) -> list[dict]:
     if target_datetime is None:
         target_datetime = datetime.now(timezone.utc)
+    session = session or Session()
+    forecasted = type == "exchange_forecast"
 
     # IT-SACOAC to IT-SAR
-    AC_dataList = EXCHANGE_FUNCTION_MAP[type](
-        zone_key1="FR-COR-AC",
-        zone_key2="IT-SAR",
-        session=session,
-        target_datetime=target_datetime,
-        logger=logger,
+    AC_flows = fetch_ENTSOE_net_flows(
+        "FR-COR-AC", "IT-SAR", session, target_datetime, forecasted=forecasted
     )
     # IT-SACODC to IT-SAR
-    DC_dataList = EXCHANGE_FUNCTION_MAP[type](
-        zone_key1="FR-COR-DC",
-        zone_key2="IT-SAR",
-        session=session,
-        target_datetime=target_datetime,
-        logger=logger,
+    DC_flows = fetch_ENTSOE_net_flows(
+        "FR-COR-DC", "IT-SAR", session, target_datetime, forecasted=forecasted
     )
-    returnList: list[dict] = []
-
-    # Compare the length and datetimes of the two data lists and
-    # if they are the same combine the data from the two lists.
-    if (
-        len(AC_dataList) == len(DC_dataList)
-        and AC_dataList[0]["datetime"] == DC_dataList[0]["datetime"]
-        and AC_dataList[-1]["datetime"] == DC_dataList[-1]["datetime"]
-    ):
-        logger.info("Clean match! Merging data with zip")
-        for AC, DC in zip(AC_dataList, DC_dataList):
-            returnList.append(
-                {
-                    "datetime": AC["datetime"],
-                    "netFlow": AC["netFlow"] + DC["netFlow"],
-                    "sortedZoneKeys": "FR-COR->IT-SAR",
-                    "source": AC["source"],
-                }
-            )
 
-    # Parse values from the two lists and loop over them to find missing datetimes
-    # if the two lists are not of equal length and do not have the same datetimes.
-    else:
-        logger.info("Data mismatch! Looping over both lists to match datetimes")
-        for AC_data in AC_dataList:
-            for DC_data in DC_dataList:
-                if AC_data["datetime"] == DC_data["datetime"]:
-                    returnList.append(
-                        {
-                            "datetime": AC_data["datetime"],
-                            "netFlow": AC_data["netFlow"] + DC_data["netFlow"],
-                            "sortedZoneKeys": "FR-COR->IT-SAR",
-                            "source": AC_data["source"],
-                        }
-                    )
-    if returnList != []:
-        return returnList
+    # Only the datetimes of both links are combined.
+    exchanges = ExchangeList(logger)
+    for dt in sorted(AC_flows.keys() & DC_flows.keys()):
+        exchanges.append(
+            zoneKey=ZoneKey("FR-COR->IT-SAR"),
+            datetime=dt,
+            source="entsoe.eu",
+            netFlow=AC_flows[dt] + DC_flows[dt],
+            sourceType=EventSourceType.forecasted
+            if forecasted
+            else EventSourceType.measured,
+        )
+    if exchanges.events:
+        return exchanges.to_list()
     else:
         raise ParserException(
             parser="FR-COR_IT-SAR.py",
@@ -2,14 +2,12 @@ from datetime import datetime
 from logging import Logger, getLogger
 from zoneinfo import ZoneInfo
 
-import cv2
 import numpy as np
-import pytesseract
-from imageio import imread
 from PIL import Image, ImageOps
 from requests import Session
 
 from .lib.exceptions import ParserException
+from .lib.ocr import image_to_string
 
 url = "https://mahasldc.in/wp-content/reports/sldc/mvrreport3.jpg"
 
@@ -103,6 +101,8 @@ CS = [
 
 # converts image into a black and white
 def RGBtoBW(pil_image):
+    import cv2
+
     # pylint: disable=no-member
     image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2GRAY)
     image = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)[1]
@@ -148,6 +148,8 @@ def fetch_production(
         "source": "mahasldc.in",
     }
 
+    from imageio import imread
+
     image = imread(url)
     # In certain scenario, the URL returns a blank image. Let's verify if the image was read is of proper size
     if image.size == 0:
@@ -165,9 +167,7 @@ def fetch_production(
 
     # for each location, convert the image to a float integer and add it in the map corresponding to the key
     for index, key in enumerate(locations):
-        digit_text = pytesseract.image_to_string(
-            imgs[index], lang="digits_comma", config="--psm 7"
-        )
+        digit_text = image_to_string(imgs[index], lang="digits_comma", config="--psm 7")
         try:
             val = float(digit_text)
         except ValueError:
@@ -9,12 +9,12 @@ from urllib.request import Request, urlopen
 import arrow
 from bs4 import BeautifulSoup
 from PIL import Image
-from pytesseract import image_to_string
 
 # The request library is used to fetch content through HTTP
 from requests import Session
 
 from .JP import fetch_production as JP_fetch_production
+from .lib.ocr import image_to_string
 
 # please try to write PEP8 compliant code (use a linter). One of PEP8's
 # requirement is to limit your line length to 79 characters.
@@ -1,4 +1,5 @@
 from collections import defaultdict
+from collections.abc import Callable
 from datetime import datetime
 from logging import Logger, getLogger
 from typing import Any
@@ -12,6 +13,8 @@ from electricitymap.contrib.lib.models.event_lists import (
 from electricitymap.contrib.lib.models.events import ProductionMix
 from electricitymap.contrib.lib.types import ZoneKey
 
+from .lib.batching import parser_keys
+
 URL = "http://tr.ons.org.br/Content/GetBalancoEnergetico/null"
 SOURCE = "ons.org.br"
 
@@ -79,6 +82,18 @@ def production_processor(
     return dt, production
 
 
+def _production_list(json_data: dict, zone_key: ZoneKey, logger: Logger):
+    date, production = production_processor(json_data, zone_key)
+    productions = ProductionBreakdownList(logger)
+    productions.append(
+        zoneKey=zone_key,
+        datetime=date,
+        source=SOURCE,
+        production=production,
+    )
+    return productions.to_list()
+
+
 def fetch_production(
     zone_key: ZoneKey,
     session: Session | None = None,
@@ -89,17 +104,48 @@ def fetch_production(
     if target_datetime:
         raise NotImplementedError("This parser is not yet able to parse past dates")
 
-    data = get_data(session)
-    date, production = production_processor(data, zone_key)
-    productions = ProductionBreakdownList(logger)
-    productions.append(
-        zoneKey=zone_key,
-        datetime=date,
-        source=SOURCE,
-        production=production,
-    )
+    return _production_list(get_data(session), zone_key, logger)
+
+
+def _for_all_zones(
+    events: Callable[[dict, ZoneKey, Logger], list[dict[str, Any]]],
+    keys: list[str],
+    session: Session | None,
+    logger: Logger,
+) -> dict[ZoneKey, list[dict[str, Any]] | Exception]:
+    """Calls `events` for each of `keys` on a single download of the data.
+
+    A zone failing to parse does not fail the others, its exception is returned
+    in place of its events, as is the exception of a failed download.
+    """
+    try:
+        data = get_data(session)
+    except Exception as e:
+        return {ZoneKey(key): e for key in keys}
+    results = {}
+    for key in keys:
+        try:
+            results[ZoneKey(key)] = events(data, ZoneKey(key), logger)
+        except Exception as e:
+            results[ZoneKey(key)] = e
+    return results
+
+
+def fetch_production_for_all_zones(
+    session: Session | None = None,
+    target_datetime: datetime | None = None,
+    logger: Logger = getLogger(__name__),
+) -> dict[ZoneKey, list[dict[str, Any]] | Exception]:
+    """Requests the last known production mix (in MW) of every region at once."""
+    if target_datetime:
+        raise NotImplementedError("This parser is not yet able to parse past dates")
 
-    return productions.to_list()
+    return _for_all_zones(
+        _production_list,
+        parser_keys("production", "ONS.fetch_production"),
+        session,
+        logger,
+    )
 
 
 def get_exchange_flow(sorted_zone_keys: ZoneKey, raw_data: dict) -> float:
@@ -108,6 +154,18 @@ def get_exchange_flow(sorted_zone_keys: ZoneKey, raw_data: dict) -> float:
     return raw_data[level][name] * flow
 
 
+def _exchange_list(raw_data: dict, sorted_zone_keys: ZoneKey, logger: Logger):
+    dt = datetime.fromisoformat(raw_data["Data"])
+    exchanges = ExchangeList(logger)
+    exchanges.append(
+        zoneKey=sorted_zone_keys,
+        datetime=dt,
+        source=SOURCE,
+        netFlow=get_exchange_flow(sorted_zone_keys, raw_data),
+    )
+    return exchanges.to_list()
+
+
 def fetch_exchange(
     zone_key1: str,
     zone_key2: str,
@@ -119,19 +177,22 @@ def fetch_exchange(
     if target_datetime:
         raise NotImplementedError("This parser is not yet able to parse past dates")
 
-    data = get_data(session)
-    dt = datetime.fromisoformat(data["Data"])
     sorted_zone_keys = ZoneKey("->".join(sorted([zone_key1, zone_key2])))
-    exchanges = ExchangeList(logger)
+    return _exchange_list(get_data(session), sorted_zone_keys, logger)
 
-    net_flow = get_exchange_flow(sorted_zone_keys, data)
-    exchanges.append(
-        zoneKey=sorted_zone_keys,
-        datetime=dt,
-        source=SOURCE,
-        netFlow=net_flow,
+
+def fetch_exchange_for_all_zones(
+    session: Session | None = None,
+    target_datetime: datetime | None = None,
+    logger: Logger = getLogger(__name__),
+) -> dict[ZoneKey, list[dict[str, Any]] | Exception]:
+    """Requests the last known power exchange (in MW) of every exchange at once."""
+    if target_datetime:
+        raise NotImplementedError("This parser is not yet able to parse past dates")
+
+    return _for_all_zones(
+        _exchange_list, parser_keys("exchange", "ONS.fetch_exchange"), session, logger
     )
-    return exchanges.to_list()
 
 
 if __name__ == "__main__":
@@ -1,4 +1,4 @@
-from collections.abc import Mapping
+from collections.abc import Callable, Mapping
 from datetime import datetime, timedelta
 from logging import Logger, getLogger
 
@@ -175,6 +175,7 @@ def fetch_main_price_df(
     session: Session | None = None,
     target_datetime: datetime | None = None,
     logger: Logger = getLogger(__name__),
+    datasets: list | None = None,
 ) -> pd.DataFrame:
     return _fetch_main_df(
         "price",
@@ -183,6 +184,7 @@ def fetch_main_price_df(
         session=session,
         target_datetime=target_datetime,
         logger=logger,
+        datasets=datasets,
     )[0]
 
 
@@ -192,6 +194,7 @@ def fetch_main_power_df(
     session: Session | None = None,
     target_datetime: datetime | None = None,
     logger: Logger = getLogger(__name__),
+    datasets: list | None = None,
 ) -> tuple[pd.DataFrame, list]:
     df, filtered_datasets = _fetch_main_df(
         "power",
@@ -200,12 +203,22 @@ def fetch_main_power_df(
         session=session,
         target_datetime=target_datetime,
         logger=logger,
+        datasets=datasets,
     )
     # Solar rooftop is a special case
     df = process_solar_rooftop(df)
     return df, filtered_datasets
 
 
+def _fetch_datasets(url: str, session: Session | None, logger: Logger) -> list:
+    # Fetches the last week of data
+    logger.info(f"Requesting {url}..")
+    r = (session or requests).get(url)
+    r.raise_for_status()
+    logger.debug("Parsing JSON..")
+    return r.json()["data"]
+
+
 def _fetch_main_df(
     data_type,
     zone_key: str,
@@ -213,21 +226,19 @@ def _fetch_main_df(
     session: Session,
     target_datetime: datetime,
     logger: Logger,
+    datasets: list | None = None,
 ) -> tuple[pd.DataFrame, list]:
+    """Returns the datasets of a zone or exchange, fetched unless the `datasets`
+    of its URL are given."""
     region = ZONE_KEY_TO_REGION.get(zone_key)
-    url = generate_url(
-        zone_key=zone_key or sorted_zone_keys[0],
-        is_flow=sorted_zone_keys is not None,
-        target_datetime=target_datetime,
-        logger=logger,
-    )
-
-    # Fetches the last week of data
-    logger.info(f"Requesting {url}..")
-    r = (session or requests).get(url)
-    r.raise_for_status()
-    logger.debug("Parsing JSON..")
-    datasets = r.json()["data"]
+    if datasets is None:
+        url = generate_url(
+            zone_key=zone_key or sorted_zone_keys[0],
+            is_flow=sorted_zone_keys is not None,
+            target_datetime=target_datetime,
+            logger=logger,
+        )
+        datasets = _fetch_datasets(url, session, logger)
     logger.debug("Filtering datasets..")
 
     def filter_dataset(ds: dict) -> bool:
@@ -263,12 +274,23 @@ def fetch_production(
     session: Session | None = None,
     target_datetime: Session | None = None,
     logger: Logger = getLogger(__name__),
+):
+    return _fetch_production(zone_key, session, target_datetime, logger)
+
+
+def _fetch_production(
+    zone_key: str | None,
+    session: Session | None,
+    target_datetime: datetime | None,
+    logger: Logger,
+    datasets: list | None = None,
 ):
     df, filtered_datasets = fetch_main_power_df(
         zone_key=zone_key,
         session=session,
         target_datetime=target_datetime,
         logger=logger,
+        datasets=datasets,
     )
     region = ZONE_KEY_TO_REGION.get(zone_key)
     if region:
@@ -352,12 +374,23 @@ def fetch_price(
     session: Session | None = None,
     target_datetime: datetime | None = None,
     logger: Logger = getLogger(__name__),
+) -> list:
+    return _fetch_price(zone_key, session, target_datetime, logger)
+
+
+def _fetch_price(
+    zone_key: str,
+    session: Session | None,
+    target_datetime: datetime | None,
+    logger: Logger,
+    datasets: list | None = None,
 ) -> list:
     df = fetch_main_price_df(
         zone_key=zone_key,
         session=session,
         target_datetime=target_datetime,
         logger=logger,
+        datasets=datasets,
     )
     df = df.loc[~df["PRICE"].isna()]  # Only keep prices that are defined
     return [
@@ -379,6 +412,17 @@ def fetch_exchange(
     session: Session | None = None,
     target_datetime: Session | None = None,
     logger: Logger = getLogger(__name__),
+) -> list:
+    return _fetch_exchange(zone_key1, zone_key2, session, target_datetime, logger)
+
+
+def _fetch_exchange(
+    zone_key1: str,
+    zone_key2: str,
+    session: Session | None,
+    target_datetime: datetime | None,
+    logger: Logger,
+    datasets: list | None = None,
 ) -> list:
     sorted_zone_keys = sorted([zone_key1, zone_key2])
     key = "->".join(sorted_zone_keys)
@@ -387,6 +431,7 @@ def fetch_exchange(
         session=session,
         target_datetime=target_datetime,
         logger=logger,
+        datasets=datasets,
     )
     direction = EXCHANGE_MAPPING_DICTIONARY[key]["direction"]
 
@@ -404,6 +449,88 @@ def fetch_exchange(
     ]
 
 
+def _fetch_for_all_zones(
+    fetch: Callable[..., list],
+    keys: list[str],
+    is_flow: bool,
+    session: Session | None,
+    target_datetime: datetime | None,
+    logger: Logger,
+) -> dict[str, list | Exception]:
+    """Calls `fetch` for each of `keys`, fetching the datasets of each URL once.
+
+    A zone failing to parse does not fail the others, its exception is returned
+    in place of its events. The exception of a failed download is returned for
+    each zone of its URL.
+    """
+    datasets_by_url: dict[str, list | Exception] = {}
+    results = {}
+    for key in keys:
+        zone_keys = key.split("->")
+        try:
+            url = generate_url(zone_keys[0], is_flow, target_datetime, logger)
+            if url not in datasets_by_url:
+                try:
+                    datasets_by_url[url] = _fetch_datasets(url, session, logger)
+                except Exception as e:
+                    datasets_by_url[url] = e
+            datasets = datasets_by_url[url]
+            if isinstance(datasets, Exception):
+                results[key] = datasets
+            else:
+                results[key] = fetch(
+                    *zone_keys, session, target_datetime, logger, datasets
+                )
+        except Exception as e:
+            results[key] = e
+    return results
+
+
+def fetch_production_for_all_zones(
+    session: Session | None = None,
+    target_datetime: datetime | None = None,
+    logger: Logger = getLogger(__name__),
+) -> dict[str, list | Exception]:
+    return _fetch_for_all_zones(
+        _fetch_production,
+        list(ZONE_KEY_TO_REGION),
+        False,
+        session,
+        target_datetime,
+        logger,
+    )
+
+
+def fetch_price_for_all_zones(
+    session: Session | None = None,
+    target_datetime: datetime | None = None,
+    logger: Logger = getLogger(__name__),
+) -> dict[str, list | Exception]:
+    return _fetch_for_all_zones(
+        _fetch_price,
+        list(ZONE_KEY_TO_REGION),
+        False,
+        session,
+        target_datetime,
+        logger,
+    )
+
+
+def fetch_exchange_for_all_zones(
+    session: Session | None = None,
+    target_datetime: datetime | None = None,
+    logger: Logger = getLogger(__name__),
+) -> dict[str, list | Exception]:
+    return _fetch_for_all_zones(
+        _fetch_exchange,
+        list(EXCHANGE_MAPPING_DICTIONARY),
+        True,
+        session,
+        target_datetime,
+        logger,
+    )
+
+
 if __name__ == "__main__":
     """Main method, never used by the electricityMap backend, but handy for testing."""
     # print(fetch_price('AU-SA'))
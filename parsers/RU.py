@@ -56,6 +56,38 @@ exchange_ids = {
 tz = "Europe/Moscow"
 
 
+SYNCHRONOUS_ZONES = ["RU-1", "RU-2", "RU-AS"]
+
+
+def _sum_production(zones_data: dict[str, list[dict]]) -> list[dict]:
+    """Sums the production of the synchronous zones into the one of RU."""
+    dfs = {}
+    for subzone_key, data in zones_data.items():
+        df = pd.DataFrame(data).set_index("datetime")
+        df_prod = df["production"].apply(pd.Series).fillna(0)
+
+        # Set a 30 minutes frequency
+        if subzone_key in ["RU-1", "RU-2"]:
+            df_30m_index = df_prod.index.union(df_prod.index + pd.Timedelta(minutes=30))
+            df_prod = df_prod.reindex(df_30m_index).ffill()
+
+        dfs[subzone_key] = df_prod
+
+    # Compute the sum
+    df_prod = reduce(lambda x, y: x + y, dfs.values()).dropna()
+
+    # Format to dict
+    df_prod = df_prod.apply(dict, axis=1).reset_index(name="production")
+    df_prod["zoneKey"] = "RU"
+    df_prod["storage"] = [{} for i in range(len(df_prod))]
+    df_prod["source"] = "so-ups.ru"
+    data = df_prod.to_dict("records")
+    for row in data:
+        row["datetime"] = row["datetime"].to_pydatetime()
+
+    return data
+
+
 def fetch_production(
     zone_key: str = "RU",
     session: Session | None = None,
@@ -65,35 +97,14 @@ def fetch_production(
     """Requests the last known production mix (in MW) of a given country."""
     if zone_key == "RU":
         # Get data for all zones
-        dfs = {}
-        for subzone_key in ["RU-1", "RU-2", "RU-AS"]:
-            data = fetch_production(subzone_key, session, target_datetime, logger)
-            df = pd.DataFrame(data).set_index("datetime")
-            df_prod = df["production"].apply(pd.Series).fillna(0)
-
-            # Set a 30 minutes frequency
-            if subzone_key in ["RU-1", "RU-2"]:
-                df_30m_index = df_prod.index.union(
-                    df_prod.index + pd.Timedelta(minutes=30)
+        return _sum_production(
+            {
+                subzone_key: fetch_production(
+                    subzone_key, session, target_datetime, logger
                 )
-                df_prod = df_prod.reindex(df_30m_index).ffill()
-
-            dfs[subzone_key] = df_prod
-
-        # Compute the sum
-        df_prod = reduce(lambda x, y: x + y, dfs.values()).dropna()
-
-        # Format to dict
-        df_prod = df_prod.apply(dict, axis=1).reset_index(name="production")
-        df_prod["zoneKey"] = "RU"
-        df_prod["storage"] = [{} for i in range(len(df_prod))]
-        df_prod["source"] = "so-ups.ru"
-        data = df_prod.to_dict("records")
-        for row in data:
-            row["datetime"] = row["datetime"].to_pydatetime()
-
-        return data
-
+                for subzone_key in SYNCHRONOUS_ZONES
+            }
+        )
     elif zone_key == "RU-1" or zone_key == "RU-2":
         return fetch_production_1st_synchronous_zone(zone_key, session, target_datetime)
     elif zone_key == "RU-AS":
@@ -102,6 +113,20 @@ def fetch_production(
         raise NotImplementedError("This parser is not able to parse given zone")
 
 
+def fetch_production_for_all_zones(
+    session: Session | None = None,
+    target_datetime: datetime | None = None,
+    logger: Logger = getLogger(__name__),
+) -> dict[str, list[dict]]:
+    """Requests the production of the synchronous zones once, and sums them
+    into the one of RU."""
+    zones_data = {
+        subzone_key: fetch_production(subzone_key, session, target_datetime, logger)
+        for subzone_key in SYNCHRONOUS_ZONES
+    }
+    return {**zones_data, "RU": _sum_production(zones_data)}
+
+
 def fetch_production_1st_synchronous_zone(
     zone_key: str = "RU-1",
     session: Session | None = None,
@@ -260,14 +285,23 @@ def response_checker(json_content) -> bool:
     return non_zero
 
 
-def fetch_exchange(
-    zone_key1: str,
-    zone_key2: str,
-    session: Session | None = None,
-    target_datetime: datetime | None = None,
-    logger: Logger = getLogger(__name__),
-) -> list:
-    """Requests the last known power exchange (in MW) between two zones."""
+def _exchange_id(zone_key1: str, zone_key2: str) -> tuple[str, int, int]:
+    """Returns the sorted zone keys, id and direction of an exchange."""
+    sortedcodes = "->".join(sorted([zone_key1, zone_key2]))
+    reversesortedcodes = "->".join(sorted([zone_key1, zone_key2], reverse=True))
+
+    if sortedcodes in exchange_ids.keys():
+        return sortedcodes, exchange_ids[sortedcodes], 1
+    elif reversesortedcodes in exchange_ids.keys():
+        return sortedcodes, exchange_ids[reversesortedcodes], -1
+    else:
+        raise NotImplementedError("This exchange pair is not implemented.")
+
+
+def _fetch_flows(
+    session: Session | None, target_datetime: datetime | None
+) -> tuple[arrow.Arrow, list[tuple[list[dict], int]]]:
+    """Requests the flows of every exchange, per hour of the day fetched."""
     if target_datetime:
         today = arrow.get(target_datetime, "YYYYMMDD")
     else:
@@ -300,17 +334,16 @@ def fetch_exchange(
             # data not yet available for this hour
             continue
 
-    sortedcodes = "->".join(sorted([zone_key1, zone_key2]))
-    reversesortedcodes = "->".join(sorted([zone_key1, zone_key2], reverse=True))
+    return today, datapoints
 
-    if sortedcodes in exchange_ids.keys():
-        exchange_id = exchange_ids[sortedcodes]
-        direction = 1
-    elif reversesortedcodes in exchange_ids.keys():
-        exchange_id = exchange_ids[reversesortedcodes]
-        direction = -1
-    else:
-        raise NotImplementedError("This exchange pair is not implemented.")
+
+def _exchange_list(
+    zone_key1: str,
+    zone_key2: str,
+    today: arrow.Arrow,
+    datapoints: list[tuple[list[dict], int]],
+) -> list:
+    sortedcodes, exchange_id, direction = _exchange_id(zone_key1, zone_key2)
 
     data = []
     for datapoint, hour in datapoints:
@@ -335,6 +368,34 @@ def fetch_exchange(
     return data
 
 
+def fetch_exchange(
+    zone_key1: str,
+    zone_key2: str,
+    session: Session | None = None,
+    target_datetime: datetime | None = None,
+    logger: Logger = getLogger(__name__),
+) -> list:
+    """Requests the last known power exchange (in MW) between two zones."""
+    _exchange_id(zone_key1, zone_key2)
+    today, datapoints = _fetch_flows(session, target_datetime)
+    return _exchange_list(zone_key1, zone_key2, today, datapoints)
+
+
+def fetch_exchange_for_all_zones(
+    session: Session | None = None,
+    target_datetime: datetime | None = None,
+    logger: Logger = getLogger(__name__),
+) -> dict[str, list]:
+    """Requests the flows once for every exchange, keyed by sorted zone keys."""
+    today, datapoints = _fetch_flows(session, target_datetime)
+    exchanges = {}
+    for exchange in exchange_ids:
+        zone_key1, zone_key2 = exchange.split("->")
+        sortedcodes = "->".join(sorted([zone_key1, zone_key2]))
+        exchanges[sortedcodes] = _exchange_list(zone_key1, zone_key2, today, datapoints)
+    return exchanges
+
+
 if __name__ == "__main__":
     print("fetch_production() ->")
     print(fetch_production())
@@ -7,9 +7,10 @@ from logging import Logger, getLogger
 
 import arrow
 from PIL import Image, ImageOps
-from pytesseract import image_to_string
 from requests import Session
 
+from .lib.ocr import image_to_string
+
 TIMEZONE = "Asia/Singapore"
 
 TICKER_URL = "https://www.emcsg.com/ChartServer/blue/ticker"
@@ -15,9 +15,13 @@ from requests import Response, Session
 
 from parsers.lib.config import refetch_frequency
 from parsers.lib.exceptions import ParserException
+from parsers.lib.ratelimit import get_rate_limiter
 
 # Used for consumption forecast data.
 API_ENDPOINT = "https://api.pjm.com/api/v1/"
+# Data Miner allows 6 requests per minute to non-members.
+API_RATE_PER_KEY = 6 / 60
+API_BURST_PER_KEY = 6
 # Used for both production and price data.
 url = "http://www.pjm.com/markets-and-operations.aspx"
 
@@ -78,12 +82,23 @@ def get_api_subscription_key(session: Session) -> str:
 def fetch_api_data(kind: str, params: dict, session: Session) -> list:
     headers = {
         "Host": "api.pjm.com",
-        "Ocp-Apim-Subscription-Key": get_api_subscription_key(session=session),
         "Origin": "http://dataminer2.pjm.com",
         "Referer": "http://dataminer2.pjm.com/",
     }
+    limiter = get_rate_limiter(
+        "US_PJM",
+        [get_api_subscription_key(session=session)],
+        API_RATE_PER_KEY,
+        API_BURST_PER_KEY,
+    )
     url = API_ENDPOINT + kind
-    resp: Response = session.get(url=url, params=params, headers=headers)
+    resp: Response = limiter.request(
+        lambda key: session.get(
+            url=url,
+            params=params,
+            headers={**headers, "Ocp-Apim-Subscription-Key": key},
+        )
+    )
     if resp.status_code == 200:
         data = resp.json()
         return data
@@ -0,0 +1,116 @@
+"""Single writer archive sink for fetch results.
+
+Fetch workers hand their output over to a bounded queue and return straight
+away, while a dedicated thread keeps one zip archive open for the whole run and
+compresses the entries as they arrive.
+"""
+
+from queue import Queue
+from threading import Thread
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+
+CODECS = ["deflate", "zstd", "none"]
+DEFAULT_QUEUE_SIZE = 256
+
+_STOP = object()
+
+
+def _zstd_compressor():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError(
+            "The zstd codec requires the `zstandard` package, installed with the "
+            "`archive` extra (`poetry install -E archive`)."
+        ) from e
+    return zstandard.ZstdCompressor()
+
+
+def check_codec(codec: str):
+    """Raises if `codec` is unknown or its package is not installed."""
+    if codec not in CODECS:
+        raise ValueError(f"Unknown codec {codec}, expected one of {CODECS}")
+    if codec == "zstd":
+        _zstd_compressor()
+
+
+class ArchiveWriter:
+    """Streams entries into a zip archive from a dedicated thread.
+
+    With the `zstd` codec the entries are compressed with zstandard, stored
+    as-is in the archive and suffixed with `.zst` since zip readers don't
+    support zstd natively.
+
+    Usage:
+        with ArchiveWriter("run.zip", codec="deflate") as archive:
+            archive.write("FR_production.txt", data)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        codec: str = "deflate",
+        max_queue_size: int = DEFAULT_QUEUE_SIZE,
+    ):
+        check_codec(codec)
+        self.path = path
+        self.codec = codec
+        self._compressor = _zstd_compressor() if codec == "zstd" else None
+        self._queue: Queue = Queue(maxsize=max_queue_size)
+        self._thread = Thread(target=self._run, name="archive-writer", daemon=True)
+        self._error: BaseException | None = None
+        self._closed = False
+        self.entries = 0
+
+    def __enter__(self) -> "ArchiveWriter":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self):
+        self._thread.start()
+
+    def write(self, name: str, data: str | bytes):
+        """Queues an entry. Only blocks when the queue is full."""
+        if self._closed:
+            # e.g. a job abandoned after its deadline returning late.
+            raise RuntimeError(f"Archive writer for {self.path} is closed")
+        if self._error is not None:
+            raise RuntimeError(f"Archive writer for {self.path} failed") from (
+                self._error
+            )
+        self._queue.put((name, data))
+
+    def close(self):
+        """Flushes the queued entries and closes the archive."""
+        self._closed = True
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        if self._error is not None:
+            raise RuntimeError(f"Archive writer for {self.path} failed") from (
+                self._error
+            )
+
+    def _run(self):
+        compression = ZIP_DEFLATED if self.codec == "deflate" else ZIP_STORED
+        try:
+            with ZipFile(self.path, "a", compression=compression) as archive:
+                while True:
+                    item = self._queue.get()
+                    if item is _STOP:
+                        return
+                    name, data = item
+                    if isinstance(data, str):
+                        data = data.encode("utf-8")
+                    if self._compressor is not None:
+                        name, data = f"{name}.zst", self._compressor.compress(data)
+                    archive.writestr(name, data)
+                    self.entries += 1
+        except BaseException as e:
+            self._error = e
+            # Keep draining so that producers never block on a dead writer.
+            while self._queue.get() is not _STOP:
+                pass
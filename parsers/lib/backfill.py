@@ -0,0 +1,101 @@
+"""Helpers to backfill historical data by calling parsers over a date range.
+
+A parser called with a `target_datetime` returns the data of the
+`REFETCH_FREQUENCY` window ending at that datetime, so a date range is covered
+by calling it once per window. Completed windows are checkpointed on disk so an
+interrupted backfill can be resumed, and overlapping windows are deduplicated
+on datetime and event identity before the final output is written.
+"""
+
+import json
+import os
+from collections.abc import Callable, Iterable
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from parsers.lib.serializers import JsonLinesSerializer
+
+DEFAULT_REFETCH_FREQUENCY = timedelta(days=1)
+
+# Fields telling apart the events of a same datetime, e.g. the units of a
+# production per unit window or the zones of a multi-zone parser.
+EVENT_IDENTITY_FIELDS = ("zoneKey", "sortedZoneKeys", "unitKey")
+
+
+def refetch_frequency_of(parser: Callable) -> timedelta:
+    return getattr(parser, "REFETCH_FREQUENCY", None) or DEFAULT_REFETCH_FREQUENCY
+
+
+def split_windows(
+    start: datetime, end: datetime, frequency: timedelta
+) -> list[datetime]:
+    """Returns the target datetimes covering [start, end] with `frequency` windows.
+
+    Windows are anchored on `end` so that the most recent one ends exactly there.
+    """
+    assert start <= end, "start must be before end"
+    assert frequency > timedelta(0), "frequency must be positive"
+    targets = []
+    target = end
+    while target > start:
+        targets.append(target)
+        target -= frequency
+    return sorted(targets) or [end]
+
+
+def event_key(event: dict[str, Any]) -> tuple:
+    """Returns the key identifying `event` among the events of every window."""
+    return (event["datetime"], *(event.get(f) for f in EVENT_IDENTITY_FIELDS))
+
+
+def deduplicate(windows: Iterable[list[dict[str, Any]]]) -> list[dict[str, Any]]:
+    """Merges the events of several windows, keeping one event per datetime and
+    identity (`EVENT_IDENTITY_FIELDS`).
+
+    Windows must be given from the oldest to the most recent: when windows
+    overlap, the event from the most recent window wins.
+    """
+    events: dict[tuple, dict[str, Any]] = {}
+    for window in windows:
+        for event in window:
+            events[event_key(event)] = event
+    # Sorting is stable, the events of a datetime keep their window order.
+    return sorted(events.values(), key=lambda event: event["datetime"])
+
+
+def _parse_event(line: str) -> dict[str, Any]:
+    event = json.loads(line)
+    event["datetime"] = datetime.fromisoformat(event["datetime"])
+    return event
+
+
+class BackfillCheckpoint:
+    """Stores the output of every completed window under `directory`.
+
+    Each window is written to its own JSON Lines file, which is atomically
+    moved in place once complete, so its existence marks the window as done.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def _path(self, zone_key: str, data_type: str, target: datetime) -> Path:
+        name = target.strftime("%Y%m%dT%H%M%S%z")
+        return self.directory / zone_key / data_type / f"{name}.jsonl"
+
+    def is_done(self, zone_key: str, data_type: str, target: datetime) -> bool:
+        return self._path(zone_key, data_type, target).exists()
+
+    def save(self, zone_key: str, data_type: str, target: datetime, res):
+        path = self._path(zone_key, data_type, target)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(JsonLinesSerializer().serialize(data_type, res))
+        os.replace(tmp_path, path)
+
+    def load(
+        self, zone_key: str, data_type: str, target: datetime
+    ) -> list[dict[str, Any]]:
+        with open(self._path(zone_key, data_type, target), encoding="utf-8") as f:
+            return [_parse_event(line) for line in f if line.strip()]
@@ -0,0 +1,129 @@
+"""Batch entry points of parsers computing many zones from one upstream fetch.
+
+Next to a `fetch_<data>` function, a parser module can declare a
+`fetch_<data>_for_all_zones(session, target_datetime, logger)` entry point
+(named like the `fetch_production_capacity_for_all_zones` of the capacity
+parsers), returning the events of every zone or exchange it covers keyed by
+zone key (sorted zone keys for exchanges). The events of a zone which failed
+to parse can be replaced by the exception raised, so that only its job fails.
+
+During a run, the jobs of the zones using such a parser share a single call of
+its batch entry point through `BatchCalls`, and each job only keeps the events
+of its own zone. Entry points querying every zone separately (e.g. ENTSOE) can
+also accept a `zone_keys` argument, the keys of the jobs of the run they serve,
+so that they only fetch those.
+"""
+
+import importlib
+import inspect
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future
+from datetime import datetime
+from logging import Logger, getLogger
+from threading import Lock
+from typing import Any
+
+from requests import Session
+
+from parsers.lib.parsers import PARSER_KEY_TO_DICT
+
+BATCH_SUFFIX = "_for_all_zones"
+
+# The capacity parsers have their own `*_for_all_zones` entry points, called
+# with other arguments, and are not fetched by jobs.
+UNBATCHED_DATA_TYPES = {"productionCapacity"}
+
+BatchParser = Callable[..., dict[str, Any]]
+
+
+def _parser_path(data_type: str, key: str) -> str | None:
+    if data_type in UNBATCHED_DATA_TYPES:
+        return None
+    parsers = PARSER_KEY_TO_DICT.get(data_type)
+    if parsers is None or key not in parsers:
+        return None
+    return parsers.path(key)
+
+
+def batch_parser(data_type: str, key: str) -> BatchParser | None:
+    """Returns the batch entry point of the parser of `key`, if it has one."""
+    path = _parser_path(data_type, key)
+    if path is None:
+        return None
+    module_name, function_name = path.split(".")
+    parser_folder = PARSER_KEY_TO_DICT[data_type].parser_folder
+    module = importlib.import_module(f"{parser_folder}.{module_name}")
+    return getattr(module, function_name + BATCH_SUFFIX, None)
+
+
+def parser_keys(data_type: str, path: str) -> list[str]:
+    """Returns the keys whose `data_type` parser is `path` (`module.function`)."""
+    parsers = PARSER_KEY_TO_DICT[data_type]
+    return [key for key in parsers if parsers.path(key) == path]
+
+
+class BatchCalls:
+    """Results of the batch entry points called during a run.
+
+    The first job of a batch calls its entry point, concurrent and later jobs
+    of the same batch (same entry point and target datetime) wait for and
+    reuse its result. A failed call fails every job of the batch.
+
+    `jobs` are the (key, data type) of the jobs of the run, passed as
+    `zone_keys` to the entry points accepting it.
+    """
+
+    def __init__(self, jobs: Iterable[tuple[str, str]] | None = None):
+        self._lock = Lock()
+        self._calls: dict[tuple[BatchParser, datetime | None], Future] = {}
+        self._jobs = None if jobs is None else list(jobs)
+
+    def _zone_keys(self, batch: BatchParser) -> list[str] | None:
+        if self._jobs is None:
+            return None
+        # Matched on the parser paths, without importing the parsers of every job
+        module_name = batch.__module__.rpartition(".")[2]
+        path = f"{module_name}.{batch.__name__.removesuffix(BATCH_SUFFIX)}"
+        return [
+            key for key, data_type in self._jobs if _parser_path(data_type, key) == path
+        ]
+
+    def call(
+        self,
+        batch: BatchParser,
+        key: str,
+        session: Session | None = None,
+        target_datetime: datetime | None = None,
+        logger: Logger = getLogger(__name__),
+    ) -> Any:
+        """Returns the events of `key` in the results of `batch`, or an empty
+        list when the batch has none. Raises the exception of `key` if its
+        events failed to parse."""
+        with self._lock:
+            future = self._calls.get((batch, target_datetime))
+            owner = future is None
+            if owner:
+                future = self._calls[(batch, target_datetime)] = Future()
+        if owner:
+            kwargs = {}
+            if "zone_keys" in inspect.signature(batch).parameters:
+                kwargs["zone_keys"] = self._zone_keys(batch)
+            try:
+                future.set_result(
+                    batch(
+                        session=session,
+                        target_datetime=target_datetime,
+                        logger=logger,
+                        **kwargs,
+                    )
+                )
+            except BaseException as e:
+                future.set_exception(e)
+        events = future.result().get(key, [])
+        if isinstance(events, Exception):
+            raise events
+        return events
+
+    def clear(self):
+        with self._lock:
+            self._calls.clear()
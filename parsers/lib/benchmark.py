@@ -0,0 +1,174 @@
+"""Offline benchmarks of parsers, replaying recorded payloads.
+
+A `BenchmarkCase` prepares a parser call against mocked upstreams (see
+`parsers.test.benchmarks`), which `run_case` times over several runs and
+runs once more under tracemalloc to measure its peak memory. Results are
+compared to a baseline, and a case is a regression when its time or peak
+memory grows by more than the threshold and by more than the noise floor
+(`DEFAULT_MIN_SECONDS`, `DEFAULT_MIN_BYTES`), as the median of millisecond
+runs easily varies by a third.
+
+Timings depend on the machine, so the baseline is not committed: it is
+recorded by the first run on a machine (or CI runner), and the cases missing
+from it are added as they are run.
+"""
+
+import json
+import os
+import statistics
+import tracemalloc
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+
+DEFAULT_REPEAT = 5
+# Relative increase of time or peak memory over the baseline failing a case.
+DEFAULT_THRESHOLD = 0.25
+# Increases of time or peak memory under these never fail a case.
+DEFAULT_MIN_SECONDS = 0.01
+DEFAULT_MIN_BYTES = 64 * 1024
+
+
+@dataclass
+class BenchmarkCase:
+    """A parser call to benchmark.
+
+    `setup` is called once, outside of the measures, and returns the function
+    to benchmark, e.g. a `fetch_*` call on a session mocking the upstream.
+    Both are called with the environment variables `env` set. Slow cases are
+    only run on demand.
+    """
+
+    name: str
+    setup: Callable[[], Callable[[], Any]]
+    env: dict[str, str] = field(default_factory=dict)
+    slow: bool = False
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    # Median wall clock time of a run
+    seconds: float
+    # Peak memory allocated by a run
+    peak_bytes: int
+    # Number of events returned by a run
+    events: int
+
+
+@dataclass
+class Regression:
+    name: str
+    metric: str
+    baseline: float
+    value: float
+
+    @property
+    def ratio(self) -> float:
+        return self.value / self.baseline if self.baseline else float("inf")
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name}: {self.metric} {self.value:.6g} vs {self.baseline:.6g} "
+            f"in the baseline (x{self.ratio:.2f})"
+        )
+
+
+def _count_events(result: Any) -> int:
+    if result is None:
+        return 0
+    if isinstance(result, dict):
+        return 1
+    return len(result)
+
+
+@contextmanager
+def _environ(env: dict[str, str]) -> Iterator[None]:
+    previous = {key: os.environ.get(key) for key in env}
+    os.environ.update(env)
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                del os.environ[key]
+            else:
+                os.environ[key] = value
+
+
+def run_case(case: BenchmarkCase, repeat: int = DEFAULT_REPEAT) -> BenchmarkResult:
+    assert repeat >= 1, "repeat must be at least 1"
+    with _environ(case.env):
+        return _run_case(case, repeat)
+
+
+def _run_case(case: BenchmarkCase, repeat: int) -> BenchmarkResult:
+    run = case.setup()
+    # Warm up, so that imports and caches don't count in the first run.
+    events = _count_events(run())
+    times = []
+    for _ in range(repeat):
+        started = perf_counter()
+        run()
+        times.append(perf_counter() - started)
+    # Measured apart as tracing allocations slows the run down.
+    tracemalloc.start()
+    try:
+        run()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return BenchmarkResult(case.name, statistics.median(times), peak_bytes, events)
+
+
+def run_cases(
+    cases: Iterable[BenchmarkCase], repeat: int = DEFAULT_REPEAT
+) -> list[BenchmarkResult]:
+    return [run_case(case, repeat) for case in cases]
+
+
+def compare(
+    results: Iterable[BenchmarkResult],
+    baseline: dict[str, dict[str, Any]],
+    threshold: float = DEFAULT_THRESHOLD,
+    min_seconds: float = DEFAULT_MIN_SECONDS,
+    min_bytes: int = DEFAULT_MIN_BYTES,
+) -> list[Regression]:
+    """Returns the cases slower or using more memory than the baseline allows:
+    by more than `threshold` times the baseline, and more than `min_seconds`
+    or `min_bytes`.
+
+    Cases missing from the baseline are not compared.
+    """
+    floors = {"seconds": min_seconds, "peak_bytes": min_bytes}
+    regressions = []
+    for result in results:
+        if result.name not in baseline:
+            continue
+        for metric, floor in floors.items():
+            expected = baseline[result.name][metric]
+            value = getattr(result, metric)
+            if value > expected * (1 + threshold) and value - expected > floor:
+                regressions.append(Regression(result.name, metric, expected, value))
+    return regressions
+
+
+def read_baseline(path: str | Path) -> dict[str, dict[str, Any]]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def write_baseline(path: str | Path, results: Iterable[BenchmarkResult]):
+    """Updates the baseline of the given cases, keeping the other ones."""
+    baseline = read_baseline(path)
+    for result in results:
+        baseline[result.name] = {k: v for k, v in asdict(result).items() if k != "name"}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(dict(sorted(baseline.items())), f, indent=2)
+        f.write("\n")
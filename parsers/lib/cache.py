@@ -0,0 +1,115 @@
+"""Response cache shared by all the parsers of a single fetch run.
+
+Many parsers download the exact same document for different zones or exchanges
+(e.g. ONS returns all the Brazilian regions in one JSON, ENTSOE consumption
+re-queries the production document). Passing a `CachedSession` as the `session`
+argument of every parser makes each of those documents download only once.
+"""
+
+from copy import copy
+from datetime import timedelta
+from threading import Event, Lock
+from time import monotonic
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from requests import Request, Response
+
+from parsers.lib.session import DEFAULT_REQUEST_TIMEOUT, PooledSession
+
+# Parameters that differ between otherwise identical requests (e.g. because
+# API tokens are rotated) and must not be part of the cache key.
+CACHE_IGNORED_PARAMS = {"securityToken", "api_key"}
+CACHEABLE_METHODS = {"GET"}
+DEFAULT_CACHE_TTL = timedelta(minutes=5)
+
+
+class _CacheEntry:
+    def __init__(self):
+        self.ready = Event()
+        self.response: Response | None = None
+        self.expires_at: float | None = None
+
+
+def cache_key(method: str, url: str, params=None) -> tuple[str, str]:
+    """Returns the key identifying a request, ignoring `CACHE_IGNORED_PARAMS`."""
+    prepared_url = Request(method.upper(), url, params=params).prepare().url or url
+    parts = urlsplit(prepared_url)
+    query = [
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k not in CACHE_IGNORED_PARAMS
+    ]
+    return method.upper(), urlunsplit(parts._replace(query=urlencode(sorted(query))))
+
+
+class CachedSession(PooledSession):
+    """A `Session` that shares successful GET responses for `ttl`.
+
+    Concurrent identical requests are coalesced: the first caller performs the
+    request while the others wait for its response instead of sending their own.
+    Failed requests are never cached so each caller keeps its own error handling.
+    Cache misses go through the per-host connection pools of `PooledSession`.
+    """
+
+    def __init__(
+        self,
+        ttl: timedelta = DEFAULT_CACHE_TTL,
+        timeout: float | None = DEFAULT_REQUEST_TIMEOUT,
+        **kwargs,
+    ):
+        super().__init__(timeout, **kwargs)
+        self.ttl = ttl.total_seconds()
+        self._entries: dict[tuple[str, str], _CacheEntry] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def request(self, method, url, params=None, *args, **kwargs) -> Response:
+        if (
+            method.upper() not in CACHEABLE_METHODS
+            or kwargs.get("stream")
+            or kwargs.get("data")
+            or kwargs.get("json")
+        ):
+            return super().request(method, url, params, *args, **kwargs)
+
+        key = cache_key(method, url, params)
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry.ready.is_set():
+                    if entry.response is not None and entry.expires_at > monotonic():
+                        self.hits += 1
+                        return copy(entry.response)
+                    entry = None
+                if entry is None:
+                    entry = _CacheEntry()
+                    self._entries[key] = entry
+                    self.misses += 1
+                    break
+            # Another thread is already fetching this document.
+            entry.ready.wait()
+
+        try:
+            response = super().request(method, url, params, *args, **kwargs)
+            # Read the body now so that copies handed to other parsers don't
+            # race on the underlying connection.
+            response.content
+            if response.ok:
+                entry.response = response
+                entry.expires_at = monotonic() + self.ttl
+                return copy(response)
+            return response
+        finally:
+            with self._lock:
+                if entry.response is None:
+                    del self._entries[key]
+                entry.ready.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries = {
+                key: entry
+                for key, entry in self._entries.items()
+                if not entry.ready.is_set()
+            }
@@ -0,0 +1,301 @@
+"""Record and replay of the HTTP exchanges of a fetch run.
+
+In record mode, every response received through a session is stored in a
+cassette directory. In replay mode, the session serves the recorded responses
+instead of reaching the upstreams, optionally after a delay per host, so that
+a whole fetch run can be profiled or load-tested offline and reproducibly.
+
+A cassette holds an `index.jsonl` with a line per response (request key,
+status, headers, latency and hash of the body) and the bodies, compressed and
+stored once under `bodies/` by the SHA-256 of their content. Requests are keyed
+by method, URL (ignoring API tokens, see `cache_key`) and body, and identical
+requests are replayed in the order they were recorded, the last response being
+repeated.
+
+The time the recording started is stored in `cassette.json`. Parsers build
+their queries from the current time (e.g. the ENTSOE periods, rounded to the
+hour), so a cassette is replayed with the clock set back to that time, see
+`Cassette.replay_clock`. A cassette should therefore be recorded in one run.
+
+Only requests sent through a session with the cassette installed are recorded,
+see `install_cassette`.
+"""
+
+import hashlib
+import json
+import os
+import random
+import zlib
+from collections import defaultdict
+from collections.abc import Callable
+from contextlib import AbstractContextManager, nullcontext
+from datetime import datetime, timezone
+from io import BytesIO
+from pathlib import Path
+from threading import Lock
+from time import perf_counter, sleep
+from typing import Any
+from urllib.parse import urlsplit
+
+from requests import PreparedRequest, Response
+from requests.adapters import BaseAdapter
+from requests.exceptions import ConnectionError
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from parsers.lib.cache import cache_key
+from parsers.lib.session import PooledSession
+
+RECORD = "record"
+REPLAY = "replay"
+
+# Response headers not recorded: bodies are stored decoded, and cookies could
+# hold credentials.
+IGNORED_HEADERS = {
+    "content-encoding",
+    "content-length",
+    "transfer-encoding",
+    "set-cookie",
+}
+
+
+class CassetteMiss(ConnectionError):
+    """No response was recorded for a replayed request."""
+
+
+def _sha256(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def request_key(request: PreparedRequest) -> str:
+    method, url = cache_key(request.method or "GET", request.url or "")
+    body = request.body or b""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    return f"{method} {url} {_sha256(body) if body else ''}".rstrip()
+
+
+class Cassette:
+    """The recorded responses stored in `directory`."""
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        self._index_path = self.directory.joinpath("index.jsonl")
+        self._meta_path = self.directory.joinpath("cassette.json")
+        self._lock = Lock()
+        self._entries: dict[str, list[dict[str, Any]]] | None = None
+        self._played: dict[str, int] = defaultdict(int)
+
+    def _body_path(self, digest: str) -> Path:
+        return self.directory.joinpath("bodies", digest[:2], digest)
+
+    def start_recording(self):
+        """Stores the time the recording started, unless it already did."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        meta = {"recorded_at": datetime.now(timezone.utc).isoformat()}
+        try:
+            # Only the first process recording in the cassette writes it.
+            fd = os.open(self._meta_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+        except FileExistsError:
+            return
+        try:
+            os.write(fd, json.dumps(meta).encode("utf-8"))
+        finally:
+            os.close(fd)
+
+    @property
+    def recorded_at(self) -> datetime | None:
+        try:
+            meta = json.loads(self._meta_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        return datetime.fromisoformat(meta["recorded_at"])
+
+    def replay_clock(self) -> AbstractContextManager:
+        """Sets the clock back to the time the recording started, from where it
+        keeps ticking, so that requests built from the current time match the
+        recorded ones. Does nothing for cassettes without a recording time."""
+        recorded_at = self.recorded_at
+        if recorded_at is None:
+            return nullcontext()
+        from freezegun import freeze_time
+
+        return freeze_time(recorded_at, tick=True)
+
+    def record(
+        self, request: PreparedRequest, response: Response, seconds: float
+    ) -> dict[str, Any]:
+        content = response.content or b""
+        digest = _sha256(content)
+        body_path = self._body_path(digest)
+        if not body_path.exists():
+            body_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = body_path.with_name(f"{digest}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(zlib.compress(content))
+            os.replace(tmp_path, body_path)
+        entry = {
+            "key": request_key(request),
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {
+                k: v
+                for k, v in response.headers.items()
+                if k.lower() not in IGNORED_HEADERS
+            },
+            "seconds": seconds,
+            "body": digest,
+        }
+        line = (json.dumps(entry) + "\n").encode("utf-8")
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # A single append per line, as worker processes record concurrently.
+            fd = os.open(self._index_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+        return entry
+
+    def _load(self) -> dict[str, list[dict[str, Any]]]:
+        entries = defaultdict(list)
+        try:
+            with open(self._index_path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        entries[entry["key"]].append(entry)
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def play(self, request: PreparedRequest) -> tuple[dict[str, Any], bytes]:
+        """Returns the next recorded response to `request` and its body."""
+        key = request_key(request)
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._load()
+            entries = self._entries.get(key)
+            if not entries:
+                raise CassetteMiss(f"No recorded response for {key}", request=request)
+            entry = entries[min(self._played[key], len(entries) - 1)]
+            self._played[key] += 1
+        return entry, zlib.decompress(self._body_path(entry["body"]).read_bytes())
+
+
+class ReplayLatency:
+    """Delay, in seconds, of the replayed responses of each upstream host.
+
+    Each response is delayed by `mean` seconds, plus or minus up to `jitter`
+    seconds. With `recorded`, responses are delayed as long as they took when
+    they were recorded.
+    """
+
+    def __init__(
+        self,
+        default: tuple[float, float] = (0.0, 0.0),
+        overrides: dict[str, tuple[float, float]] | None = None,
+        recorded: bool = False,
+        seed: int | None = 0,
+    ):
+        self.default = default
+        self.overrides = overrides or {}
+        self.recorded = recorded
+        self._random = random.Random(seed)
+        self._lock = Lock()
+
+    @staticmethod
+    def _parse(value: str) -> tuple[float, float]:
+        mean, _, jitter = value.partition(":")
+        return float(mean or 0), float(jitter or 0)
+
+    @classmethod
+    def from_string(cls, spec: str | None, default: str | None = None):
+        """Parses delays written as `0.1:0.05` for the default one, then
+        `api.eia.gov=0.5:0.2,web-api.tp.entsoe.eu=1` per host. A default of
+        `recorded` replays the recorded delays."""
+        if default == "recorded":
+            return cls(recorded=True)
+        overrides = {}
+        for item in (spec or "").split(","):
+            if not item.strip():
+                continue
+            host, _, value = item.partition("=")
+            overrides[host.strip()] = cls._parse(value)
+        return cls(cls._parse(default or "0"), overrides)
+
+    def delay(self, host: str, recorded_seconds: float = 0.0) -> float:
+        if self.recorded:
+            return recorded_seconds
+        mean, jitter = self.overrides.get(host, self.default)
+        if not jitter:
+            return mean
+        with self._lock:
+            return max(mean + self._random.uniform(-jitter, jitter), 0.0)
+
+
+class CassetteAdapter(BaseAdapter):
+    """Records the responses of `send_through(url)` adapters, or replays them."""
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        mode: str,
+        send_through: Callable[[str], BaseAdapter] | None = None,
+        latency: ReplayLatency | None = None,
+    ):
+        super().__init__()
+        assert mode in (RECORD, REPLAY), f"Unknown cassette mode {mode}"
+        assert mode == REPLAY or send_through is not None
+        self.cassette = cassette
+        self.mode = mode
+        self.send_through = send_through
+        self.latency = latency or ReplayLatency()
+        if mode == RECORD:
+            cassette.start_recording()
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        if self.mode == RECORD:
+            started = perf_counter()
+            response = self.send_through(request.url).send(request, **kwargs)
+            self.cassette.record(request, response, perf_counter() - started)
+            # Streaming callers read the body already consumed for the record.
+            response.raw = BytesIO(response.content)
+            return response
+
+        entry, content = self.cassette.play(request)
+        delay = self.latency.delay(
+            urlsplit(request.url or "").hostname or "", entry["seconds"]
+        )
+        if delay:
+            sleep(delay)
+        response = Response()
+        response.status_code = entry["status"]
+        response.reason = entry["reason"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = content
+        response._content_consumed = True
+        response.raw = BytesIO(content)
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def install_cassette(
+    session: PooledSession,
+    cassette: Cassette,
+    mode: str,
+    latency: ReplayLatency | None = None,
+) -> CassetteAdapter:
+    """Records or replays every request of `session` through `cassette`.
+
+    Recorded requests still go through the per-host connection pools of the
+    session.
+    """
+    adapter = CassetteAdapter(cassette, mode, session.host_adapter, latency)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return adapter
@@ -1,9 +1,8 @@
-from copy import deepcopy
+from collections import OrderedDict
 from datetime import timedelta
-from logging import getLogger
 
 from requests import Session
-from requests.adapters import HTTPAdapter, Retry
+from requests.adapters import BaseAdapter, HTTPAdapter, Retry
 
 
 def refetch_frequency(frequency: timedelta):
@@ -26,26 +25,79 @@ def refetch_frequency(frequency: timedelta):
     return wrap
 
 
+def _view(obj):
+    """Returns a shallow copy of `obj` sharing all its state.
+
+    `copy` can't be used on sessions and adapters as their pickling support
+    drops (adapters: rebuilds) part of their state.
+    """
+    view = object.__new__(type(obj))
+    view.__dict__.update(obj.__dict__)
+    return view
+
+
+class RetryAdapter(BaseAdapter):
+    """Sends the requests of a session view with `retry`.
+
+    Requests go through the adapter `session` would have used, so its pooled
+    connections and any cassette or mock adapter mounted on it are kept. Only
+    adapters opening their own connections (`HTTPAdapter`) can retry: they are
+    used through a copy sharing their connection pools, with `retry` as its
+    `max_retries`.
+    """
+
+    def __init__(self, session: Session, retry: Retry):
+        super().__init__()
+        self.session = session
+        self.retry = retry
+
+    def send(self, request, **kwargs):
+        adapter = self.session.get_adapter(request.url)
+        if isinstance(adapter, HTTPAdapter):
+            adapter = _view(adapter)
+            adapter.max_retries = self.retry
+        return adapter.send(request, **kwargs)
+
+    def close(self):
+        # The adapters used belong to `session`.
+        pass
+
+
+def retrying_session(session: Session, retry: Retry) -> Session:
+    """Returns a view of `session` retrying its requests with `retry`.
+
+    The view shares the state of `session` (connection pools, response cache,
+    cookies...) but has its own adapters, so `session`, which is shared by
+    every parser of the process, is never modified.
+    """
+    view = _view(session)
+    view.adapters = OrderedDict()
+    adapter = RetryAdapter(session, retry)
+    view.mount("https://", adapter)
+    view.mount("http://", adapter)
+    return view
+
+
 def retry_policy(retry_policy: Retry):
     assert isinstance(retry_policy, Retry)
 
     def wrap(f):
         def wrapped_f(*args, **kwargs):
-            session = args[1] if len(args) > 2 else kwargs.get("session")
-            logger = kwargs.get("logger", getLogger(__name__))
-            session = Session() if session is None else session
-            old_adapters = None
-            if "https://" in session.adapters or "http://" in session.adapters:
-                logger.warning("Session already has adapters, they will be overriden.")
-                old_adapters = deepcopy(session.adapters)
-            session.mount("https://", HTTPAdapter(max_retries=retry_policy))
-            session.mount("http://", HTTPAdapter(max_retries=retry_policy))
-            result = f(*args, **kwargs)
-            del session.adapters["https://"]
-            del session.adapters["http://"]
-            if old_adapters is not None:
-                session.adapters.update(old_adapters)
-            return result
+            if len(args) > 1:
+                session = args[1]
+            else:
+                session = kwargs.get("session")
+            if session is None:
+                session = Session()
+                session.mount("https://", HTTPAdapter(max_retries=retry_policy))
+                session.mount("http://", HTTPAdapter(max_retries=retry_policy))
+            else:
+                session = retrying_session(session, retry_policy)
+            if len(args) > 1:
+                args = (args[0], session, *args[2:])
+            else:
+                kwargs["session"] = session
+            return f(*args, **kwargs)
 
         return wrapped_f
 
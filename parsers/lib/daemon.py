@@ -0,0 +1,132 @@
+"""Helpers to keep fetching data from a long running process.
+
+Instead of fetching everything on every cron invocation, the daemon runs each
+(zone, data type) on the cadence of its data type and reloads the config when
+its files change, while parsers, sessions and process pools stay warm.
+"""
+
+import heapq
+import os
+from collections.abc import Iterable
+from datetime import timedelta
+from pathlib import Path
+
+from electricitymap.contrib.config import reload_config
+from electricitymap.contrib.config.model import reload_config_model
+from parsers.lib.parsers import load_parsers
+
+DEFAULT_INTERVAL = timedelta(minutes=15)
+DEFAULT_INTERVALS = {
+    "production": timedelta(minutes=10),
+    "consumption": timedelta(minutes=10),
+    "exchange": timedelta(minutes=10),
+    "price": timedelta(hours=1),
+    "productionPerUnit": timedelta(hours=1),
+    "productionPerModeForecast": timedelta(hours=1),
+    "consumptionForecast": timedelta(hours=1),
+    "generationForecast": timedelta(hours=1),
+    "exchangeForecast": timedelta(hours=1),
+    "productionCapacity": timedelta(days=1),
+}
+
+
+class Schedule:
+    """Interval between two runs of the jobs of each data type."""
+
+    def __init__(
+        self,
+        intervals: dict[str, timedelta] | None = None,
+        default: timedelta = DEFAULT_INTERVAL,
+    ):
+        self.intervals = {**DEFAULT_INTERVALS, **(intervals or {})}
+        self.default = default
+
+    @classmethod
+    def from_string(
+        cls, spec: str | None, default: timedelta = DEFAULT_INTERVAL
+    ) -> "Schedule":
+        """Parses intervals in seconds written as `price=3600,production=300`."""
+        intervals = {}
+        for item in (spec or "").split(","):
+            if not item.strip():
+                continue
+            data_type, _, seconds = item.partition("=")
+            intervals[data_type.strip()] = timedelta(seconds=float(seconds))
+        return cls(intervals, default)
+
+    def interval(self, data_type: str) -> timedelta:
+        return self.intervals.get(data_type, self.default)
+
+
+class JobScheduler:
+    """Tells which (zone, data type) jobs are due, given a `Schedule`.
+
+    Times are plain seconds, e.g. from `time.monotonic()`.
+    """
+
+    def __init__(self, schedule: Schedule):
+        self.schedule = schedule
+        self._next_runs: dict[tuple[str, str], float] = {}
+        self._queue: list[tuple[float, tuple[str, str]]] = []
+
+    def __len__(self) -> int:
+        return len(self._next_runs)
+
+    def update(self, jobs: Iterable[tuple[str, str]], now: float):
+        """Sets the jobs to run. New jobs are due right away, removed ones are
+        dropped and the others keep their next run."""
+        jobs = set(jobs)
+        self._next_runs = {job: self._next_runs.get(job, now) for job in sorted(jobs)}
+        self._queue = [(at, job) for job, at in self._next_runs.items()]
+        heapq.heapify(self._queue)
+
+    def next_run(self) -> float | None:
+        return self._queue[0][0] if self._queue else None
+
+    def due(self, now: float) -> list[tuple[str, str]]:
+        """Returns the jobs due at `now` and schedules their next run."""
+        jobs = []
+        while self._queue and self._queue[0][0] <= now:
+            at, job = heapq.heappop(self._queue)
+            interval = self.schedule.interval(job[1]).total_seconds()
+            # Keep the cadence, unless the job is late by more than an interval.
+            next_run = at + interval if at + interval > now else now + interval
+            self._next_runs[job] = next_run
+            heapq.heappush(self._queue, (next_run, job))
+            jobs.append(job)
+        return jobs
+
+
+class FileWatcher:
+    """Tells when any file under the watched paths was added, removed or changed."""
+
+    def __init__(self, paths: Iterable[str | Path]):
+        self.paths = [Path(path) for path in paths]
+        self._snapshot = self._scan()
+
+    def _scan(self) -> dict[str, int]:
+        snapshot = {}
+        for path in self.paths:
+            files = path.rglob("*") if path.is_dir() else [path]
+            for file in files:
+                try:
+                    snapshot[str(file)] = os.stat(file).st_mtime_ns
+                except FileNotFoundError:
+                    continue
+        return snapshot
+
+    def changed(self) -> bool:
+        snapshot = self._scan()
+        changed = snapshot != self._snapshot
+        self._snapshot = snapshot
+        return changed
+
+
+def reload_configuration():
+    """Reloads the zones and exchanges config and the parsers they point to.
+
+    Must not run while parsers are being looked up.
+    """
+    reload_config()
+    reload_config_model()
+    load_parsers()
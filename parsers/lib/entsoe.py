@@ -0,0 +1,220 @@
+"""Streaming reader of the documents of the ENTSOE transparency platform.
+
+ENTSOE documents (GL_MarketDocument, Publication_MarketDocument, ...) hold a
+list of TimeSeries, each made of a header (domains, production type, currency,
+...) and of Periods of Points. `read_timeseries` parses a document
+incrementally with lxml and yields its TimeSeries one at a time, dropping each
+of them from the document once read, so that memory doesn't grow with the
+number of series of the document.
+
+Elements are matched on their local name, as the namespace of a document
+depends on its type.
+
+The datetimes of the points of a period are computed at once from its start
+and resolution by `Period.expand`, and `TimeSeries.points` pairs every point of
+a series with its datetime.
+"""
+
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import cache
+from io import BytesIO
+
+import numpy as np
+from lxml import etree
+
+# Curve type of the series whose points are only given when their value
+# changes, each point holding until the next position.
+VARIABLE_SIZED_BLOCKS = "A03"
+
+_RESOLUTION = re.compile(
+    r"P(?:(?P<W>\d+)W)?(?:(?P<D>\d+)D)?(?:T(?:(?P<H>\d+)H)?(?:(?P<M>\d+)M)?(?:(?P<S>\d+)S)?)?"
+)
+_UNIT_SECONDS = {"W": 7 * 24 * 3600, "D": 24 * 3600, "H": 3600, "M": 60, "S": 1}
+
+
+@cache
+def parse_resolution(resolution: str) -> np.timedelta64:
+    """Returns the duration of an ISO 8601 resolution, e.g. PT15M or P1D.
+
+    Months and years don't have a fixed duration and aren't supported.
+    """
+    match = _RESOLUTION.fullmatch(resolution or "")
+    if match is None or not any(match.groups()):
+        raise NotImplementedError("Could not recognise resolution %s" % resolution)
+    seconds = sum(
+        int(value) * _UNIT_SECONDS[unit]
+        for unit, value in match.groupdict().items()
+        if value is not None
+    )
+    return np.timedelta64(seconds, "s")
+
+
+def _datetime64(text: str) -> np.datetime64:
+    # Datetimes of ENTSOE documents are in UTC, e.g. 2024-01-09T23:00Z
+    return np.datetime64(text.rstrip("Z"), "s")
+
+
+@dataclass
+class Point:
+    position: int
+    # Text of the other elements of the point, e.g. {"quantity": "12.5"}
+    values: dict[str, str]
+
+
+@dataclass
+class Period:
+    start: str
+    end: str | None
+    resolution: str
+    points: list[Point]
+
+    def expand(
+        self, curve_type: str | None = None
+    ) -> tuple[list[datetime], list[Point]]:
+        """Returns the datetimes of the points of the period, and the points.
+
+        Points of variable sized blocks are repeated over the positions they
+        hold, up to the end of the period.
+        """
+        step = parse_resolution(self.resolution)
+        start = _datetime64(self.start)
+        points = self.points
+        positions = np.fromiter(
+            (point.position for point in points), dtype=np.int64, count=len(points)
+        )
+        if curve_type == VARIABLE_SIZED_BLOCKS and self.end is not None and len(points):
+            order = np.argsort(positions, kind="stable")
+            size = int((_datetime64(self.end) - start) // step)
+            all_positions = np.arange(1, max(size, positions.max()) + 1)
+            # Index of the point holding each position, -1 before the first one
+            holding = np.searchsorted(positions[order], all_positions, side="right") - 1
+            held = holding >= 0
+            points = [points[i] for i in order[holding[held]]]
+            positions = all_positions[held]
+        datetimes = (start + (positions - 1) * step).astype(datetime)
+        return [dt.replace(tzinfo=timezone.utc) for dt in datetimes], points
+
+
+@dataclass
+class TimeSeries:
+    # Text of the elements of the header by path, e.g. "businessType" or
+    # "MktPSRType/psrType". The first element of a path is kept.
+    header: dict[str, str]
+    periods: list[Period]
+
+    def get(self, path: str) -> str | None:
+        return self.header.get(path)
+
+    def has(self, path: str) -> bool:
+        return path in self.header
+
+    @property
+    def psr_type(self) -> str:
+        return self.header["MktPSRType/psrType"]
+
+    def points(self) -> Iterator[tuple[datetime, Point]]:
+        """Yields the points of every period of the series with their datetime."""
+        curve_type = self.get("curveType")
+        for period in self.periods:
+            yield from zip(*period.expand(curve_type))
+
+
+def _local_name(tag: str) -> str:
+    return tag.rpartition("}")[2]
+
+
+def _header(element: etree._Element, prefix: str, header: dict[str, str]):
+    for child in element:
+        if not isinstance(child.tag, str):
+            # Comments and processing instructions
+            continue
+        path = prefix + _local_name(child.tag)
+        if path == "Period":
+            continue
+        if len(child):
+            _header(child, path + "/", header)
+        elif path not in header:
+            header[path] = child.text
+
+
+def _point(element: etree._Element) -> Point:
+    position = None
+    values = {}
+    for child in element:
+        if not isinstance(child.tag, str):
+            continue
+        name = _local_name(child.tag)
+        if name == "position":
+            position = int(child.text)
+        else:
+            values[name] = child.text
+    return Point(position, values)
+
+
+def _period(element: etree._Element) -> Period:
+    start = end = resolution = None
+    points = []
+    for child in element:
+        if not isinstance(child.tag, str):
+            continue
+        name = _local_name(child.tag)
+        if name == "Point":
+            points.append(_point(child))
+        elif name == "resolution":
+            resolution = child.text
+        elif name == "timeInterval":
+            for bound in child:
+                if not isinstance(bound.tag, str):
+                    continue
+                bound_name = _local_name(bound.tag)
+                if bound_name == "start":
+                    start = bound.text
+                elif bound_name == "end":
+                    end = bound.text
+    return Period(start, end, resolution, points)
+
+
+def _timeseries(element: etree._Element) -> TimeSeries:
+    header = {}
+    _header(element, "", header)
+    periods = [
+        _period(child)
+        for child in element
+        if isinstance(child.tag, str) and _local_name(child.tag) == "Period"
+    ]
+    return TimeSeries(header, periods)
+
+
+def _iterparse(xml: str | bytes, tag: str):
+    source = BytesIO(xml.encode() if isinstance(xml, str) else xml)
+    # Error pages and truncated documents are read as far as possible
+    return etree.iterparse(source, events=("end",), tag=tag, recover=True)
+
+
+def read_timeseries(xml: str | bytes) -> Iterator[TimeSeries]:
+    """Yields the TimeSeries of an ENTSOE document, in document order."""
+    try:
+        for _, element in _iterparse(xml, "{*}TimeSeries"):
+            yield _timeseries(element)
+            # Drop the series read so far, their elements are no longer needed
+            element.clear(keep_tail=False)
+            parent = element.getparent()
+            while element.getprevious() is not None:
+                del parent[0]
+    except etree.XMLSyntaxError:
+        # Documents without any element
+        return
+
+
+def reason_text(xml: str | bytes) -> str | None:
+    """Returns the text of the reason of an acknowledgement document, sent by
+    ENTSOE instead of the data requested, e.g. when no data matches."""
+    try:
+        for _, element in _iterparse(xml, "{*}text"):
+            return element.text
+    except etree.XMLSyntaxError:
+        pass
+    return None
@@ -0,0 +1,165 @@
+"""Freshness-aware scheduling of fetch jobs.
+
+Most sources publish new datapoints at a fixed interval and with some delay.
+By remembering, for every zone and data type, when the job last ran and what
+the most recent datapoint was, we can tell when a job cannot possibly return
+new data yet and skip it.
+
+A job is due when either:
+- the next datapoint should have been published, i.e. `now` is past the last
+  datapoint + the interval between datapoints + the publication latency, or
+- the parser's refetch window (`REFETCH_FREQUENCY`) is about to end, so that
+  skipping it any longer would lose data.
+
+The publication latency comes from the zone's `delays` config when available,
+otherwise from the latencies observed in previous runs.
+"""
+
+import json
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+from electricitymap.contrib.config.model import CONFIG_MODEL
+from parsers.lib.scheduling import job_key
+
+DEFAULT_SMOOTHING = 0.3
+# Jobs are never skipped for longer than this, even if their parser returns a
+# longer refetch window.
+DEFAULT_MAX_SKIP = timedelta(days=1)
+
+
+def configured_delay(zone_key: str, data_type: str) -> timedelta | None:
+    """Returns the publication delay set in the zone config, if any."""
+    zone = CONFIG_MODEL.zones.get(zone_key)
+    if zone is None or zone.delays is None:
+        return None
+    hours = getattr(zone.delays, data_type, None)
+    return None if hours is None else timedelta(hours=hours)
+
+
+def _datetimes(res) -> list[datetime]:
+    if isinstance(res, dict):
+        res = [res]
+    return sorted(
+        event["datetime"]
+        for event in res or []
+        if isinstance(event, dict) and isinstance(event.get("datetime"), datetime)
+    )
+
+
+def _smooth(previous: float | None, value: float, smoothing: float) -> float:
+    return value if previous is None else previous + smoothing * (value - previous)
+
+
+class FreshnessState:
+    """Per (zone, data type) state of previous runs, persisted as JSON."""
+
+    def __init__(
+        self,
+        path: str | None = None,
+        smoothing: float = DEFAULT_SMOOTHING,
+        max_skip: timedelta = DEFAULT_MAX_SKIP,
+    ):
+        self.path = path
+        self.smoothing = smoothing
+        self.max_skip = max_skip
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._lock = Lock()
+        if path is not None and Path(path).exists():
+            with open(path, encoding="utf-8") as f:
+                self._entries = json.load(f)
+
+    def get(self, zone_key: str, data_type: str) -> dict[str, Any] | None:
+        return self._entries.get(job_key(zone_key, data_type))
+
+    def record(
+        self,
+        zone_key: str,
+        data_type: str,
+        run_at: datetime,
+        res,
+        scheduled_at: datetime | None = None,
+    ):
+        """Updates the state with the output of a successful run.
+
+        `run_at` is when the job started and `scheduled_at` when its run was
+        scheduled to start (defaults to `run_at`). Latencies are measured from
+        the latter, so that the time spent waiting for a worker doesn't count
+        as publication delay, and only when the run returned a new datapoint.
+        """
+        datetimes = _datetimes(res)
+        if not datetimes:
+            return
+        last_datapoint = datetimes[-1]
+        with self._lock:
+            entry = self._entries.setdefault(job_key(zone_key, data_type), {})
+            entry["lastRun"] = run_at.isoformat()
+            if entry.get("lastDatapoint") != last_datapoint.isoformat():
+                # An unchanged datapoint was published earlier, the time since
+                # says nothing about the publication delay.
+                entry["lastDatapoint"] = last_datapoint.isoformat()
+                latency = max(
+                    ((scheduled_at or run_at) - last_datapoint).total_seconds(), 0
+                )
+                entry["latency"] = _smooth(
+                    entry.get("latency"), latency, self.smoothing
+                )
+            if len(datetimes) > 1:
+                intervals = [
+                    (b - a).total_seconds()
+                    for a, b in zip(datetimes, datetimes[1:], strict=False)
+                    if b > a
+                ]
+                if intervals:
+                    interval = sorted(intervals)[len(intervals) // 2]
+                    entry["interval"] = _smooth(
+                        entry.get("interval"), interval, self.smoothing
+                    )
+
+    def next_run_at(
+        self,
+        zone_key: str,
+        data_type: str,
+        parser: Callable | None = None,
+    ) -> datetime | None:
+        """Returns when the job can next return new data, None if unknown."""
+        entry = self.get(zone_key, data_type)
+        if not entry or "interval" not in entry:
+            return None
+        last_run = datetime.fromisoformat(entry["lastRun"])
+        last_datapoint = datetime.fromisoformat(entry["lastDatapoint"])
+        if last_datapoint > last_run:
+            # Forecasts keep being revised, we can't tell when they change.
+            return None
+        latency = configured_delay(zone_key, data_type) or timedelta(
+            seconds=entry["latency"]
+        )
+        next_datapoint_at = (
+            last_datapoint + timedelta(seconds=entry["interval"]) + latency
+        )
+        refetch_frequency = getattr(parser, "REFETCH_FREQUENCY", None)
+        max_skip = min(refetch_frequency or self.max_skip, self.max_skip)
+        return min(next_datapoint_at, last_run + max_skip)
+
+    def should_run(
+        self,
+        zone_key: str,
+        data_type: str,
+        parser: Callable | None = None,
+        now: datetime | None = None,
+    ) -> bool:
+        next_run_at = self.next_run_at(zone_key, data_type, parser)
+        if next_run_at is None:
+            return True
+        return (now or datetime.now(timezone.utc)) >= next_run_at
+
+    def save(self):
+        if self.path is None:
+            return
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, indent=2, sort_keys=True)
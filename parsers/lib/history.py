@@ -0,0 +1,72 @@
+"""Rolling history of how long each fetch job takes.
+
+The history is keyed by job (e.g. `FR production`) and keeps an exponential
+moving average of the wall clock time and of the CPU time spent by the job,
+so that schedulers can tell slow jobs and CPU-bound jobs apart, and of the peak
+memory (in bytes) of the job when memory profiling is on.
+"""
+
+import json
+from pathlib import Path
+from threading import Lock
+
+DEFAULT_SMOOTHING = 0.3
+
+
+class JobHistory:
+    def __init__(self, path: str | None = None, smoothing: float = DEFAULT_SMOOTHING):
+        assert 0 < smoothing <= 1, "smoothing must be in ]0, 1]"
+        self.path = path
+        self.smoothing = smoothing
+        self._entries: dict[str, dict[str, float]] = {}
+        self._lock = Lock()
+        if path is not None and Path(path).exists():
+            with open(path, encoding="utf-8") as f:
+                self._entries = json.load(f)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str) -> dict[str, float] | None:
+        return self._entries.get(key)
+
+    def record(
+        self,
+        key: str,
+        wall_seconds: float,
+        cpu_seconds: float | None = None,
+        memory_bytes: float | None = None,
+    ):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = {"runs": 0, "wall": wall_seconds}
+            else:
+                entry["wall"] += self.smoothing * (wall_seconds - entry["wall"])
+            for name, value in (("cpu", cpu_seconds), ("memory", memory_bytes)):
+                if value is not None:
+                    previous = entry.get(name, value)
+                    entry[name] = previous + self.smoothing * (value - previous)
+            entry["runs"] += 1
+
+    def cpu_ratio(self, key: str) -> float | None:
+        """Share of the wall clock time a job spends on the CPU."""
+        entry = self._entries.get(key)
+        if not entry or "cpu" not in entry or entry["wall"] <= 0:
+            return None
+        return entry["cpu"] / entry["wall"]
+
+    def memory(self, key: str) -> float | None:
+        """Peak memory of a job, in bytes."""
+        entry = self._entries.get(key)
+        if not entry:
+            return None
+        return entry.get("memory")
+
+    def save(self):
+        if self.path is None:
+            return
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, indent=2, sort_keys=True)
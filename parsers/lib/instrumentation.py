@@ -0,0 +1,146 @@
+"""Collection and export of the phase timings of a fetch run.
+
+The traces of every job (see `electricitymap.contrib.lib.tracing`) are rolled
+up per parser module into p50/p95/p99 timings of each phase and of each HTTP
+request stage, and exported as JSON and as a Prometheus textfile (for the node
+exporter textfile collector).
+"""
+
+import json
+import math
+import os
+from collections import defaultdict
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+from electricitymap.contrib.lib.tracing import JobTrace
+
+QUANTILES = (0.5, 0.95, 0.99)
+REQUEST_STAGES = ("connect", "tls", "ttfb", "total")
+
+
+def quantile(values: list[float], q: float) -> float:
+    """Nearest-rank quantile of `values`."""
+    assert values, "values must not be empty"
+    values = sorted(values)
+    return values[min(max(math.ceil(q * len(values)) - 1, 0), len(values) - 1)]
+
+
+def _summary(values: list[float]) -> dict[str, float]:
+    summary = {f"p{round(q * 100)}": quantile(values, q) for q in QUANTILES}
+    summary["sum"] = sum(values)
+    summary["count"] = len(values)
+    return summary
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class RunInstrumentation:
+    """Traces of the jobs of a fetch run."""
+
+    def __init__(self):
+        self.traces: list[JobTrace] = []
+        self._lock = Lock()
+
+    def add(self, trace: JobTrace):
+        with self._lock:
+            self.traces.append(trace)
+
+    def rollups(self) -> dict[str, dict[str, Any]]:
+        """Timings of the jobs of each parser module."""
+        phases: dict[str, dict[str, list[float]]] = defaultdict(
+            lambda: defaultdict(list)
+        )
+        stages: dict[str, dict[str, list[float]]] = defaultdict(
+            lambda: defaultdict(list)
+        )
+        received: dict[str, int] = defaultdict(int)
+        with self._lock:
+            traces = list(self.traces)
+        for trace in traces:
+            phases[trace.module]["total"].append(trace.total)
+            for name, seconds in trace.phases.items():
+                phases[trace.module][name].append(seconds)
+            for request in trace.requests:
+                received[trace.module] += request.get("bytes", 0)
+                for stage in REQUEST_STAGES:
+                    if stage in request:
+                        stages[trace.module][stage].append(request[stage])
+        return {
+            module: {
+                "jobs": len(module_phases["total"]),
+                "phases": {
+                    name: _summary(values) for name, values in module_phases.items()
+                },
+                "requests": {
+                    stage: _summary(values) for stage, values in stages[module].items()
+                },
+                "bytes": received[module],
+            }
+            for module, module_phases in sorted(phases.items())
+        }
+
+    def to_json(self) -> dict[str, Any]:
+        with self._lock:
+            jobs = [trace.to_dict() for trace in self.traces]
+        return {"jobs": jobs, "modules": self.rollups()}
+
+    def to_prometheus(self) -> str:
+        lines = [
+            "# HELP parser_phase_seconds Time spent by parser jobs in each phase.",
+            "# TYPE parser_phase_seconds summary",
+        ]
+        rollups = self.rollups()
+        for module, rollup in rollups.items():
+            for name, summary in rollup["phases"].items():
+                lines += self._summary_lines(
+                    "parser_phase_seconds", summary, module=module, phase=name
+                )
+        lines += [
+            "# HELP parser_http_request_seconds Time spent by HTTP requests in each stage.",
+            "# TYPE parser_http_request_seconds summary",
+        ]
+        for module, rollup in rollups.items():
+            for stage, summary in rollup["requests"].items():
+                lines += self._summary_lines(
+                    "parser_http_request_seconds", summary, module=module, stage=stage
+                )
+        lines += [
+            "# HELP parser_http_response_bytes Bytes received by parser jobs.",
+            "# TYPE parser_http_response_bytes gauge",
+        ]
+        for module, rollup in rollups.items():
+            lines.append(
+                f"parser_http_response_bytes{_labels(module=module)} {rollup['bytes']}"
+            )
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _summary_lines(metric: str, summary: dict[str, float], **labels) -> list[str]:
+        lines = [
+            f"{metric}{_labels(**labels, quantile=str(q))} {summary[f'p{round(q * 100)}']}"
+            for q in QUANTILES
+        ]
+        lines.append(f"{metric}_sum{_labels(**labels)} {summary['sum']}")
+        lines.append(f"{metric}_count{_labels(**labels)} {summary['count']}")
+        return lines
+
+    def write_json(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f, indent=2)
+
+    def write_prometheus(self, path: str):
+        # Written aside and moved in place so the collector never reads half a file.
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
@@ -0,0 +1,163 @@
+"""Per-job memory profiling.
+
+`MemoryTracker` samples the memory used by the process, either its resident set
+size (`rss`, cheap) or the memory allocated by Python objects (`tracemalloc`,
+which slows allocations down but doesn't miss short-lived peaks), and
+attributes to each job the peak reached while it ran above the usage of the
+process when it started.
+
+Jobs running concurrently in the same process share its memory, so their peaks
+are an upper bound of what they allocated themselves. The peaks of jobs
+running alone in a worker process are exact.
+"""
+
+import os
+import sys
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from threading import Event, Lock, Thread
+from typing import Any
+
+RSS = "rss"
+TRACEMALLOC = "tracemalloc"
+MEMORY_PROFILES = (RSS, TRACEMALLOC)
+
+# Seconds between two samples of the memory of the process.
+DEFAULT_SAMPLE_INTERVAL = 0.01
+
+MB = 1024 * 1024
+
+
+def rss_bytes() -> int:
+    """Resident set size of the process, in bytes."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        # Only the peak is available, in bytes on macOS and in kB elsewhere
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def check_profile(mode: str):
+    """Raises if `mode` is not a memory profile."""
+    if mode not in MEMORY_PROFILES:
+        raise ValueError(
+            f"Unknown memory profile {mode}, expected one of {MEMORY_PROFILES}"
+        )
+
+
+class JobMemory:
+    """Memory of the process when a job started and at its peak since then."""
+
+    def __init__(self, baseline: int):
+        self.baseline = baseline
+        self.peak = baseline
+
+    @property
+    def peak_bytes(self) -> int:
+        return max(self.peak - self.baseline, 0)
+
+
+class MemoryTracker:
+    """Samples the memory of the process every `interval` seconds while jobs
+    are tracked, see the module documentation."""
+
+    def __init__(self, mode: str = RSS, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        check_profile(mode)
+        self.mode = mode
+        self.interval = interval
+        self._jobs: set[JobMemory] = set()
+        self._lock = Lock()
+        self._stopped = Event()
+        self._thread: Thread | None = None
+        self._tracing = False
+
+    def start(self) -> "MemoryTracker":
+        if self.mode == TRACEMALLOC and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        self._stopped.clear()
+        self._thread = Thread(
+            target=self._sample_forever, name="memory-tracker", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def _current(self) -> int:
+        if self.mode == TRACEMALLOC:
+            return tracemalloc.get_traced_memory()[0]
+        return rss_bytes()
+
+    def _sample(self):
+        """Raises the peak of the running jobs to the memory used since the
+        last sample. Must be called with the lock held."""
+        if self.mode == TRACEMALLOC:
+            # tracemalloc keeps the exact peak between two samples
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.reset_peak()
+        else:
+            peak = rss_bytes()
+        for job in self._jobs:
+            job.peak = max(job.peak, peak)
+
+    def _sample_forever(self):
+        while not self._stopped.wait(self.interval):
+            with self._lock:
+                self._sample()
+
+    @contextmanager
+    def track(self) -> Iterator[JobMemory]:
+        """Tracks the memory peak of the code run in the context."""
+        with self._lock:
+            # Peaks reached before the job started belong to the other jobs
+            self._sample()
+            job = JobMemory(self._current())
+            self._jobs.add(job)
+        try:
+            yield job
+        finally:
+            with self._lock:
+                self._sample()
+                self._jobs.discard(job)
+
+
+_trackers: dict[str, MemoryTracker] = {}
+_trackers_lock = Lock()
+
+
+def get_memory_tracker(mode: str) -> MemoryTracker:
+    """Returns the tracker of the current process, started on first use."""
+    with _trackers_lock:
+        tracker = _trackers.get(mode)
+        if tracker is None:
+            tracker = _trackers[mode] = MemoryTracker(mode).start()
+        return tracker
+
+
+def call_with_memory(mode: str, function: Callable, *args, **kwargs) -> tuple[Any, int]:
+    """Calls `function` and returns its result and its memory peak in bytes.
+
+    The peak of a failed call is attached to the exception as `memory_peak`.
+    Module level, so that it can be called in worker processes.
+    """
+    tracker = get_memory_tracker(mode)
+    try:
+        with tracker.track() as job:
+            result = function(*args, **kwargs)
+    except Exception as e:
+        e.memory_peak = job.peak_bytes
+        raise
+    return result, job.peak_bytes
@@ -0,0 +1,16 @@
+"""OCR of the images published by some sources (e.g. SG, IN-MH).
+
+pytesseract is only imported by the parsers that read images, and the
+tesseract binary is taken from the TESSERACT_EXE environment variable when set.
+"""
+
+import os
+
+
+def image_to_string(image, **kwargs) -> str:
+    import pytesseract
+
+    tesseract_exe = os.environ.get("TESSERACT_EXE")
+    if tesseract_exe:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_exe
+    return pytesseract.image_to_string(image, **kwargs)
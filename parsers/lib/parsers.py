@@ -1,18 +1,82 @@
 import importlib
+from collections.abc import Callable, Iterator, MutableMapping
 
 from electricitymap.contrib.config import EXCHANGES_CONFIG, ZONES_CONFIG
 
+
+class LazyParsers(MutableMapping):
+    """Parser functions of a data type, keyed by zone or exchange.
+
+    Holds the `module.function` of every parser and only imports its module
+    on the first lookup, so that importing the registry doesn't import every
+    parser and their dependencies.
+    """
+
+    def __init__(self, parser_folder: str = "parsers"):
+        self.parser_folder = parser_folder
+        self._paths: dict[str, str | None] = {}
+        self._functions: dict[str, Callable] = {}
+
+    def path(self, key: str) -> str | None:
+        """Returns the `module.function` of a parser without importing it, or
+        None for a function set directly."""
+        return self._paths[key]
+
+    def __getitem__(self, key: str) -> Callable:
+        function = self._functions.get(key)
+        if function is None:
+            mod_name, fun_name = self._paths[key].split(".")
+            mod = importlib.import_module(f"{self.parser_folder}.{mod_name}")
+            function = self._functions[key] = getattr(mod, fun_name)
+        return function
+
+    def __setitem__(self, key: str, value: str | Callable):
+        self._functions.pop(key, None)
+        if isinstance(value, str):
+            self._paths[key] = value
+        else:
+            self._paths[key] = None
+            self._functions[key] = value
+
+    def __delitem__(self, key: str):
+        del self._paths[key]
+        self._functions.pop(key, None)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __contains__(self, key) -> bool:
+        return key in self._paths
+
+    def clear(self):
+        self._paths.clear()
+        self._functions.clear()
+
+
+def _parser_key_to_parser_folder(parser_key: str):
+    return (
+        "electricitymap.contrib.capacity_parsers"
+        if parser_key == "productionCapacity"
+        else "parsers"
+    )
+
+
 # Prepare all parsers
-CONSUMPTION_PARSERS = {}
-PRODUCTION_PARSERS = {}
-PRODUCTION_PER_MODE_FORECAST_PARSERS = {}
-PRODUCTION_PER_UNIT_PARSERS = {}
-EXCHANGE_PARSERS = {}
-PRICE_PARSERS = {}
-CONSUMPTION_FORECAST_PARSERS = {}
-GENERATION_FORECAST_PARSERS = {}
-EXCHANGE_FORECAST_PARSERS = {}
-PRODUCTION_CAPACITY_PARSERS = {}
+CONSUMPTION_PARSERS = LazyParsers()
+PRODUCTION_PARSERS = LazyParsers()
+PRODUCTION_PER_MODE_FORECAST_PARSERS = LazyParsers()
+PRODUCTION_PER_UNIT_PARSERS = LazyParsers()
+EXCHANGE_PARSERS = LazyParsers()
+PRICE_PARSERS = LazyParsers()
+CONSUMPTION_FORECAST_PARSERS = LazyParsers()
+GENERATION_FORECAST_PARSERS = LazyParsers()
+EXCHANGE_FORECAST_PARSERS = LazyParsers()
+PRODUCTION_CAPACITY_PARSERS = LazyParsers(
+    _parser_key_to_parser_folder("productionCapacity")
+)
 
 PARSER_KEY_TO_DICT = {
     "consumption": CONSUMPTION_PARSERS,
@@ -28,27 +92,23 @@ PARSER_KEY_TO_DICT = {
 }
 
 
-def _parser_key_to_parser_folder(parser_key: str):
-    return (
-        "electricitymap.contrib.capacity_parsers"
-        if parser_key == "productionCapacity"
-        else "parsers"
-    )
+def load_parsers():
+    """Fills the parser dicts in place from the zones and exchanges config.
+
+    Parsers are imported on their first lookup.
+    """
+    for parsers in PARSER_KEY_TO_DICT.values():
+        parsers.clear()
 
+    # Read all zones
+    for zone_id, zone_config in ZONES_CONFIG.items():
+        for parser_key, v in zone_config.get("parsers", {}).items():
+            PARSER_KEY_TO_DICT[parser_key][zone_id] = v
 
-# Read all zones
-for zone_id, zone_config in ZONES_CONFIG.items():
-    for parser_key, v in zone_config.get("parsers", {}).items():
-        mod_name, fun_name = v.split(".")
-        mod = importlib.import_module(
-            f"{_parser_key_to_parser_folder(parser_key)}.%s" % mod_name
-        )
-        PARSER_KEY_TO_DICT[parser_key][zone_id] = getattr(mod, fun_name)
+    # Read all exchanges
+    for exchange_id, exchange_config in EXCHANGES_CONFIG.items():
+        for parser_key, v in exchange_config.get("parsers", {}).items():
+            PARSER_KEY_TO_DICT[parser_key][exchange_id] = v
 
 
-# Read all exchanges
-for exchange_id, exchange_config in EXCHANGES_CONFIG.items():
-    for parser_key, v in exchange_config.get("parsers", {}).items():
-        mod_name, fun_name = v.split(".")
-        mod = importlib.import_module("parsers.%s" % mod_name)
-        PARSER_KEY_TO_DICT[parser_key][exchange_id] = getattr(mod, fun_name)
+load_parsers()
@@ -0,0 +1,187 @@
+"""Rate limiting of APIs accessed with one or several keys.
+
+Some APIs (e.g. ENTSOE, EIA) limit the number of requests per key, and we
+spread our requests over several keys to fetch more zones at once. A
+`RateLimiter` keeps a token bucket per key and hands out the least loaded key
+that is allowed to send a request right away. Keys answered with a 429 or a
+5xx are put in a cooldown growing with consecutive failures, keys rejected with
+a 401 or a 403 (e.g. revoked) are put aside for the longest cooldown, and the
+request fails over to another key.
+
+Limiters are shared by every parser of the process through `get_rate_limiter`.
+"""
+
+from collections.abc import Callable, Iterable
+from threading import Condition, Lock
+from time import monotonic
+
+from requests import Response
+
+# Seconds a key is put aside after its first failure, doubled on every
+# consecutive failure up to DEFAULT_MAX_COOLDOWN.
+DEFAULT_COOLDOWN = 5.0
+DEFAULT_MAX_COOLDOWN = 120.0
+
+
+def is_throttled(status_code: int | None) -> bool:
+    """Tells whether a response means the key should be put aside for a while.
+
+    `None` stands for a request that failed without a response.
+    """
+    return status_code is None or status_code == 429 or status_code >= 500
+
+
+def is_rejected(status_code: int | None) -> bool:
+    """Tells whether a response means the key itself is invalid or revoked."""
+    return status_code in (401, 403)
+
+
+def is_key_failure(status_code: int | None) -> bool:
+    """Tells whether a request should fail over to another key."""
+    return is_throttled(status_code) or is_rejected(status_code)
+
+
+def _retry_after(response: Response) -> float | None:
+    try:
+        return float(response.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
+
+
+class _KeyState:
+    def __init__(self, burst: float):
+        self.tokens = burst
+        self.updated = monotonic()
+        self.in_flight = 0
+        self.failures = 0
+        self.cooldown_until = 0.0
+
+
+class RateLimiter:
+    """A token bucket of `rate` requests per second and `burst` per key."""
+
+    def __init__(
+        self,
+        keys: Iterable[str],
+        rate: float,
+        burst: float,
+        cooldown: float = DEFAULT_COOLDOWN,
+        max_cooldown: float = DEFAULT_MAX_COOLDOWN,
+    ):
+        assert rate > 0, "rate must be positive"
+        assert burst >= 1, "burst must allow at least one request"
+        self.rate = rate
+        self.burst = burst
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._states = {key: _KeyState(burst) for key in keys}
+        assert self._states, "At least one key is required"
+        self._condition = Condition()
+
+    @property
+    def keys(self) -> list[str]:
+        return list(self._states)
+
+    def _refill(self, state: _KeyState, now: float):
+        state.tokens = min(self.burst, state.tokens + (now - state.updated) * self.rate)
+        state.updated = now
+
+    def acquire(self, exclude: Iterable[str] = ()) -> str:
+        """Blocks until a key can send a request, and returns it.
+
+        Among the keys ready right away, the one with the fewest requests in
+        flight, then with the most tokens left, is returned.
+        """
+        exclude = set(exclude)
+        with self._condition:
+            while True:
+                now = monotonic()
+                best, best_state, wait = None, None, None
+                for key, state in self._states.items():
+                    if key in exclude:
+                        continue
+                    self._refill(state, now)
+                    ready_at = max(
+                        state.cooldown_until,
+                        now + max(1 - state.tokens, 0) / self.rate,
+                    )
+                    if ready_at > now:
+                        wait = (
+                            ready_at - now
+                            if wait is None
+                            else min(wait, ready_at - now)
+                        )
+                    elif best_state is None or (state.in_flight, -state.tokens) < (
+                        best_state.in_flight,
+                        -best_state.tokens,
+                    ):
+                        best, best_state = key, state
+                if best_state is not None:
+                    best_state.tokens -= 1
+                    best_state.in_flight += 1
+                    return best
+                if wait is None:
+                    raise ValueError("Every key is excluded")
+                self._condition.wait(wait)
+
+    def release(
+        self,
+        key: str,
+        status_code: int | None = None,
+        retry_after: float | None = None,
+    ):
+        """Reports the outcome of a request sent with `key`."""
+        with self._condition:
+            state = self._states[key]
+            state.in_flight -= 1
+            if is_key_failure(status_code):
+                state.failures += 1
+                cooldown = min(
+                    self.cooldown * 2 ** (state.failures - 1), self.max_cooldown
+                )
+                if is_rejected(status_code):
+                    cooldown = self.max_cooldown
+                state.cooldown_until = monotonic() + max(cooldown, retry_after or 0)
+            else:
+                state.failures = 0
+            self._condition.notify_all()
+
+    def request(self, send: Callable[[str], Response]) -> Response:
+        """Calls `send(key)` with the best key, failing over to the other keys.
+
+        Only throttled and rejected responses fail over, any other response
+        (including errors such as "no matching data") is returned as is. When
+        every key failed, the last response is returned.
+        """
+        tried: set[str] = set()
+        response = None
+        for _ in range(len(self._states)):
+            key = self.acquire(exclude=tried)
+            try:
+                response = send(key)
+            except Exception:
+                self.release(key)
+                if len(tried) + 1 == len(self._states):
+                    raise
+                tried.add(key)
+                continue
+            self.release(key, response.status_code, _retry_after(response))
+            if not is_key_failure(response.status_code):
+                return response
+            tried.add(key)
+        return response
+
+
+_limiters: dict[tuple[str, tuple[str, ...]], RateLimiter] = {}
+_limiters_lock = Lock()
+
+
+def get_rate_limiter(
+    name: str, keys: Iterable[str], rate: float, burst: float
+) -> RateLimiter:
+    """Returns the limiter of the process for the API `name` and its `keys`."""
+    keys = tuple(key.strip() for key in keys if key.strip())
+    with _limiters_lock:
+        if (name, keys) not in _limiters:
+            _limiters[(name, keys)] = RateLimiter(keys, rate, burst)
+        return _limiters[(name, keys)]
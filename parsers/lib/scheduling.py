@@ -0,0 +1,464 @@
+"""Helpers to schedule many parser runs concurrently.
+
+Parsers are synchronous and spend most of their time waiting on the network, so
+running them from an asyncio event loop lets us keep hundreds of jobs in flight
+while a per-host semaphore makes sure no single upstream gets hammered.
+"""
+
+import asyncio
+import importlib
+import os
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from multiprocessing import get_context
+from threading import Lock, Thread
+from typing import Any, TypeVar
+
+from electricitymap.contrib.config import EXCHANGES_CONFIG, ZONES_CONFIG
+from parsers.lib.history import JobHistory
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_MAX_IN_FLIGHT = 256
+DEFAULT_HOST_CONCURRENCY = 4
+# Seconds a job may run before it is abandoned.
+DEFAULT_JOB_TIMEOUT = 600
+# Seconds between two checks of the running jobs' deadlines.
+WATCHDOG_INTERVAL = 0.1
+
+# Parser modules doing heavy work in Python (OCR, large pandas frames) rather
+# than waiting on the network.
+DEFAULT_CPU_BOUND_PARSERS = ["IN_MH", "SG", "IEMOP"]
+# Jobs spending at least this share of their wall clock time on the CPU are
+# considered CPU-bound.
+CPU_BOUND_RATIO = 0.5
+
+# Parser modules building large documents or frames in memory.
+DEFAULT_MEMORY_HEAVY_PARSERS = ["IEMOP"]
+# Jobs run by an isolated worker process before it is replaced.
+DEFAULT_MAX_JOBS_PER_WORKER = 10
+
+
+class HostLimits:
+    """Maximum number of concurrent jobs allowed per upstream host.
+
+    Hosts are identified by the `SOURCE` of the parser module (e.g. `entsoe.eu`)
+    or by the parser module name when the module does not define one.
+    """
+
+    def __init__(
+        self,
+        default: int = DEFAULT_HOST_CONCURRENCY,
+        overrides: dict[str, int] | None = None,
+    ):
+        assert default > 0, "The default host concurrency must be positive"
+        self.default = default
+        self.overrides = overrides or {}
+
+    @classmethod
+    def from_string(
+        cls, spec: str | None, default: int = DEFAULT_HOST_CONCURRENCY
+    ) -> "HostLimits":
+        """Parses limits written as `entsoe.eu=8,EIA=4`."""
+        return cls(default, _parse_host_values(spec, int))
+
+    def limit(self, host: str) -> int:
+        return self.overrides.get(host, self.default)
+
+
+class JobTimeouts:
+    """Hard deadline, in seconds, of the jobs of each upstream host.
+
+    A timeout of 0 or None means the jobs of that host never time out.
+    """
+
+    def __init__(
+        self,
+        default: float | None = DEFAULT_JOB_TIMEOUT,
+        overrides: dict[str, float] | None = None,
+    ):
+        self.default = default
+        self.overrides = overrides or {}
+
+    @classmethod
+    def from_string(
+        cls, spec: str | None, default: float | None = DEFAULT_JOB_TIMEOUT
+    ) -> "JobTimeouts":
+        """Parses timeouts written as `RU=60,IEMOP=120`."""
+        return cls(default, _parse_host_values(spec, float))
+
+    def timeout(self, host: str) -> float | None:
+        return self.overrides.get(host, self.default) or None
+
+
+def _parse_host_values(spec: str | None, cast: Callable[[str], R]) -> dict[str, R]:
+    values = {}
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        host, _, value = item.partition("=")
+        values[host.strip()] = cast(value)
+    return values
+
+
+def job_key(zone_key: str, data_type: str) -> str:
+    return f"{zone_key} {data_type}"
+
+
+def parser_function_name(zone_key: str, data_type: str) -> str:
+    """Returns the `module.function` configured for a zone or exchange."""
+    config = EXCHANGES_CONFIG if "->" in zone_key else ZONES_CONFIG
+    return config[zone_key]["parsers"][data_type]
+
+
+def parser_source(zone_key: str, data_type: str) -> str:
+    """Returns the key of the upstream host a parser talks to."""
+    mod_name = parser_function_name(zone_key, data_type).split(".")[0]
+    folder = (
+        "electricitymap.contrib.capacity_parsers"
+        if data_type == "productionCapacity"
+        else "parsers"
+    )
+    mod = importlib.import_module(f"{folder}.{mod_name}")
+    return getattr(mod, "SOURCE", mod_name)
+
+
+def _min_timeout(*timeouts: float | None) -> float | None:
+    return min((t for t in timeouts if t is not None), default=None)
+
+
+def _start_thread(run: Callable[[T], R], item: T) -> Future:
+    """Runs `run(item)` on a dedicated daemon thread.
+
+    Unlike the workers of a pool, the thread of an abandoned item holds no slot
+    the next items wait for, and doesn't keep the process from exiting.
+    """
+    future: Future = Future()
+    future.set_running_or_notify_cancel()
+
+    def target():
+        try:
+            result = run(item)
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+
+    Thread(target=target, daemon=True).start()
+    return future
+
+
+async def _acquire(semaphore: asyncio.Semaphore, timeout: float | None) -> bool:
+    """Acquires `semaphore` within `timeout` seconds, returns whether it did.
+
+    On Python 3.10, `asyncio.wait_for(semaphore.acquire(), timeout)` can time
+    out after the acquire went through, leaking the permit. Here a permit
+    acquired while the attempt is cancelled is released.
+    """
+    acquire = asyncio.ensure_future(semaphore.acquire())
+    done, _ = await asyncio.wait({acquire}, timeout=timeout)
+    if done:
+        return True
+    acquire.cancel()
+    try:
+        await acquire
+    except asyncio.CancelledError:
+        return False
+    semaphore.release()
+    return False
+
+
+async def _run_all(
+    items: list[T],
+    run: Callable[[T], R],
+    host_of: Callable[[T], str],
+    host_limits: HostLimits,
+    max_in_flight: int,
+    timeout_of: Callable[[T], float | None],
+    on_timeout: Callable[[T], R],
+    budget: float | None,
+) -> list[R]:
+    loop = asyncio.get_running_loop()
+    deadline = None if budget is None else loop.time() + budget
+    semaphores: dict[str, asyncio.Semaphore] = {}
+    in_flight = asyncio.Semaphore(max_in_flight)
+
+    def remaining() -> float | None:
+        return None if deadline is None else max(deadline - loop.time(), 0)
+
+    def release_soon(semaphore: asyncio.Semaphore):
+        # Called from the thread of an abandoned item
+        try:
+            loop.call_soon_threadsafe(semaphore.release)
+        except RuntimeError:
+            # The run is over and its loop closed
+            pass
+
+    async def run_item(item: T) -> R:
+        host = host_of(item)
+        if host not in semaphores:
+            semaphores[host] = asyncio.Semaphore(host_limits.limit(host))
+        semaphore = semaphores[host]
+        if not await _acquire(semaphore, remaining()):
+            return on_timeout(item)
+        if not await _acquire(in_flight, remaining()):
+            semaphore.release()
+            return on_timeout(item)
+        future = _start_thread(run, item)
+        abandoned = False
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future),
+                _min_timeout(timeout_of(item), remaining()),
+            )
+        except asyncio.TimeoutError:
+            # The thread can't be interrupted, it's left to finish on its own
+            # while the next items take its place in flight. It still talks to
+            # its host, whose permit is only released once it returns.
+            abandoned = True
+            future.add_done_callback(lambda _: release_soon(semaphore))
+            return on_timeout(item)
+        finally:
+            in_flight.release()
+            if not abandoned:
+                semaphore.release()
+
+    return await asyncio.gather(*[run_item(item) for item in items])
+
+
+def run_async(
+    items: Iterable[T],
+    run: Callable[[T], R],
+    host_of: Callable[[T], str],
+    host_limits: HostLimits | None = None,
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    timeout_of: Callable[[T], float | None] | None = None,
+    on_timeout: Callable[[T], R] | None = None,
+    budget: float | None = None,
+) -> list[R]:
+    """Runs `run` on every item from an asyncio event loop.
+
+    The synchronous calls run on their own threads, at most `max_in_flight` at
+    the same time, and at most `host_limits.limit(host)` items sharing the same
+    `host_of(item)` run at the same time.
+    Items running for longer than `timeout_of(item)` seconds, or not done once
+    the run has lasted `budget` seconds, are abandoned and their result is
+    replaced by `on_timeout(item)`. Abandoned items keep running in the
+    background until they return. They no longer count as in flight, but
+    still count against the limit of their host.
+    Results are returned in the order of `items`.
+    """
+    return asyncio.run(
+        _run_all(
+            list(items),
+            run,
+            host_of,
+            host_limits or HostLimits(),
+            max_in_flight,
+            timeout_of or (lambda item: None),
+            on_timeout or (lambda item: None),
+            budget,
+        )
+    )
+
+
+def run_threads(
+    items: Iterable[T],
+    run: Callable[[T], R],
+    max_workers: int,
+    timeout_of: Callable[[T], float | None] | None = None,
+    on_timeout: Callable[[T], R] | None = None,
+    budget: float | None = None,
+) -> list[R]:
+    """Runs `run` on every item, on up to `max_workers` threads at a time.
+
+    A watchdog abandons the items running for longer than `timeout_of(item)`
+    seconds, and every item not done once the run has lasted `budget` seconds,
+    replacing their result by `on_timeout(item)`. Threads can't be killed so
+    abandoned items keep running in the background until they return, but the
+    next items are started in their place.
+    Results are returned in the order of `items`.
+    """
+    items = list(items)
+    timeout_of = timeout_of or (lambda item: None)
+    on_timeout = on_timeout or (lambda item: None)
+    timeouts = [timeout_of(item) for item in items]
+    deadline = None if budget is None else time.monotonic() + budget
+
+    results: list[Any] = [None] * len(items)
+    # Index and start time of the running items
+    running: dict[Future, tuple[int, float]] = {}
+    next_index = 0
+    while next_index < len(items) or running:
+        if deadline is not None and time.monotonic() >= deadline:
+            # The items not started yet are abandoned too.
+            for index in range(next_index, len(items)):
+                results[index] = on_timeout(items[index])
+            next_index = len(items)
+        while len(running) < max_workers and next_index < len(items):
+            future = _start_thread(run, items[next_index])
+            running[future] = (next_index, time.monotonic())
+            next_index += 1
+        done, _ = wait(running, WATCHDOG_INTERVAL, return_when=FIRST_COMPLETED)
+        for future in done:
+            index, _ = running.pop(future)
+            results[index] = future.result()
+        now = time.monotonic()
+        for future, (index, started) in list(running.items()):
+            timeout = timeouts[index]
+            expired = (deadline is not None and now >= deadline) or (
+                timeout is not None and now - started >= timeout
+            )
+            if expired and not future.done():
+                del running[future]
+                results[index] = on_timeout(items[index])
+    return results
+
+
+class WorkloadClassifier:
+    """Tells CPU-bound and memory-heavy jobs apart from I/O-bound ones.
+
+    Jobs of the configured parser modules are always CPU-bound, other jobs are
+    CPU-bound when their history shows they mostly keep the CPU busy. Likewise,
+    jobs are memory-heavy when their parser module is configured as such or
+    when their history shows a memory peak above `memory_ceiling` bytes.
+    """
+
+    def __init__(
+        self,
+        cpu_bound_parsers: Iterable[str] = DEFAULT_CPU_BOUND_PARSERS,
+        history: JobHistory | None = None,
+        threshold: float = CPU_BOUND_RATIO,
+        memory_heavy_parsers: Iterable[str] = DEFAULT_MEMORY_HEAVY_PARSERS,
+        memory_ceiling: float | None = None,
+    ):
+        self.cpu_bound_parsers = set(cpu_bound_parsers)
+        self.history = history
+        self.threshold = threshold
+        self.memory_heavy_parsers = set(memory_heavy_parsers)
+        self.memory_ceiling = memory_ceiling
+
+    def is_cpu_bound(self, zone_key: str, data_type: str) -> bool:
+        try:
+            mod_name = parser_function_name(zone_key, data_type).split(".")[0]
+        except KeyError:
+            return False
+        if mod_name in self.cpu_bound_parsers:
+            return True
+        if self.history is not None:
+            ratio = self.history.cpu_ratio(job_key(zone_key, data_type))
+            if ratio is not None:
+                return ratio >= self.threshold
+        return False
+
+    def is_memory_heavy(self, zone_key: str, data_type: str) -> bool:
+        try:
+            mod_name = parser_function_name(zone_key, data_type).split(".")[0]
+        except KeyError:
+            return False
+        if mod_name in self.memory_heavy_parsers:
+            return True
+        if self.history is not None and self.memory_ceiling is not None:
+            peak = self.history.memory(job_key(zone_key, data_type))
+            if peak is not None:
+                return peak >= self.memory_ceiling
+        return False
+
+
+def longest_first(
+    items: Iterable[T], key_of: Callable[[T], str], history: JobHistory
+) -> list[T]:
+    """Orders items by decreasing expected wall clock time.
+
+    Starting the slowest jobs first keeps them from running alone at the end of
+    the run once every other job is done. Jobs without history are expected to
+    take the median time of the known ones. The sort is stable, so jobs with the
+    same expected time keep their order.
+    """
+    items = list(items)
+    expected = {}
+    for item in items:
+        entry = history.get(key_of(item))
+        if entry is not None:
+            expected[key_of(item)] = entry["wall"]
+    known = sorted(expected.values())
+    median = known[len(known) // 2] if known else 0
+    return sorted(items, key=lambda item: -expected.get(key_of(item), median))
+
+
+def _warm_worker(modules: list[str]):
+    for module in modules:
+        importlib.import_module(module)
+
+
+def create_process_pool(
+    max_workers: int, preload: Iterable[str] = ("parsers.lib.parsers",)
+) -> ProcessPoolExecutor:
+    """Creates a process pool whose workers have already imported `preload`.
+
+    Workers are spawned rather than forked as the parent process already runs
+    threads holding locks.
+    """
+    executor = ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=get_context("spawn"),
+        initializer=_warm_worker,
+        initargs=(list(preload),),
+    )
+    # Workers are started on demand, submitting tasks starts them right away.
+    for future in [executor.submit(os.getpid) for _ in range(max_workers)]:
+        future.result()
+    return executor
+
+
+class RecyclingProcessPool:
+    """A process pool whose workers are replaced after running
+    `max_jobs_per_worker` jobs each on average.
+
+    Freeing the objects of a parser doesn't always give their memory back to
+    the system (fragmented heaps, caches of libraries), replacing the workers
+    does. The jobs already submitted to the replaced workers still complete.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_jobs_per_worker: int = DEFAULT_MAX_JOBS_PER_WORKER,
+        preload: Iterable[str] = ("parsers.lib.parsers",),
+    ):
+        assert max_jobs_per_worker > 0, "max_jobs_per_worker must be positive"
+        self.max_workers = max_workers
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.preload = list(preload)
+        self.recycled = 0
+        self._lock = Lock()
+        self._executor = create_process_pool(max_workers, self.preload)
+        self._submitted = 0
+
+    def submit(self, function: Callable, *args, **kwargs) -> Future:
+        with self._lock:
+            if self._submitted >= self.max_workers * self.max_jobs_per_worker:
+                self._executor.shutdown(wait=False)
+                self._executor = create_process_pool(self.max_workers, self.preload)
+                self._submitted = 0
+                self.recycled += 1
+            self._submitted += 1
+            return self._executor.submit(function, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        with self._lock:
+            self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+def call_with_cpu_time(function: Callable, *args, **kwargs) -> tuple[Any, float]:
+    """Calls `function` and returns its result and the CPU time it used."""
+    start = time.thread_time()
+    result = function(*args, **kwargs)
+    return result, time.thread_time() - start
@@ -0,0 +1,214 @@
+"""Serializers turning parser outputs into files.
+
+- `repr`: the Python representation of the output (legacy format).
+- `jsonl`: one JSON object per event, with ISO 8601 datetimes.
+- `parquet`: one Parquet table per output with a fixed set of columns for each
+  data type, so that whole runs can be loaded with vectorized readers. Requires
+  the `parquet` extra.
+
+NumPy scalars are written as the equivalent Python values, and NaN or infinite
+floats, which parsers use for missing values, are written as nulls in both the
+JSON Lines and Parquet outputs.
+"""
+
+import json
+import math
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timezone
+from enum import Enum
+from io import BytesIO
+from typing import Any
+
+import numpy as np
+
+from electricitymap.contrib.lib.models.events import ProductionMix, StorageMix
+
+PRODUCTION_MODES = list(ProductionMix.__fields__)
+STORAGE_MODES = list(StorageMix.__fields__)
+
+_PRODUCTION_COLUMNS = (
+    [("zoneKey", "string"), ("datetime", "timestamp")]
+    + [(f"production_{mode}", "float") for mode in PRODUCTION_MODES]
+    + [(f"storage_{mode}", "float") for mode in STORAGE_MODES]
+    + [("source", "string"), ("sourceType", "string")]
+)
+_EXCHANGE_COLUMNS = [
+    ("sortedZoneKeys", "string"),
+    ("datetime", "timestamp"),
+    ("netFlow", "float"),
+    ("source", "string"),
+    ("sourceType", "string"),
+]
+_FORECAST_COLUMNS = [
+    ("zoneKey", "string"),
+    ("datetime", "timestamp"),
+    ("value", "float"),
+    ("source", "string"),
+    ("sourceType", "string"),
+]
+
+# Columns of each data type, as (name, type) pairs.
+COLUMNS: dict[str, list[tuple[str, str]]] = {
+    "production": _PRODUCTION_COLUMNS,
+    "productionPerModeForecast": _PRODUCTION_COLUMNS,
+    "exchange": _EXCHANGE_COLUMNS,
+    "exchangeForecast": _EXCHANGE_COLUMNS,
+    "consumption": [
+        ("zoneKey", "string"),
+        ("datetime", "timestamp"),
+        ("consumption", "float"),
+        ("source", "string"),
+        ("sourceType", "string"),
+    ],
+    "consumptionForecast": _FORECAST_COLUMNS,
+    "generationForecast": _FORECAST_COLUMNS,
+    "price": [
+        ("zoneKey", "string"),
+        ("datetime", "timestamp"),
+        ("price", "float"),
+        ("currency", "string"),
+        ("source", "string"),
+        ("sourceType", "string"),
+    ],
+    "productionPerUnit": [
+        ("zoneKey", "string"),
+        ("datetime", "timestamp"),
+        ("production", "float"),
+        ("productionType", "string"),
+        ("unitKey", "string"),
+        ("unitName", "string"),
+        ("source", "string"),
+    ],
+}
+
+
+def _as_list(res) -> list[dict[str, Any]]:
+    if res is None:
+        return []
+    if isinstance(res, dict):
+        return [res]
+    return list(res)
+
+
+def _plain(value):
+    """Returns `value` with NumPy scalars as Python values and NaN or infinite
+    floats as None, in nested dicts and lists too."""
+    if isinstance(value, np.datetime64):
+        value = value.astype("datetime64[us]").item()
+    elif isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, list | tuple):
+        return [_plain(item) for item in value]
+    return value
+
+
+def _json_default(value):
+    if isinstance(value, datetime | date):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def flatten_event(data_type: str, event: dict[str, Any]) -> dict[str, Any]:
+    """Maps an event onto the columns of its data type.
+
+    Production and storage breakdowns are spread over one column per mode.
+    """
+    row = {}
+    for column, _ in COLUMNS[data_type]:
+        if column.startswith("production_"):
+            value = (event.get("production") or {}).get(column[len("production_") :])
+        elif column.startswith("storage_"):
+            value = (event.get("storage") or {}).get(column[len("storage_") :])
+        else:
+            value = event.get(column)
+        if isinstance(value, Enum):
+            value = value.value
+        row[column] = _plain(value)
+    return row
+
+
+class Serializer(ABC):
+    name: str
+    extension: str
+
+    @abstractmethod
+    def serialize(self, data_type: str, res) -> bytes:
+        """Serializes the output of a parser for the given data type."""
+
+
+class ReprSerializer(Serializer):
+    name = "repr"
+    extension = ".txt"
+
+    def serialize(self, data_type: str, res) -> bytes:
+        return str(res).encode("utf-8")
+
+
+class JsonLinesSerializer(Serializer):
+    name = "jsonl"
+    extension = ".jsonl"
+
+    def serialize(self, data_type: str, res) -> bytes:
+        return "".join(
+            json.dumps(_plain(event), default=_json_default, allow_nan=False) + "\n"
+            for event in _as_list(res)
+        ).encode("utf-8")
+
+
+class ParquetSerializer(Serializer):
+    name = "parquet"
+    extension = ".parquet"
+
+    def __init__(self):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError(
+                "The parquet format requires the `pyarrow` package, installed with "
+                "the `parquet` extra (`poetry install -E parquet`)."
+            ) from e
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+
+    def schema(self, data_type: str):
+        types = {
+            "string": self._pa.string(),
+            "float": self._pa.float64(),
+            "timestamp": self._pa.timestamp("us", tz="UTC"),
+        }
+        return self._pa.schema(
+            [(column, types[kind]) for column, kind in COLUMNS[data_type]]
+        )
+
+    def table(self, data_type: str, res):
+        rows = [flatten_event(data_type, event) for event in _as_list(res)]
+        for row in rows:
+            if isinstance(row["datetime"], datetime):
+                row["datetime"] = row["datetime"].astimezone(timezone.utc)
+        return self._pa.Table.from_pylist(rows, schema=self.schema(data_type))
+
+    def serialize(self, data_type: str, res) -> bytes:
+        buffer = BytesIO()
+        self._pq.write_table(self.table(data_type, res), buffer)
+        return buffer.getvalue()
+
+
+SERIALIZERS: dict[str, type[Serializer]] = {
+    serializer.name: serializer
+    for serializer in [ReprSerializer, JsonLinesSerializer, ParquetSerializer]
+}
+
+
+def get_serializer(name: str) -> Serializer:
+    if name not in SERIALIZERS:
+        raise ValueError(
+            f"Unknown output format {name}, expected one of {list(SERIALIZERS)}"
+        )
+    return SERIALIZERS[name]()
@@ -1,22 +1,223 @@
 import ssl
+from functools import cache
+from threading import Lock
+from time import perf_counter
+from urllib.parse import urlsplit
 
-import urllib3
 from requests import Session, adapters
+from requests.utils import DEFAULT_CA_BUNDLE_PATH, extract_zipped_paths
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.ssl_ import create_urllib3_context
 
+from electricitymap.contrib.lib.tracing import http_request, record_request_stage
 
-class LegacyHttpAdapter(adapters.HTTPAdapter):
-    def init_poolmanager(self, connections, maxsize, block=False):
-        ctx = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
-        ctx.options |= 0x4  # OP_LEGACY_SERVER_CONNECT
-        self.poolmanager = urllib3.poolmanager.PoolManager(
-            num_pools=connections, maxsize=maxsize, block=block, ssl_context=ctx
-        )
+# Seconds to wait for the connection and for each read from the upstream.
+DEFAULT_REQUEST_TIMEOUT = 60
+# Connections kept alive per upstream host.
+DEFAULT_POOL_MAXSIZE = 16
+
+OP_LEGACY_SERVER_CONNECT = getattr(ssl, "OP_LEGACY_SERVER_CONNECT", 0x4)
+
+
+class TimeoutSession(Session):
+    """A `Session` applying a default `timeout` to every request.
+
+    Parsers don't pass a timeout to `session.get`, so without it a single hung
+    upstream holds the calling thread forever.
+    """
+
+    def __init__(self, timeout: float | None = DEFAULT_REQUEST_TIMEOUT):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, *args, **kwargs):
+        if len(args) < 7:
+            # `timeout` was not passed positionally
+            kwargs.setdefault("timeout", self.timeout)
+        with http_request(method, url) as timing:
+            response = super().request(method, url, *args, **kwargs)
+            if timing is not None:
+                timing["status"] = response.status_code
+                if not kwargs.get("stream"):
+                    timing["bytes"] = len(response.content)
+        return response
+
+
+class _TimedConnectionMixin:
+    """Records the connection stages of the traced HTTP request, if any.
+
+    urllib3 resolves the host and opens the socket in one call, so the DNS
+    lookup is part of the `connect` stage.
+    """
+
+    _connect_seconds = 0.0
+
+    def _new_conn(self):
+        started = perf_counter()
+        try:
+            return super()._new_conn()
+        finally:
+            self._connect_seconds = perf_counter() - started
+            record_request_stage("connect", self._connect_seconds)
+
+    def getresponse(self, *args, **kwargs):
+        # Time from the request being sent to the response headers.
+        started = perf_counter()
+        try:
+            return super().getresponse(*args, **kwargs)
+        finally:
+            record_request_stage("ttfb", perf_counter() - started)
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    def connect(self):
+        started = perf_counter()
+        self._connect_seconds = 0.0
+        try:
+            super().connect()
+        finally:
+            record_request_stage(
+                "tls", perf_counter() - started - self._connect_seconds
+            )
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+def shared_ssl_context(legacy: bool = False, verify: bool = True) -> ssl.SSLContext:
+    """Returns an SSL context built once per process.
+
+    urllib3 otherwise builds a new context, and loads the CA bundle in it, for
+    every new connection. Verified and unverified connections get different
+    contexts as urllib3 sets the verify mode of the context it is given.
+    """
+    return _ssl_context(bool(legacy), bool(verify))
+
+
+@cache
+def _ssl_context(legacy: bool, verify: bool) -> ssl.SSLContext:
+    context = create_urllib3_context(
+        cert_reqs=ssl.CERT_REQUIRED if verify else ssl.CERT_NONE
+    )
+    if verify:
+        context.load_verify_locations(extract_zipped_paths(DEFAULT_CA_BUNDLE_PATH))
+    if legacy:
+        context.options |= OP_LEGACY_SERVER_CONNECT
+    return context
+
+
+class PooledHttpAdapter(adapters.HTTPAdapter):
+    """An `HTTPAdapter` handing the shared SSL contexts to urllib3, and timing
+    the connection stages of traced requests."""
+
+    __attrs__ = adapters.HTTPAdapter.__attrs__ + ["legacy"]
+
+    def __init__(self, legacy: bool = False, **kwargs):
+        self.legacy = legacy
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        pool_kwargs.setdefault("ssl_context", shared_ssl_context(self.legacy))
+        super().init_poolmanager(connections, maxsize, block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+    def cert_verify(self, conn, url, verify, cert):
+        super().cert_verify(conn, url, verify, cert)
+        if not url.lower().startswith("https"):
+            return
+        if verify is True or not verify:
+            conn.conn_kw["ssl_context"] = shared_ssl_context(self.legacy, verify)
+            # The CA bundle is already loaded in the shared context.
+            conn.ca_certs = conn.ca_cert_dir = None
+        else:
+            # A custom CA bundle must not leak into the shared context.
+            conn.conn_kw.pop("ssl_context", None)
+
+
+class LegacyHttpAdapter(PooledHttpAdapter):
+    def __init__(self, **kwargs):
+        super().__init__(legacy=True, **kwargs)
+
+
+class PooledSession(TimeoutSession):
+    """A `Session` keeping a pool of warm connections per upstream host.
+
+    Every `scheme://host` gets its own adapter, and so its own pool of up to
+    `pool_maxsize` (or `host_pool_sizes[host]`) keep-alive connections, all
+    sharing the same SSL contexts. Adapters mounted on the session, such as the
+    cassette ones, take precedence over the per-host ones.
+    Responses are transparently decompressed by requests.
+    """
+
+    def __init__(
+        self,
+        timeout: float | None = DEFAULT_REQUEST_TIMEOUT,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        host_pool_sizes: dict[str, int] | None = None,
+        legacy: bool = False,
+    ):
+        super().__init__(timeout)
+        self.pool_maxsize = pool_maxsize
+        self.host_pool_sizes = host_pool_sizes or {}
+        self.legacy = legacy
+        self._host_adapters: dict[str, PooledHttpAdapter] = {}
+        self._lock = Lock()
+        for prefix in ("https://", "http://"):
+            self.mount(prefix, PooledHttpAdapter(legacy=legacy))
+        self._default_adapters = list(self.adapters.values())
+
+    def get_adapter(self, url):
+        adapter = super().get_adapter(url)
+        if not any(adapter is default for default in self._default_adapters):
+            return adapter
+        return self.host_adapter(url)
+
+    def host_adapter(self, url) -> PooledHttpAdapter:
+        """Returns the adapter pooling the connections to the host of `url`."""
+        parts = urlsplit(url)
+        key = f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+        with self._lock:
+            if key not in self._host_adapters:
+                maxsize = self.host_pool_sizes.get(parts.hostname, self.pool_maxsize)
+                self._host_adapters[key] = PooledHttpAdapter(
+                    legacy=self.legacy, pool_connections=1, pool_maxsize=maxsize
+                )
+            return self._host_adapters[key]
+
+    def close(self):
+        super().close()
+        with self._lock:
+            for adapter in self._host_adapters.values():
+                adapter.close()
+            self._host_adapters.clear()
+
+
+_sessions: dict[bool, PooledSession] = {}
+_sessions_lock = Lock()
+
+
+def get_session(legacy: bool = False) -> PooledSession:
+    """Returns the pooled session shared by every parser of this process."""
+    with _sessions_lock:
+        if legacy not in _sessions:
+            _sessions[legacy] = PooledSession(legacy=legacy)
+        return _sessions[legacy]
 
 
 # Use a LegacyHttpAdapter to avoid "unsafe legacy renegotiation disabled" error
 # Original code source: https://stackoverflow.com/questions/71603314/ssl-error-unsafe-legacy-renegotiation-disabled
 def get_session_with_legacy_adapter():
-    session = Session()
-    session.mount("https://", LegacyHttpAdapter())
-    session.mount("http://", LegacyHttpAdapter())
-    return session
+    return get_session(legacy=True)
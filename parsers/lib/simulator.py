@@ -0,0 +1,247 @@
+"""A local stand-in for the upstream APIs, to load test parsers.
+
+`UpstreamSimulator` serves synthetic payloads for a set of upstream hosts
+(see `parsers.test.simulator` for the ENTSOE, EIA, ELEXON and IESO ones) on
+`http://127.0.0.1:<port>/<host>/<path>`. Each response can be delayed (per
+host, see `ReplayLatency`), fail with a 503 at a given rate, and every API key
+(or client without key) is rate limited with a 429 and a `Retry-After`, so that
+the concurrency, retry and rate limiting of a fetch run can be tested at a
+higher volume than the upstreams would allow.
+
+Parsers are pointed at the simulator by `install_simulator`, which redirects
+the requests of a session to the simulated hosts. Overriding the endpoint
+constants of the parsers is not enough, as many URLs are derived from them at
+import time.
+"""
+
+import random
+from collections import Counter
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from time import monotonic, sleep
+from urllib.parse import parse_qsl, quote, urlsplit, urlunsplit
+
+from requests import PreparedRequest, Response
+from requests.adapters import BaseAdapter
+
+from parsers.lib.cache import CACHE_IGNORED_PARAMS
+from parsers.lib.cassette import ReplayLatency
+from parsers.lib.session import PooledSession
+
+# Query parameters holding the API key of a request, rate limited separately.
+KEY_PARAMS = CACHE_IGNORED_PARAMS | {"APIKey"}
+
+
+@dataclass
+class SimulatedResponse:
+    status: int
+    body: bytes
+    content_type: str = "text/plain; charset=utf-8"
+
+
+@dataclass
+class Upstream:
+    """An upstream host and the function answering its requests.
+
+    `handle(path, params)` is called with the path of the request (without the
+    host) and its query parameters. `aliases` are other hosts (e.g. proxies)
+    answered the same way.
+    """
+
+    host: str
+    handle: Callable[[str, dict[str, str]], SimulatedResponse]
+    aliases: tuple[str, ...] = ()
+    error: SimulatedResponse | None = None
+
+    @property
+    def hosts(self) -> tuple[str, ...]:
+        return (self.host, *self.aliases)
+
+
+class _Bucket:
+    def __init__(self, burst: float):
+        self.tokens = burst
+        self.updated = monotonic()
+
+
+class UpstreamSimulator:
+    """Serves `upstreams` on a local port, see the module documentation.
+
+    `rate_limit` is a `(rate, burst)` token bucket of requests per second for
+    each API key and host, `None` disables it. `error_rate` is the share of
+    requests failing with a 503. Random failures and delays are seeded so that
+    runs are reproducible.
+    """
+
+    def __init__(
+        self,
+        upstreams: Iterable[Upstream],
+        latency: ReplayLatency | None = None,
+        error_rate: float = 0.0,
+        rate_limit: tuple[float, float] | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: int | None = 0,
+    ):
+        assert 0 <= error_rate <= 1, "error_rate must be between 0 and 1"
+        self.upstreams = {
+            host: upstream for upstream in upstreams for host in upstream.hosts
+        }
+        self.latency = latency or ReplayLatency()
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        # Requests answered per host and status code
+        self.stats: Counter[tuple[str, int]] = Counter()
+        self._random = random.Random(seed)
+        self._buckets: dict[tuple[str, str], _Bucket] = {}
+        self._lock = Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                simulator._serve(self)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                self.rfile.read(length)
+                simulator._serve(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _throttled(self, host: str, key: str) -> float | None:
+        """Takes a token from the bucket of `key`, or returns the seconds
+        until one is available."""
+        if self.rate_limit is None:
+            return None
+        rate, burst = self.rate_limit
+        with self._lock:
+            bucket = self._buckets.setdefault((host, key), _Bucket(burst))
+            now = monotonic()
+            bucket.tokens = min(burst, bucket.tokens + (now - bucket.updated) * rate)
+            bucket.updated = now
+            if bucket.tokens >= 1:
+                bucket.tokens -= 1
+                return None
+            return (1 - bucket.tokens) / rate
+
+    def _respond(self, upstream: Upstream | None, path: str, params: dict[str, str]):
+        if upstream is None:
+            return SimulatedResponse(404, b"Unknown upstream host")
+        with self._lock:
+            failed = self._random.random() < self.error_rate
+        if failed:
+            return upstream.error or SimulatedResponse(503, b"Service Unavailable")
+        return upstream.handle(path, params)
+
+    def _serve(self, request: BaseHTTPRequestHandler):
+        parts = urlsplit(request.path)
+        host, _, path = parts.path.lstrip("/").partition("/")
+        params = dict(parse_qsl(parts.query, keep_blank_values=True))
+        upstream = self.upstreams.get(host)
+        key = next(
+            (params[name] for name in KEY_PARAMS if name in params),
+            request.client_address[0],
+        )
+        headers = {}
+        retry_after = self._throttled(host, key)
+        if retry_after is not None:
+            response = SimulatedResponse(429, b"Too Many Requests")
+            headers["Retry-After"] = f"{retry_after:.3f}"
+        else:
+            delay = self.latency.delay(host)
+            if delay:
+                sleep(delay)
+            response = self._respond(upstream, "/" + path, params)
+        with self._lock:
+            self.stats[(host, response.status)] += 1
+        request.send_response(response.status)
+        request.send_header("Content-Type", response.content_type)
+        request.send_header("Content-Length", str(len(response.body)))
+        for name, value in headers.items():
+            request.send_header(name, value)
+        request.end_headers()
+        request.wfile.write(response.body)
+
+    def start(self) -> "UpstreamSimulator":
+        self._thread = Thread(
+            target=self._server.serve_forever, name="upstream-simulator", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "UpstreamSimulator":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def simulated_url(simulator_url: str, url: str) -> str:
+    """Returns the URL of `url` on the simulator at `simulator_url`."""
+    parts = urlsplit(url)
+    path = quote(parts.netloc.lower()) + parts.path
+    return urlunsplit(
+        urlsplit(simulator_url)._replace(path=f"/{path}", query=parts.query)
+    )
+
+
+class SimulatorAdapter(BaseAdapter):
+    """Sends requests to the simulator at `url` instead of their host."""
+
+    def __init__(self, url: str, send_through: Callable[[str], BaseAdapter]):
+        super().__init__()
+        self.url = url
+        self.send_through = send_through
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        original_url = request.url or ""
+        request = request.copy()
+        request.url = simulated_url(self.url, original_url)
+        request.headers.pop("Host", None)
+        response = self.send_through(request.url).send(request, **kwargs)
+        # Parsers check the URL of some responses.
+        response.url = original_url
+        return response
+
+    def close(self):
+        pass
+
+
+def install_simulator(
+    session: PooledSession, url: str, hosts: Iterable[str]
+) -> SimulatorAdapter:
+    """Redirects the requests of `session` to `hosts` to the simulator at `url`.
+
+    Requests to other hosts are left untouched.
+    """
+    adapter = SimulatorAdapter(url, session.host_adapter)
+    for host in hosts:
+        session.mount(f"https://{host}/", adapter)
+        session.mount(f"http://{host}/", adapter)
+    return adapter
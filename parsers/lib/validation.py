@@ -7,6 +7,8 @@ from typing import Any
 import numpy as np
 import pandas as pd
 
+from electricitymap.contrib.lib.tracing import timed
+
 
 def has_value_for_key(datapoint: dict[str, Any], key: str, logger: Logger):
     """
@@ -145,6 +147,7 @@ def validate_exchange(
     return datapoint
 
 
+@timed("validate")
 def validate(datapoint: dict, logger: Logger | None, **kwargs) -> dict[str, Any] | None:
     """
     Validates a production datapoint based on given constraints.
@@ -2,10 +2,11 @@ from bs4 import BeautifulSoup
 from requests import Response, Session
 
 from .exceptions import ParserException
+from .session import get_session
 
 
 def get_response(zone_key: str, url: str, session: Session | None = None):
-    ses = session or Session()
+    ses = session or get_session()
     response: Response = ses.get(url)
     if response.status_code != 200:
         raise ParserException(zone_key, f"Response code: {response.status_code}")
@@ -15,7 +16,7 @@ def get_response(zone_key: str, url: str, session: Session | None = None):
 def get_response_with_params(
     zone_key: str, url, session: Session | None = None, params=None
 ):
-    ses = session or Session()
+    ses = session or get_session()
     response: Response = ses.get(url, params=params)
     if response.status_code != 200:
         raise ParserException(zone_key, f"Response code: {response.status_code}")
@@ -0,0 +1,321 @@
+"""Benchmark cases replaying the payloads of `parsers/test/mocks`.
+
+Besides the recorded payloads, some cases scale them up synthetically (e.g. a
+year of ENTSOE A75 production) to measure how parsers behave on backfills.
+Run them with `poetry run benchmark`, and the slow ones with `--slow`.
+
+The baseline of the machine is stored in `BASELINE_FILE`, which is not
+committed.
+"""
+
+import json
+import re
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+from requests import Session
+from requests_mock import ANY, GET, POST, Adapter
+
+from electricitymap.contrib.lib.types import ZoneKey
+from parsers.lib.benchmark import BenchmarkCase
+from parsers.lib.ratelimit import get_rate_limiter
+
+MOCKS_DIR = Path(__file__).parent.parent.joinpath("mocks")
+BASELINE_FILE = Path(__file__).parent.joinpath("baseline.json")
+
+# Start of the synthetic payloads.
+SYNTHETIC_START = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+_RESOLUTIONS = {"PT15M": 15, "PT30M": 30, "PT60M": 60}
+
+
+def _read_mock(path: str) -> bytes:
+    return MOCKS_DIR.joinpath(path).read_bytes()
+
+
+def _mocked_session() -> tuple[Session, Adapter]:
+    session = Session()
+    adapter = Adapter()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session, adapter
+
+
+# Token given to the parsers rate limiting requests per token.
+BENCHMARK_TOKEN = "benchmark"
+
+
+def _unthrottled(env_var: str):
+    """Sets up a limiter of the benchmark token that never waits, so that it
+    doesn't weigh in the measures."""
+    get_rate_limiter(env_var, [BENCHMARK_TOKEN], rate=1e9, burst=1e9)
+
+
+def _format_entsoe_datetime(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%dT%H:%MZ")
+
+
+def scale_entsoe_document(document: str, start: datetime, days: int) -> str:
+    """Stretches every period of an ENTSOE document over `days` days from
+    `start`, repeating its points."""
+    end = start + timedelta(days=days)
+    interval = (
+        f"<start>{_format_entsoe_datetime(start)}</start>"
+        f"<end>{_format_entsoe_datetime(end)}</end>"
+    )
+
+    def scale_period(match: re.Match) -> str:
+        period = match.group(0)
+        resolution = re.search(r"<resolution>([^<]+)</resolution>", period).group(1)
+        points = re.findall(r"<Point>.*?</Point>", period, flags=re.DOTALL)
+        count = days * 24 * 60 // _RESOLUTIONS[resolution]
+        scaled_points = "".join(
+            re.sub(
+                r"<position>\d+</position>",
+                f"<position>{position + 1}</position>",
+                points[position % len(points)],
+            )
+            for position in range(count)
+        )
+        return (
+            f"<Period><timeInterval>{interval}</timeInterval>"
+            f"<resolution>{resolution}</resolution>{scaled_points}</Period>"
+        )
+
+    document = re.sub(
+        r"<time_Period.timeInterval>.*?</time_Period.timeInterval>",
+        f"<time_Period.timeInterval>{interval}</time_Period.timeInterval>",
+        document,
+        flags=re.DOTALL,
+    )
+    return re.sub(r"<Period>.*?</Period>", scale_period, document, flags=re.DOTALL)
+
+
+def scale_eia_payload(payload: dict, start: datetime, hours: int) -> dict:
+    """Repeats the datapoints of an EIA payload over `hours` hours from `start`."""
+    data = payload["response"]["data"]
+    scaled = [
+        {
+            **data[hour % len(data)],
+            "period": (start + timedelta(hours=hour)).strftime("%Y-%m-%dT%H"),
+        }
+        for hour in range(hours)
+    ]
+    return {**payload, "response": {**payload["response"], "data": scaled}}
+
+
+def _zone_keys(key: str) -> list[ZoneKey]:
+    """Arguments of a fetch function for a zone or exchange key."""
+    return [ZoneKey(zone_key) for zone_key in key.split("->")]
+
+
+def entsoe_case(
+    name: str,
+    fetch: str,
+    key: str,
+    payload: Callable[[], bytes],
+    slow: bool = False,
+) -> BenchmarkCase:
+    def setup() -> Callable[[], Any]:
+        from parsers import ENTSOE
+
+        _unthrottled("ENTSOE_REFETCH_TOKEN")
+        session, adapter = _mocked_session()
+        adapter.register_uri(GET, ANY, content=payload())
+        function = getattr(ENTSOE, fetch)
+        return lambda: function(
+            *_zone_keys(key), session=session, target_datetime=SYNTHETIC_START
+        )
+
+    # Past target datetimes are fetched with the refetch token.
+    return BenchmarkCase(
+        name, setup, {"ENTSOE_REFETCH_TOKEN": BENCHMARK_TOKEN}, slow=slow
+    )
+
+
+def _entsoe_mock(path: str, days: int | None = None) -> Callable[[], bytes]:
+    def payload() -> bytes:
+        document = _read_mock(f"ENTSOE/{path}")
+        if days is None:
+            return document
+        return scale_entsoe_document(
+            document.decode("utf-8"), SYNTHETIC_START, days
+        ).encode("utf-8")
+
+    return payload
+
+
+def eia_case(
+    name: str, fetch: str, key: str, payload: Callable[[], dict]
+) -> BenchmarkCase:
+    def setup() -> Callable[[], Any]:
+        from parsers import EIA
+
+        _unthrottled("EIA_KEY")
+        session, adapter = _mocked_session()
+        adapter.register_uri(GET, ANY, json=payload())
+        function = getattr(EIA, fetch)
+        return lambda: function(*_zone_keys(key), session=session)
+
+    return BenchmarkCase(name, setup, {"EIA_KEY": BENCHMARK_TOKEN})
+
+
+def _eia_mock(path: str, hours: int | None = None) -> Callable[[], dict]:
+    def payload() -> dict:
+        data = json.loads(_read_mock(f"EIA/{path}"))
+        if hours is None:
+            return data
+        return scale_eia_payload(data, SYNTHETIC_START, hours)
+
+    return payload
+
+
+def _iemop_setup() -> Callable[[], Any]:
+    from parsers.IEMOP import REPORTS_ADMIN_URL, fetch_production
+
+    session, adapter = _mocked_session()
+    adapter.register_uri(
+        POST, REPORTS_ADMIN_URL, content=_read_mock("IEMOP/list_reports_items.json")
+    )
+    adapter.register_uri(GET, ANY, content=_read_mock("IEMOP/reports_content"))
+    return lambda: fetch_production(
+        zone_key=ZoneKey("PH-LU"),
+        session=session,
+        target_datetime=datetime(2023, 9, 14, tzinfo=timezone.utc),
+    )
+
+
+def _kpx_realtime_setup() -> Callable[[], Any]:
+    from parsers.KPX import REAL_TIME_URL, fetch_production
+
+    session, adapter = _mocked_session()
+    adapter.register_uri(GET, REAL_TIME_URL, content=_read_mock("KPX/realtime.html"))
+    return lambda: fetch_production(zone_key=ZoneKey("KR"), session=session)
+
+
+def _kpx_historical_setup() -> Callable[[], Any]:
+    from parsers.KPX import HISTORICAL_PRODUCTION_URL, fetch_production
+
+    session, adapter = _mocked_session()
+    adapter.register_uri(
+        POST, HISTORICAL_PRODUCTION_URL, content=_read_mock("KPX/historical.html")
+    )
+    adapter.register_uri(GET, HISTORICAL_PRODUCTION_URL, content=None)
+    return lambda: fetch_production(
+        zone_key=ZoneKey("KR"),
+        session=session,
+        target_datetime=datetime(2023, 9, 1, tzinfo=timezone.utc),
+    )
+
+
+def _ntesmo_setup() -> Callable[[], Any]:
+    from parsers import NTESMO
+
+    session, adapter = _mocked_session()
+    adapter.register_uri(ANY, ANY, content=_read_mock("AU/NTESMO.xlsx"))
+    # The daily reports are listed in an index page of the year.
+    adapter.register_uri(
+        ANY,
+        NTESMO.INDEX_URL.format(2022),
+        text='<div class="smp-tiles-article__item"><a href="https://ntesmo.com.au/'
+        "__data/assets/excel_doc/0013/116113/Market-Information_System-Control-"
+        'daily-trading-day_220401.xlsx"><div class="smp-tiles-article__title">'
+        "01 December 2022</div></a></div>",
+    )
+    return lambda: NTESMO.fetch_production_mix(
+        ZoneKey("AU-NT"), session, target_datetime=datetime(2022, 12, 1)
+    )
+
+
+def _us_spp_setup() -> Callable[[], Any]:
+    from pandas import read_pickle
+
+    from parsers import US_SPP
+
+    data = read_pickle(MOCKS_DIR.joinpath("US_SPP_Gen_Mix.pkl"))
+
+    def run():
+        with patch("parsers.US_SPP.get_data", return_value=data):
+            return US_SPP.fetch_production()
+
+    return run
+
+
+CASES: list[BenchmarkCase] = [
+    entsoe_case(
+        "ENTSOE.fetch_production FI",
+        "fetch_production",
+        "FI",
+        _entsoe_mock("FI_production.xml"),
+    ),
+    entsoe_case(
+        "ENTSOE.fetch_production NO-NO5",
+        "fetch_production",
+        "NO-NO5",
+        _entsoe_mock("NO-NO5_production-negatives.xml"),
+    ),
+    entsoe_case(
+        "ENTSOE.fetch_price FR",
+        "fetch_price",
+        "FR",
+        _entsoe_mock("FR_prices.xml"),
+    ),
+    entsoe_case(
+        "ENTSOE.fetch_production FI week",
+        "fetch_production",
+        "FI",
+        _entsoe_mock("FI_production.xml", days=7),
+    ),
+    entsoe_case(
+        # About 15s per run.
+        "ENTSOE.fetch_production FI year",
+        "fetch_production",
+        "FI",
+        _entsoe_mock("FI_production.xml", days=365),
+        slow=True,
+    ),
+    entsoe_case(
+        "ENTSOE.fetch_price FR year",
+        "fetch_price",
+        "FR",
+        _entsoe_mock("FR_prices.xml", days=365),
+    ),
+    entsoe_case(
+        "ENTSOE.fetch_exchange DE->FR",
+        "fetch_exchange",
+        "DE->FR",
+        _entsoe_mock("DE_FR_exchange_import.xml"),
+    ),
+    entsoe_case(
+        "ENTSOE.fetch_exchange DE->FR year",
+        "fetch_exchange",
+        "DE->FR",
+        _entsoe_mock("DE_FR_exchange_import.xml", days=365),
+    ),
+    eia_case(
+        "EIA.fetch_consumption US-NW-BPAT",
+        "fetch_consumption",
+        "US-NW-BPAT",
+        _eia_mock("US_NW_BPAT-consumption.json"),
+    ),
+    eia_case(
+        "EIA.fetch_consumption US-NW-BPAT year",
+        "fetch_consumption",
+        "US-NW-BPAT",
+        _eia_mock("US_NW_BPAT-consumption.json", hours=365 * 24),
+    ),
+    eia_case(
+        "EIA.fetch_exchange US-FLA-FPC->US-FLA-FPL",
+        "fetch_exchange",
+        "US-FLA-FPC->US-FLA-FPL",
+        _eia_mock("US-FLA-FPC_US-FLA-FPL_exchange.json"),
+    ),
+    BenchmarkCase("IEMOP.fetch_production PH-LU", _iemop_setup),
+    BenchmarkCase("KPX.fetch_production KR realtime", _kpx_realtime_setup),
+    BenchmarkCase("KPX.fetch_production KR historical", _kpx_historical_setup),
+    BenchmarkCase("NTESMO.fetch_production_mix AU-NT", _ntesmo_setup),
+    BenchmarkCase("US_SPP.fetch_production", _us_spp_setup),
+]
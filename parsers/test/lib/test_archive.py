@@ -0,0 +1,66 @@
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+
+from parsers.lib.archive import ArchiveWriter, check_codec
+
+
+class TestArchiveWriter(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.directory.name) / "run.zip")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+        super().tearDown()
+
+    def test_concurrent_writes(self):
+        with ArchiveWriter(self.path, max_queue_size=4) as archive:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                executor.map(
+                    lambda i: archive.write(f"entry_{i}.txt", f"data {i}"), range(50)
+                )
+        self.assertEqual(archive.entries, 50)
+        with ZipFile(self.path) as zf:
+            self.assertEqual(len(zf.namelist()), 50)
+            self.assertEqual(zf.read("entry_7.txt"), b"data 7")
+            self.assertEqual(zf.getinfo("entry_7.txt").compress_type, ZIP_DEFLATED)
+
+    def test_uncompressed(self):
+        with ArchiveWriter(self.path, codec="none") as archive:
+            archive.write("StartDate.txt", "2023-01-01T00:00:00")
+        with ZipFile(self.path) as zf:
+            self.assertEqual(zf.getinfo("StartDate.txt").compress_type, ZIP_STORED)
+
+    def test_unknown_codec(self):
+        with self.assertRaises(ValueError):
+            ArchiveWriter(self.path, codec="brotli")
+
+    def test_writer_errors_are_raised(self):
+        archive = ArchiveWriter(str(Path(self.directory.name) / "missing" / "run.zip"))
+        archive.start()
+        with self.assertRaises(RuntimeError):
+            try:
+                archive.write("entry.txt", "data")
+            finally:
+                archive.close()
+
+
+class TestCheckCodec(unittest.TestCase):
+    def test_unknown_codec(self):
+        with self.assertRaises(ValueError):
+            check_codec("lz4")
+
+    def test_zstd_without_zstandard(self):
+        with patch.dict("sys.modules", {"zstandard": None}):
+            with self.assertRaisesRegex(ImportError, "archive` extra"):
+                check_codec("zstd")
+            check_codec("deflate")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from parsers.lib.backfill import (
+    DEFAULT_REFETCH_FREQUENCY,
+    BackfillCheckpoint,
+    deduplicate,
+    refetch_frequency_of,
+    split_windows,
+)
+from parsers.lib.config import refetch_frequency
+
+START = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+
+class TestSplitWindows(unittest.TestCase):
+    def test_windows_cover_the_range(self):
+        targets = split_windows(START, START + timedelta(days=5), timedelta(days=2))
+        self.assertEqual(
+            targets,
+            [
+                START + timedelta(days=1),
+                START + timedelta(days=3),
+                START + timedelta(days=5),
+            ],
+        )
+
+    def test_single_window(self):
+        self.assertEqual(split_windows(START, START, timedelta(days=2)), [START])
+
+    def test_refetch_frequency_of(self):
+        @refetch_frequency(timedelta(days=2))
+        def parser():
+            pass
+
+        self.assertEqual(refetch_frequency_of(parser), timedelta(days=2))
+        self.assertEqual(refetch_frequency_of(lambda: None), DEFAULT_REFETCH_FREQUENCY)
+
+
+class TestDeduplicate(unittest.TestCase):
+    def test_most_recent_window_wins(self):
+        older = [
+            {"datetime": START, "value": 1},
+            {"datetime": START + timedelta(hours=1), "value": 2},
+        ]
+        newer = [
+            {"datetime": START + timedelta(hours=1), "value": 3},
+            {"datetime": START + timedelta(hours=2), "value": 4},
+        ]
+        self.assertEqual([e["value"] for e in deduplicate([older, newer])], [1, 3, 4])
+
+    def test_several_units_per_datetime(self):
+        def window(dt, values):
+            return [
+                {"datetime": dt, "zoneKey": "FI", "unitKey": unit, "value": value}
+                for unit, value in values.items()
+            ]
+
+        older = window(START, {"a": 1, "b": 2}) + window(
+            START + timedelta(hours=1), {"a": 3, "b": 4}
+        )
+        newer = window(START + timedelta(hours=1), {"a": 5, "b": 6})
+        self.assertEqual(
+            [(e["unitKey"], e["value"]) for e in deduplicate([older, newer])],
+            [("a", 1), ("b", 2), ("a", 5), ("b", 6)],
+        )
+
+
+class TestBackfillCheckpoint(unittest.TestCase):
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint = BackfillCheckpoint(directory)
+            self.assertFalse(checkpoint.is_done("DE", "production", START))
+            events = [
+                {
+                    "zoneKey": "DE",
+                    "datetime": START,
+                    "production": {"wind": 1000.0},
+                    "source": "entsoe.eu",
+                }
+            ]
+            checkpoint.save("DE", "production", START, events)
+            self.assertTrue(checkpoint.is_done("DE", "production", START))
+            self.assertEqual(checkpoint.load("DE", "production", START), events)
+
+
+if __name__ == "__main__":
+    unittest.main()
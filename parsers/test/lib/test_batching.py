@@ -0,0 +1,95 @@
+import json
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+from unittest.mock import MagicMock, patch
+
+from parsers import ENTSOE, ONS
+from parsers.lib.batching import BatchCalls, batch_parser
+
+
+class TestBatchCalls(unittest.TestCase):
+    def test_calls_batch_once(self):
+        release = Event()
+        batch = MagicMock(
+            side_effect=lambda **kwargs: release.wait() and {"A": [1], "B": [2]}
+        )
+        batches = BatchCalls()
+        with ThreadPoolExecutor(4) as executor:
+            futures = [executor.submit(batches.call, batch, key) for key in "AABB"]
+            release.set()
+            results = [future.result() for future in futures]
+        self.assertEqual(results, [[1], [1], [2], [2]])
+        batch.assert_called_once()
+        self.assertEqual(batches.call(batch, "C"), [])
+
+    def test_target_datetime_is_a_separate_batch(self):
+        batch = MagicMock(return_value={"A": [1]})
+        batches = BatchCalls()
+        batches.call(batch, "A")
+        batches.call(batch, "A", target_datetime="2024-01-01")
+        self.assertEqual(batch.call_count, 2)
+        batches.clear()
+        batches.call(batch, "A")
+        self.assertEqual(batch.call_count, 3)
+
+    def test_failures(self):
+        batches = BatchCalls()
+        failing = MagicMock(side_effect=ValueError("upstream down"))
+        for key in "AB":
+            with self.assertRaisesRegex(ValueError, "upstream down"):
+                batches.call(failing, key)
+        failing.assert_called_once()
+
+        partial = MagicMock(return_value={"A": [1], "B": KeyError("B")})
+        self.assertEqual(batches.call(partial, "A"), [1])
+        with self.assertRaises(KeyError):
+            batches.call(partial, "B")
+
+    def test_zone_keys_of_the_run(self):
+        batches = BatchCalls(
+            [("DE", "price"), ("FR", "price"), ("FR", "production"), ("BR-CS", "price")]
+        )
+        with patch(
+            "parsers.ENTSOE._fetch_for_all_zones", return_value={"DE": [1]}
+        ) as fetch_for_all_zones:
+            self.assertEqual(batches.call(ENTSOE.fetch_price_for_all_zones, "DE"), [1])
+        self.assertEqual(fetch_for_all_zones.call_args.args[1], ["DE", "FR"])
+
+
+class TestBatchParser(unittest.TestCase):
+    def test_batch_parser(self):
+        self.assertIs(
+            batch_parser("production", "BR-CS"), ONS.fetch_production_for_all_zones
+        )
+        self.assertIs(
+            batch_parser("exchange", "BR-CS->BR-N"), ONS.fetch_exchange_for_all_zones
+        )
+        self.assertIs(
+            batch_parser("production", "PL"), ENTSOE.fetch_production_for_all_zones
+        )
+        self.assertIsNone(batch_parser("production", "FR"))
+        self.assertIsNone(batch_parser("production", "not-a-zone"))
+        self.assertIsNone(batch_parser("productionCapacity", "BR-CS"))
+
+    def test_ons_batch_matches_zone_parsers(self):
+        with open("parsers/test/mocks/ONS/BR.json") as f:
+            fake_data = json.load(f)
+        with patch("parsers.ONS.get_data", return_value=fake_data) as get_data:
+            production = ONS.fetch_production_for_all_zones()
+            exchanges = ONS.fetch_exchange_for_all_zones()
+            self.assertEqual(get_data.call_count, 2)
+            for zone_key in ONS.REGIONS:
+                self.assertEqual(production[zone_key], ONS.fetch_production(zone_key))
+            # BR-S->UY is fetched by the UY parser
+            self.assertEqual(set(exchanges), set(ONS.EXCHANGES) - {"BR-S->UY"})
+            for sorted_zone_keys in exchanges:
+                zone_key1, zone_key2 = sorted_zone_keys.split("->")
+                self.assertEqual(
+                    exchanges[sorted_zone_keys],
+                    ONS.fetch_exchange(zone_key1, zone_key2),
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import os
+import re
+import tempfile
+import unittest
+from datetime import datetime, timezone
+
+from parsers.lib.benchmark import (
+    BenchmarkCase,
+    BenchmarkResult,
+    compare,
+    read_baseline,
+    run_case,
+    write_baseline,
+)
+from parsers.test.benchmarks import (
+    CASES,
+    MOCKS_DIR,
+    scale_eia_payload,
+    scale_entsoe_document,
+)
+
+START = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+
+class TestRunCase(unittest.TestCase):
+    def test_run_case(self):
+        calls = []
+
+        def setup():
+            calls.append("setup")
+            return lambda: calls.append("run") or [bytearray(100_000)]
+
+        result = run_case(BenchmarkCase("case", setup), repeat=3)
+        self.assertEqual(calls, ["setup"] + ["run"] * 5)
+        self.assertEqual(result.name, "case")
+        self.assertEqual(result.events, 1)
+        self.assertGreaterEqual(result.peak_bytes, 100_000)
+        self.assertGreaterEqual(result.seconds, 0)
+
+    def test_environment_is_restored(self):
+        os.environ.pop("BENCHMARK_TEST_VAR", None)
+        case = BenchmarkCase(
+            "case",
+            lambda: lambda: [os.environ["BENCHMARK_TEST_VAR"]],
+            env={"BENCHMARK_TEST_VAR": "set"},
+        )
+        self.assertEqual(run_case(case, repeat=1).events, 1)
+        self.assertNotIn("BENCHMARK_TEST_VAR", os.environ)
+
+    def test_recorded_cases_run(self):
+        for case in CASES:
+            if case.slow or case.name.endswith(("week", "year")):
+                continue
+            with self.subTest(case=case.name):
+                self.assertGreater(run_case(case, repeat=1).events, 0)
+
+
+class TestBaseline(unittest.TestCase):
+    def test_compare(self):
+        baseline = {
+            "a": {"seconds": 1.0, "peak_bytes": 1000, "events": 1},
+            "b": {"seconds": 1.0, "peak_bytes": 1000, "events": 1},
+        }
+        results = [
+            BenchmarkResult("a", 1.2, 1000, 1),
+            BenchmarkResult("b", 1.5, 2000, 1),
+            BenchmarkResult("c", 9.0, 9000, 1),
+        ]
+        regressions = compare(results, baseline, threshold=0.25, min_bytes=0)
+        self.assertEqual(
+            [(r.name, r.metric) for r in regressions],
+            [("b", "seconds"), ("b", "peak_bytes")],
+        )
+        self.assertEqual(regressions[1].ratio, 2)
+        self.assertEqual(compare(results, baseline, threshold=1, min_bytes=0), [])
+
+    def test_noise_floor(self):
+        baseline = {"a": {"seconds": 0.002, "peak_bytes": 1000, "events": 1}}
+        results = [BenchmarkResult("a", 0.004, 3000, 1)]
+        self.assertEqual(compare(results, baseline), [])
+        self.assertEqual(
+            [r.metric for r in compare(results, baseline, min_seconds=0.001)],
+            ["seconds"],
+        )
+
+    def test_write_keeps_other_cases(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "baseline.json")
+            self.assertEqual(read_baseline(path), {})
+            write_baseline(path, [BenchmarkResult("a", 1.0, 10, 1)])
+            write_baseline(path, [BenchmarkResult("b", 2.0, 20, 2)])
+            self.assertEqual(
+                read_baseline(path),
+                {
+                    "a": {"seconds": 1.0, "peak_bytes": 10, "events": 1},
+                    "b": {"seconds": 2.0, "peak_bytes": 20, "events": 2},
+                },
+            )
+
+
+class TestSyntheticPayloads(unittest.TestCase):
+    def test_scale_entsoe_document(self):
+        document = MOCKS_DIR.joinpath("ENTSOE/FR_prices.xml").read_text()
+        scaled = scale_entsoe_document(document, START, days=3)
+        periods = re.findall(r"<Period>.*?</Period>", scaled, flags=re.DOTALL)
+        self.assertEqual(len(periods), 2)
+        for period in periods:
+            positions = re.findall(r"<position>(\d+)</position>", period)
+            self.assertEqual(positions, [str(i) for i in range(1, 73)])
+            self.assertIn("<start>2022-01-01T00:00Z</start>", period)
+            self.assertIn("<end>2022-01-04T00:00Z</end>", period)
+
+    def test_scale_eia_payload(self):
+        payload = {"response": {"data": [{"period": "x", "value": 1}], "total": 1}}
+        scaled = scale_eia_payload(payload, START, hours=48)
+        data = scaled["response"]["data"]
+        self.assertEqual(len(data), 48)
+        self.assertEqual(data[0], {"period": "2022-01-01T00", "value": 1})
+        self.assertEqual(data[-1]["period"], "2022-01-02T23")
+        self.assertEqual(scaled["response"]["total"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
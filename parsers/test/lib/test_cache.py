@@ -0,0 +1,89 @@
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from requests_mock import ANY, GET, Adapter
+
+from parsers.lib.cache import CachedSession, cache_key
+
+
+class TestCacheKey(unittest.TestCase):
+    def test_params_are_part_of_the_key(self):
+        self.assertEqual(
+            cache_key("get", "https://example.com/api", {"b": "2", "a": "1"}),
+            cache_key("GET", "https://example.com/api?a=1&b=2"),
+        )
+        self.assertNotEqual(
+            cache_key("GET", "https://example.com/api", {"a": "1"}),
+            cache_key("GET", "https://example.com/api", {"a": "2"}),
+        )
+
+    def test_tokens_are_ignored(self):
+        self.assertEqual(
+            cache_key("GET", "https://example.com/api", {"securityToken": "a"}),
+            cache_key("GET", "https://example.com/api", {"securityToken": "b"}),
+        )
+        self.assertEqual(
+            cache_key("GET", "https://example.com/api?api_key=a&x=1"),
+            cache_key("GET", "https://example.com/api?x=1&api_key=b"),
+        )
+
+
+class TestCachedSession(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.calls = 0
+        self.session = CachedSession(ttl=timedelta(minutes=1))
+        self.adapter = Adapter()
+        self.session.mount("https://", self.adapter)
+
+    def _callback(self, request, context):
+        self.calls += 1
+        time.sleep(0.05)
+        return "payload"
+
+    def test_responses_are_shared(self):
+        self.adapter.register_uri(GET, ANY, text=self._callback)
+        first = self.session.get("https://example.com/api", params={"a": "1"})
+        second = self.session.get("https://example.com/api", params={"a": "1"})
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(first.text, "payload")
+        self.assertEqual(second.text, "payload")
+        self.assertIsNot(first, second)
+        self.assertEqual(self.session.hits, 1)
+
+    def test_concurrent_requests_are_coalesced(self):
+        self.adapter.register_uri(GET, ANY, text=self._callback)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            responses = list(
+                executor.map(
+                    lambda _: self.session.get("https://example.com/api"), range(8)
+                )
+            )
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(all(r.text == "payload" for r in responses))
+
+    def test_errors_are_not_cached(self):
+        self.adapter.register_uri(GET, ANY, status_code=429, text=self._callback)
+        self.session.get("https://example.com/api")
+        self.session.get("https://example.com/api")
+        self.assertEqual(self.calls, 2)
+
+    def test_expired_responses_are_refetched(self):
+        self.session.ttl = 0
+        self.adapter.register_uri(GET, ANY, text=self._callback)
+        self.session.get("https://example.com/api")
+        self.session.get("https://example.com/api")
+        self.assertEqual(self.calls, 2)
+
+    def test_default_timeout(self):
+        self.adapter.register_uri(GET, ANY, text="payload")
+        self.session.get("https://example.com/api", params={"a": "1"})
+        self.assertEqual(self.adapter.last_request.timeout, self.session.timeout)
+        self.session.get("https://example.com/api", params={"a": "2"}, timeout=5)
+        self.assertEqual(self.adapter.last_request.timeout, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+from freezegun import freeze_time
+from requests import ConnectionError, Session
+from requests_mock import ANY, GET, POST, Adapter
+
+from parsers.lib.cassette import (
+    RECORD,
+    REPLAY,
+    Cassette,
+    CassetteAdapter,
+    ReplayLatency,
+    install_cassette,
+)
+from parsers.lib.session import PooledSession
+
+
+class TestCassette(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = Path(tmp.name)
+        self.upstream = Adapter()
+        self.recorder = Session()
+        self.recorder.mount(
+            "https://",
+            CassetteAdapter(
+                Cassette(self.directory), RECORD, send_through=lambda url: self.upstream
+            ),
+        )
+
+    def replay_session(self, latency=None) -> PooledSession:
+        session = PooledSession()
+        install_cassette(session, Cassette(self.directory), REPLAY, latency)
+        return session
+
+    def test_record_and_replay(self):
+        self.upstream.register_uri(
+            GET,
+            "https://example.com/data",
+            content=b"payload",
+            headers={"Content-Type": "text/plain; charset=utf-8", "Set-Cookie": "a"},
+        )
+        self.upstream.register_uri(POST, "https://example.com/form", text="posted")
+        recorded = self.recorder.get("https://example.com/data?securityToken=a")
+        self.assertEqual(recorded.content, b"payload")
+        self.recorder.post("https://example.com/form", data={"page": "1"})
+
+        session = self.replay_session()
+        # API tokens are not part of the key of a request.
+        response = session.get("https://example.com/data?securityToken=b")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.text, "payload")
+        self.assertEqual(response.encoding, "utf-8")
+        self.assertNotIn("Set-Cookie", response.headers)
+        self.assertEqual(
+            session.post("https://example.com/form", data={"page": "1"}).text,
+            "posted",
+        )
+        with self.assertRaises(ConnectionError):
+            session.post("https://example.com/form", data={"page": "2"})
+        with self.assertRaises(ConnectionError):
+            session.get("https://example.com/other")
+
+    def test_replay_an_hour_after_recording(self):
+        self.upstream.register_uri(GET, ANY, text="payload")
+
+        def fetch(session):
+            # Like ENTSOE, the query is built from the current hour.
+            now = datetime.now(timezone.utc)
+            return session.get(
+                "https://example.com/data",
+                params={"periodEnd": now.strftime("%Y%m%d%H00")},
+            )
+
+        cassette = Cassette(self.directory / "run")
+        with freeze_time("2024-01-10 10:30:00"):
+            recorder = Session()
+            adapter = CassetteAdapter(cassette, RECORD, lambda url: self.upstream)
+            recorder.mount("https://", adapter)
+            fetch(recorder)
+        self.assertEqual(
+            cassette.recorded_at, datetime(2024, 1, 10, 10, 30, tzinfo=timezone.utc)
+        )
+
+        session = PooledSession()
+        install_cassette(session, cassette, REPLAY)
+        with freeze_time("2024-01-10 11:45:00"):
+            with self.assertRaises(ConnectionError):
+                fetch(session)
+            with cassette.replay_clock():
+                self.assertEqual(fetch(session).text, "payload")
+                self.assertLess(
+                    datetime.now(timezone.utc) - cassette.recorded_at,
+                    timedelta(minutes=1),
+                )
+
+    def test_replay_clock_without_recording_time(self):
+        with Cassette(self.directory).replay_clock():
+            self.assertGreater(datetime.now(), datetime(2024, 1, 1))
+
+    def test_bodies_are_stored_once(self):
+        self.upstream.register_uri(GET, ANY, content=b"same")
+        self.recorder.get("https://example.com/a")
+        self.recorder.get("https://example.com/b")
+        bodies = [
+            p for p in self.directory.joinpath("bodies").rglob("*") if p.is_file()
+        ]
+        self.assertEqual(len(bodies), 1)
+        lines = self.directory.joinpath("index.jsonl").read_text().splitlines()
+        self.assertEqual(len(lines), 2)
+
+    def test_replays_in_recorded_order(self):
+        self.upstream.register_uri(
+            GET,
+            "https://example.com/",
+            [{"text": "first"}, {"text": "second", "status_code": 503}],
+        )
+        self.recorder.get("https://example.com/")
+        self.recorder.get("https://example.com/")
+        session = self.replay_session()
+        self.assertEqual(session.get("https://example.com/").text, "first")
+        second = session.get("https://example.com/")
+        self.assertEqual((second.status_code, second.text), (503, "second"))
+        # The last response is repeated.
+        self.assertEqual(session.get("https://example.com/").text, "second")
+
+    def test_stream(self):
+        self.upstream.register_uri(GET, ANY, content=b"image")
+        recorded = self.recorder.get("https://example.com/plot.png", stream=True)
+        self.assertEqual(recorded.raw.read(), b"image")
+        replayed = self.replay_session().get(
+            "https://example.com/plot.png", stream=True
+        )
+        self.assertEqual(replayed.raw.read(), b"image")
+        self.assertEqual(list(replayed.iter_content(2)), [b"im", b"ag", b"e"])
+
+    def test_latency(self):
+        self.upstream.register_uri(GET, ANY, text="ok")
+        self.recorder.get("https://example.com/")
+        session = self.replay_session(ReplayLatency.from_string("example.com=2", "0"))
+        with patch("parsers.lib.cassette.sleep") as sleep:
+            self.assertEqual(session.get("https://example.com/").text, "ok")
+        sleep.assert_called_once_with(2.0)
+
+
+class TestReplayLatency(unittest.TestCase):
+    def test_from_string(self):
+        latency = ReplayLatency.from_string("api.eia.gov=0.5:0.2,b.com=1", "0.1")
+        self.assertEqual(latency.default, (0.1, 0))
+        self.assertEqual(
+            latency.overrides, {"api.eia.gov": (0.5, 0.2), "b.com": (1, 0)}
+        )
+        self.assertEqual(latency.delay("b.com"), 1)
+        self.assertEqual(latency.delay("other.com"), 0.1)
+        self.assertEqual(ReplayLatency.from_string(None).delay("a.com"), 0)
+
+    def test_jitter(self):
+        latency = ReplayLatency.from_string(None, "0.5:0.2")
+        delays = [latency.delay("a.com") for _ in range(100)]
+        self.assertTrue(all(0.3 <= delay <= 0.7 for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+        # Seeded, so that runs are reproducible.
+        replayed = ReplayLatency.from_string(None, "0.5:0.2")
+        self.assertEqual([replayed.delay("a.com") for _ in range(100)], delays)
+
+    def test_recorded(self):
+        latency = ReplayLatency.from_string(None, "recorded")
+        self.assertEqual(latency.delay("a.com", 1.5), 1.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Barrier, Thread
+
+from requests import Session
+from requests.adapters import Retry
+from requests_mock import ANY, GET, Adapter
+
+from parsers.lib.config import retry_policy
+from parsers.lib.session import PooledSession
+
+RETRY = Retry(total=2, status_forcelist=[503], backoff_factor=0)
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_shared_session_is_not_modified(self):
+        shared = PooledSession()
+        mock = Adapter()
+        mock.register_uri(GET, ANY, text="payload")
+        shared.mount("https://", mock)
+        adapters = dict(shared.adapters)
+        barrier = Barrier(2)
+
+        @retry_policy(retry_policy=RETRY)
+        def fetch(zone_key, session, target_datetime=None, logger=None):
+            barrier.wait(timeout=5)
+            response = session.get("https://a.com/x")
+            barrier.wait(timeout=5)
+            return response, session
+
+        with ThreadPoolExecutor(2) as executor:
+            calls = [executor.submit(fetch, "AU-NT", shared) for _ in range(2)]
+            # While both calls run, other parsers still use the shared adapters.
+            self.assertIs(shared.get_adapter("https://a.com/x"), mock)
+            for call in calls:
+                response, session = call.result()
+                self.assertEqual(response.text, "payload")
+                self.assertIsNot(session, shared)
+        self.assertEqual(shared.adapters, adapters)
+        self.assertIs(shared.get_adapter("https://a.com/x"), mock)
+        self.assertEqual(mock.call_count, 2)
+
+    def test_retries(self):
+        hits = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                hits.append(self.path)
+                self.send_response(503 if len(hits) == 1 else 200)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"ok")
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f"http://127.0.0.1:{server.server_port}/data"
+
+        @retry_policy(retry_policy=RETRY)
+        def fetch(zone_key, session: Session, target_datetime=None, logger=None):
+            return session.get(url)
+
+        session = PooledSession()
+        response = fetch("AU-NT", session=session)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(hits), 2)
+        # The retries went through the pooled connections of the session.
+        self.assertIs(session.get_adapter(url), session.host_adapter(url))
+        self.assertEqual(len(session.host_adapter(url).poolmanager.pools), 1)
+
+    def test_without_session(self):
+        @retry_policy(retry_policy=RETRY)
+        def fetch(zone_key, session=None, target_datetime=None, logger=None):
+            return session
+
+        session = fetch("AU-NT")
+        self.assertIsInstance(session, Session)
+        self.assertEqual(session.get_adapter("https://a.com").max_retries, RETRY)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import tempfile
+import time
+import unittest
+from datetime import timedelta
+from pathlib import Path
+
+from electricitymap.contrib.config import EXCHANGES_CONFIG, ZONES_CONFIG
+from electricitymap.contrib.config.model import CONFIG_MODEL
+from parsers.lib.daemon import (
+    FileWatcher,
+    JobScheduler,
+    Schedule,
+    reload_configuration,
+)
+from parsers.lib.parsers import PARSER_KEY_TO_DICT
+
+
+class TestSchedule(unittest.TestCase):
+    def test_from_string(self):
+        schedule = Schedule.from_string("price=60, production=30", timedelta(hours=2))
+        self.assertEqual(schedule.interval("price"), timedelta(seconds=60))
+        self.assertEqual(schedule.interval("production"), timedelta(seconds=30))
+        self.assertEqual(schedule.interval("consumption"), timedelta(minutes=10))
+        self.assertEqual(schedule.interval("unknown"), timedelta(hours=2))
+
+
+class TestJobScheduler(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.scheduler = JobScheduler(
+            Schedule(
+                {"price": timedelta(seconds=60), "production": timedelta(seconds=10)}
+            )
+        )
+        self.scheduler.update([("FR", "price"), ("DE", "production")], now=0)
+
+    def test_new_jobs_are_due(self):
+        self.assertEqual(self.scheduler.due(0), [("DE", "production"), ("FR", "price")])
+        self.assertEqual(self.scheduler.due(5), [])
+        self.assertEqual(self.scheduler.next_run(), 10)
+
+    def test_cadence(self):
+        self.scheduler.due(0)
+        self.assertEqual(self.scheduler.due(11), [("DE", "production")])
+        self.assertEqual(self.scheduler.due(20), [("DE", "production")])
+        self.assertEqual(
+            self.scheduler.due(60), [("DE", "production"), ("FR", "price")]
+        )
+        # Jobs late by more than an interval don't run several times in a row
+        self.assertEqual(self.scheduler.due(115), [("DE", "production")])
+        self.assertEqual(self.scheduler.next_run(), 120)
+
+    def test_update(self):
+        self.scheduler.due(0)
+        self.scheduler.update([("DE", "production"), ("ES", "price")], now=5)
+        self.assertEqual(len(self.scheduler), 2)
+        self.assertEqual(self.scheduler.due(5), [("ES", "price")])
+        self.assertEqual(self.scheduler.due(10), [("DE", "production")])
+
+
+class TestFileWatcher(unittest.TestCase):
+    def test_changes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            config = Path(directory) / "zones"
+            config.mkdir()
+            (config / "FR.yaml").write_text("a: 1")
+            watcher = FileWatcher([directory])
+            self.assertFalse(watcher.changed())
+            (config / "DE.yaml").write_text("a: 1")
+            self.assertTrue(watcher.changed())
+            self.assertFalse(watcher.changed())
+            time.sleep(0.01)
+            (config / "FR.yaml").write_text("a: 2")
+            self.assertTrue(watcher.changed())
+            (config / "DE.yaml").unlink()
+            self.assertTrue(watcher.changed())
+
+
+class TestReloadConfiguration(unittest.TestCase):
+    def test_reload_in_place(self):
+        ZONES_CONFIG["DE"]["parsers"]["production"] = "FR.fetch_production"
+        PARSER_KEY_TO_DICT["production"].pop("DE")
+        reload_configuration()
+        self.assertEqual(
+            ZONES_CONFIG["DE"]["parsers"]["production"], "ENTSOE.fetch_production"
+        )
+        self.assertEqual(
+            PARSER_KEY_TO_DICT["production"]["DE"].__module__, "parsers.lib.config"
+        )
+        self.assertIn("DE->FR", EXCHANGES_CONFIG)
+        self.assertIn("DE", CONFIG_MODEL.zones)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from parsers.lib.entsoe import (
+    Period,
+    Point,
+    parse_resolution,
+    read_timeseries,
+    reason_text,
+)
+
+START = datetime(2024, 1, 9, tzinfo=timezone.utc)
+
+DOCUMENT = """<?xml version="1.0" encoding="UTF-8"?>
+<GL_MarketDocument xmlns="urn:iec62325.351:tc57wg16:451-6:generationloaddocument:3:0">
+  <type>A73</type>
+  <TimeSeries>
+    <mRID>1</mRID>
+    <inBiddingZone_Domain.mRID codingScheme="A01">10YFI-1--------U</inBiddingZone_Domain.mRID>
+    <MktPSRType>
+      <psrType>B14</psrType>
+      <PowerSystemResources>
+        <mRID>UNIT1</mRID>
+        <name>Unit &amp; one</name>
+      </PowerSystemResources>
+    </MktPSRType>
+    <Period>
+      <timeInterval>
+        <start>2024-01-09T00:00Z</start>
+        <end>2024-01-09T02:00Z</end>
+      </timeInterval>
+      <resolution>PT60M</resolution>
+      <!-- comments are ignored -->
+      <Point><position>1</position><quantity>10.5</quantity></Point>
+      <Point><position>2</position><quantity>11</quantity></Point>
+    </Period>
+  </TimeSeries>
+  <TimeSeries>
+    <mRID>2</mRID>
+    <outBiddingZone_Domain.mRID codingScheme="A01">10YFI-1--------U</outBiddingZone_Domain.mRID>
+    <Period>
+      <timeInterval><start>2024-01-09T00:00Z</start><end>2024-01-09T00:15Z</end></timeInterval>
+      <resolution>PT15M</resolution>
+      <Point><position>1</position><price.amount>90</price.amount></Point>
+    </Period>
+  </TimeSeries>
+</GL_MarketDocument>
+"""
+
+
+def _points(*positions: int) -> list[Point]:
+    return [Point(position, {"quantity": str(position)}) for position in positions]
+
+
+class TestPeriod(unittest.TestCase):
+    def test_parse_resolution(self):
+        self.assertEqual(parse_resolution("PT15M"), np.timedelta64(15, "m"))
+        self.assertEqual(parse_resolution("PT60M"), np.timedelta64(1, "h"))
+        self.assertEqual(parse_resolution("P1D"), np.timedelta64(1, "D"))
+        self.assertEqual(parse_resolution("P1DT12H"), np.timedelta64(36, "h"))
+        for resolution in ["P1M", "P1Y", "", "PT"]:
+            with self.assertRaises(NotImplementedError):
+                parse_resolution(resolution)
+
+    def test_expand(self):
+        period = Period(
+            "2024-01-09T00:00Z", "2024-01-09T02:00Z", "PT15M", _points(1, 2, 5)
+        )
+        datetimes, points = period.expand()
+        self.assertEqual(
+            datetimes,
+            [START, START + timedelta(minutes=15), START + timedelta(hours=1)],
+        )
+        self.assertIs(datetimes[0].tzinfo, timezone.utc)
+        self.assertEqual(points, period.points)
+
+    def test_expand_variable_sized_blocks(self):
+        period = Period("2024-01-09T00:00Z", "2024-01-10T00:00Z", "P1D", [])
+        self.assertEqual(period.expand("A03"), ([], []))
+        period = Period(
+            "2024-01-09T00:00Z", "2024-01-09T01:30Z", "PT15M", _points(5, 2)
+        )
+        datetimes, points = period.expand("A03")
+        # Positions before the first point are unknown, the last point holds
+        # until the end of the period.
+        self.assertEqual(
+            datetimes, [START + timedelta(minutes=15 * i) for i in range(1, 6)]
+        )
+        self.assertEqual([point.position for point in points], [2, 2, 2, 5, 5])
+
+
+class TestReadTimeSeries(unittest.TestCase):
+    def test_read(self):
+        first, second = read_timeseries(DOCUMENT)
+        self.assertEqual(first.psr_type, "B14")
+        self.assertTrue(first.has("inBiddingZone_Domain.mRID"))
+        self.assertFalse(first.has("outBiddingZone_Domain.mRID"))
+        self.assertEqual(first.get("MktPSRType/PowerSystemResources/mRID"), "UNIT1")
+        self.assertEqual(
+            first.get("MktPSRType/PowerSystemResources/name"), "Unit & one"
+        )
+        self.assertEqual(
+            first.periods,
+            [
+                Period(
+                    "2024-01-09T00:00Z",
+                    "2024-01-09T02:00Z",
+                    "PT60M",
+                    [Point(1, {"quantity": "10.5"}), Point(2, {"quantity": "11"})],
+                )
+            ],
+        )
+        self.assertEqual(second.get("mRID"), "2")
+        self.assertEqual(second.periods[0].points, [Point(1, {"price.amount": "90"})])
+        self.assertEqual(
+            [dt for dt, _ in first.points()], [START, START + timedelta(hours=1)]
+        )
+
+    def test_bytes(self):
+        self.assertEqual(len(list(read_timeseries(DOCUMENT.encode()))), 2)
+
+    def test_not_a_document(self):
+        self.assertEqual(list(read_timeseries("")), [])
+        self.assertEqual(list(read_timeseries("<html><body>Error</body></html>")), [])
+
+    def test_reason_text(self):
+        acknowledgement = """<?xml version="1.0" encoding="UTF-8"?>
+<Acknowledgement_MarketDocument xmlns="urn:iec62325.351:tc57wg16:451-1:acknowledgementdocument:7:0">
+  <Reason>
+    <code>999</code>
+    <text>No matching data found for Data item ACTUAL_GENERATION_PER_PRODUCTION_TYPE</text>
+  </Reason>
+</Acknowledgement_MarketDocument>"""
+        self.assertTrue(reason_text(acknowledgement).startswith("No matching data"))
+        self.assertIsNone(reason_text(DOCUMENT))
+        self.assertIsNone(reason_text("Bad gateway"))
+
+
+if __name__ == "__main__":
+    unittest.main()
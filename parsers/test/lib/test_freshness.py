@@ -0,0 +1,130 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from parsers.lib.config import refetch_frequency
+from parsers.lib.freshness import FreshnessState, configured_delay
+
+RUN_AT = datetime(2023, 5, 8, 12, 10, tzinfo=timezone.utc)
+
+
+def hourly_output(last: datetime, count: int = 24):
+    return [
+        {"datetime": last - timedelta(hours=i), "production": {}}
+        for i in reversed(range(count))
+    ]
+
+
+@refetch_frequency(timedelta(hours=6))
+def parser_with_refetch_window():
+    pass
+
+
+class TestConfiguredDelay(unittest.TestCase):
+    def test_zone_with_delays(self):
+        self.assertEqual(configured_delay("CO", "production"), timedelta(hours=48))
+
+    def test_zone_without_delays(self):
+        self.assertIsNone(configured_delay("FR", "production"))
+        self.assertIsNone(configured_delay("DE->FR", "exchange"))
+
+
+class TestFreshnessState(unittest.TestCase):
+    def test_unknown_jobs_run(self):
+        state = FreshnessState()
+        self.assertTrue(state.should_run("FR", "production", now=RUN_AT))
+
+    def test_skip_until_next_datapoint(self):
+        state = FreshnessState()
+        last = datetime(2023, 5, 8, 11, 0, tzinfo=timezone.utc)
+        state.record("FR", "production", RUN_AT, hourly_output(last))
+        # Next datapoint (12:00) is published with the observed 70 min latency.
+        self.assertEqual(
+            state.next_run_at("FR", "production"),
+            datetime(2023, 5, 8, 13, 10, tzinfo=timezone.utc),
+        )
+        self.assertFalse(
+            state.should_run("FR", "production", now=RUN_AT + timedelta(minutes=30))
+        )
+        self.assertTrue(
+            state.should_run("FR", "production", now=RUN_AT + timedelta(hours=1))
+        )
+
+    def test_scheduling_lag_is_not_latency(self):
+        state = FreshnessState()
+        last = datetime(2023, 5, 8, 11, 0, tzinfo=timezone.utc)
+        # The run started at 12:10 but the job waited 20 min for a worker.
+        state.record(
+            "FR",
+            "production",
+            RUN_AT + timedelta(minutes=20),
+            hourly_output(last),
+            scheduled_at=RUN_AT,
+        )
+        self.assertEqual(state.get("FR", "production")["latency"], 70 * 60)
+        self.assertEqual(
+            state.next_run_at("FR", "production"),
+            datetime(2023, 5, 8, 13, 10, tzinfo=timezone.utc),
+        )
+
+    def test_unchanged_datapoint_keeps_latency(self):
+        state = FreshnessState()
+        last = datetime(2023, 5, 8, 11, 0, tzinfo=timezone.utc)
+        state.record("FR", "production", RUN_AT, hourly_output(last))
+        later = RUN_AT + timedelta(minutes=30)
+        state.record("FR", "production", later, hourly_output(last))
+        entry = state.get("FR", "production")
+        self.assertEqual(entry["latency"], 70 * 60)
+        self.assertEqual(entry["lastRun"], later.isoformat())
+        # A new datapoint is measured again.
+        state.record(
+            "FR",
+            "production",
+            RUN_AT + timedelta(hours=1),
+            hourly_output(last + timedelta(hours=1)),
+        )
+        self.assertEqual(state.get("FR", "production")["latency"], 70 * 60)
+
+    def test_configured_delay_is_used(self):
+        state = FreshnessState()
+        last = datetime(2023, 5, 8, 11, 0, tzinfo=timezone.utc)
+        state.record("CO", "production", RUN_AT, hourly_output(last))
+        self.assertEqual(
+            state.next_run_at("CO", "production"), RUN_AT + timedelta(days=1)
+        )
+
+    def test_refetch_window_caps_skipping(self):
+        state = FreshnessState()
+        last = datetime(2023, 5, 8, 11, 0, tzinfo=timezone.utc)
+        state.record("CO", "production", RUN_AT, hourly_output(last))
+        self.assertEqual(
+            state.next_run_at("CO", "production", parser_with_refetch_window),
+            RUN_AT + timedelta(hours=6),
+        )
+
+    def test_forecasts_always_run(self):
+        state = FreshnessState()
+        state.record(
+            "FR",
+            "generationForecast",
+            RUN_AT,
+            hourly_output(RUN_AT + timedelta(days=1)),
+        )
+        self.assertIsNone(state.next_run_at("FR", "generationForecast"))
+
+    def test_persistence(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = str(Path(directory) / "FreshnessState.json")
+            state = FreshnessState(path)
+            last = datetime(2023, 5, 8, 11, 0, tzinfo=timezone.utc)
+            state.record("FR", "production", RUN_AT, hourly_output(last))
+            state.save()
+            self.assertEqual(
+                FreshnessState(path).get("FR", "production"),
+                state.get("FR", "production"),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from parsers.lib.history import JobHistory
+
+
+class TestJobHistory(unittest.TestCase):
+    def test_moving_average(self):
+        history = JobHistory(smoothing=0.5)
+        history.record("FR production", wall_seconds=2, cpu_seconds=1)
+        history.record("FR production", wall_seconds=4, cpu_seconds=1)
+        self.assertEqual(history.get("FR production"), {"runs": 2, "wall": 3, "cpu": 1})
+        self.assertAlmostEqual(history.cpu_ratio("FR production"), 1 / 3)
+
+    def test_memory(self):
+        history = JobHistory(smoothing=0.5)
+        history.record("FR production", wall_seconds=2)
+        self.assertIsNone(history.memory("FR production"))
+        history.record("FR production", wall_seconds=2, memory_bytes=100)
+        history.record("FR production", wall_seconds=2, memory_bytes=300)
+        self.assertEqual(history.memory("FR production"), 200)
+
+    def test_unknown_job(self):
+        history = JobHistory()
+        self.assertNotIn("FR production", history)
+        self.assertIsNone(history.cpu_ratio("FR production"))
+        self.assertIsNone(history.memory("FR production"))
+
+    def test_persistence(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = str(Path(directory) / "history" / "JobHistory.json")
+            history = JobHistory(path)
+            history.record("DE price", wall_seconds=1.5)
+            history.save()
+            reloaded = JobHistory(path)
+            self.assertEqual(reloaded.get("DE price"), {"runs": 1, "wall": 1.5})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import json
+import os
+import tempfile
+import unittest
+
+from electricitymap.contrib.lib.tracing import JobTrace
+from parsers.lib.instrumentation import RunInstrumentation, quantile
+
+
+def make_trace(module, total, phases, requests=()):
+    trace = JobTrace(f"{module} job", module)
+    trace.total = total
+    trace.phases = dict(phases)
+    trace.requests = list(requests)
+    return trace
+
+
+class TestQuantile(unittest.TestCase):
+    def test_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(quantile(values, 0.5), 50)
+        self.assertEqual(quantile(values, 0.95), 95)
+        self.assertEqual(quantile(values, 0.99), 99)
+        self.assertEqual(quantile([3, 1, 2], 0.5), 2)
+        self.assertEqual(quantile([7], 0.99), 7)
+
+
+class TestRunInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.instrumentation = RunInstrumentation()
+        self.instrumentation.add(
+            make_trace(
+                "ENTSOE",
+                3,
+                {"network": 2, "parse": 1},
+                [{"host": "a", "connect": 0.1, "ttfb": 1, "total": 2, "bytes": 10}],
+            )
+        )
+        self.instrumentation.add(
+            make_trace(
+                "ENTSOE",
+                5,
+                {"network": 1, "parse": 4},
+                [{"host": "a", "ttfb": 0.5, "total": 1, "bytes": 20}],
+            )
+        )
+        self.instrumentation.add(make_trace("EIA", 1, {"other": 1}))
+
+    def test_rollups(self):
+        rollups = self.instrumentation.rollups()
+        self.assertEqual(list(rollups), ["EIA", "ENTSOE"])
+        entsoe = rollups["ENTSOE"]
+        self.assertEqual(entsoe["jobs"], 2)
+        self.assertEqual(entsoe["bytes"], 30)
+        self.assertEqual(entsoe["phases"]["parse"]["p99"], 4)
+        self.assertEqual(entsoe["phases"]["parse"]["sum"], 5)
+        self.assertEqual(entsoe["requests"]["connect"]["count"], 1)
+        self.assertEqual(entsoe["requests"]["ttfb"]["p50"], 0.5)
+        self.assertEqual(rollups["EIA"]["requests"], {})
+
+    def test_prometheus(self):
+        text = self.instrumentation.to_prometheus()
+        self.assertIn("# TYPE parser_phase_seconds summary", text)
+        self.assertIn(
+            'parser_phase_seconds{module="ENTSOE",phase="parse",quantile="0.99"} 4',
+            text,
+        )
+        self.assertIn(
+            'parser_phase_seconds_count{module="ENTSOE",phase="total"} 2', text
+        )
+        self.assertIn(
+            'parser_http_request_seconds{module="ENTSOE",stage="ttfb",quantile="0.5"} 0.5',
+            text,
+        )
+        self.assertIn('parser_http_response_bytes{module="EIA"} 0', text)
+        self.assertTrue(text.endswith("\n"))
+
+    def test_write(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = os.path.join(tmp, "results", "Instrumentation.json")
+            prom_path = os.path.join(tmp, "parsers.prom")
+            self.instrumentation.write_json(json_path)
+            self.instrumentation.write_prometheus(prom_path)
+            with open(json_path) as f:
+                written = json.load(f)
+            self.assertEqual(len(written["jobs"]), 3)
+            self.assertEqual(written["modules"]["ENTSOE"]["jobs"], 2)
+            self.assertEqual(sorted(os.listdir(tmp)), ["parsers.prom", "results"])
+            self.assertFalse(os.path.exists(prom_path + ".tmp"))
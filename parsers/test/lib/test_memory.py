@@ -0,0 +1,87 @@
+import unittest
+
+from parsers.lib import memory
+from parsers.lib.memory import (
+    MB,
+    RSS,
+    TRACEMALLOC,
+    MemoryTracker,
+    call_with_memory,
+    check_profile,
+    rss_bytes,
+)
+
+
+def _allocate(size: int) -> int:
+    data = bytearray(size)
+    return len(data)
+
+
+def _fail_after_allocating(size: int):
+    data = bytearray(size)
+    raise ValueError(len(data))
+
+
+class TestMemoryTracker(unittest.TestCase):
+    def tracker(self, mode: str) -> MemoryTracker:
+        tracker = MemoryTracker(mode).start()
+        self.addCleanup(tracker.stop)
+        return tracker
+
+    def test_tracemalloc_peak(self):
+        tracker = self.tracker(TRACEMALLOC)
+        with tracker.track() as job:
+            # Freed before the job ends, and before any sample
+            _allocate(20 * MB)
+        self.assertGreaterEqual(job.peak_bytes, 20 * MB)
+        self.assertLess(job.peak_bytes, 25 * MB)
+
+    def test_peaks_before_a_job_are_not_attributed_to_it(self):
+        tracker = self.tracker(TRACEMALLOC)
+        with tracker.track() as first:
+            _allocate(20 * MB)
+            with tracker.track() as second:
+                pass
+        self.assertGreaterEqual(first.peak_bytes, 20 * MB)
+        self.assertLess(second.peak_bytes, MB)
+
+    def test_rss(self):
+        self.assertGreater(rss_bytes(), 0)
+        tracker = self.tracker(RSS)
+        with tracker.track() as job:
+            pass
+        self.assertGreaterEqual(job.peak_bytes, 0)
+
+    def test_unknown_profile(self):
+        check_profile(RSS)
+        with self.assertRaises(ValueError):
+            check_profile("RSS")
+        with self.assertRaises(ValueError):
+            MemoryTracker("RSS")
+
+
+class TestCallWithMemory(unittest.TestCase):
+    def tearDown(self):
+        tracker = memory._trackers.pop(TRACEMALLOC, None)
+        if tracker is not None:
+            tracker.stop()
+
+    def test_result_and_peak(self):
+        result, peak = call_with_memory(TRACEMALLOC, _allocate, 10 * MB)
+        self.assertEqual(result, 10 * MB)
+        self.assertGreaterEqual(peak, 10 * MB)
+
+    def test_peak_of_failed_call(self):
+        with self.assertRaises(ValueError) as context:
+            call_with_memory(TRACEMALLOC, _fail_after_allocating, 10 * MB)
+        self.assertGreaterEqual(context.exception.memory_peak, 10 * MB)
+
+    def test_unknown_profile(self):
+        # Raised before the call, not as an error of the tracked function
+        with self.assertRaises(ValueError):
+            call_with_memory("RSS", _allocate, MB)
+        self.assertNotIn("RSS", memory._trackers)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import json
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+from parsers.lib.parsers import PARSER_KEY_TO_DICT, LazyParsers
+
+ROOT = Path(__file__).parents[3]
+
+# Seconds a fresh interpreter may take to import the parser registry.
+IMPORT_TIME_BUDGET = 5.0
+# Dependencies of a few parsers only, which the registry must not pull in.
+HEAVY_MODULES = ["cv2", "demjson3", "imageio", "pandas", "pytesseract"]
+
+
+class TestLazyParsers(unittest.TestCase):
+    def test_parsers_are_imported_on_lookup(self):
+        parsers = LazyParsers()
+        parsers["DE"] = "ENTSOE.fetch_production"
+        self.assertIn("DE", parsers)
+        self.assertEqual(list(parsers), ["DE"])
+        self.assertEqual(parsers.path("DE"), "ENTSOE.fetch_production")
+        self.assertTrue(callable(parsers["DE"]))
+        self.assertIs(parsers["DE"], parsers["DE"])
+
+    def test_missing_parser(self):
+        parsers = LazyParsers()
+        with self.assertRaises(KeyError):
+            parsers["DE"]
+        self.assertIsNone(parsers.get("DE"))
+
+    def test_set_function(self):
+        parsers = LazyParsers()
+        parsers["DE"] = len
+        self.assertIs(parsers["DE"], len)
+        self.assertIsNone(parsers.path("DE"))
+        parsers["DE"] = "ENTSOE.fetch_production"
+        self.assertIsNot(parsers["DE"], len)
+        del parsers["DE"]
+        self.assertEqual(len(parsers), 0)
+
+    def test_capacity_parsers(self):
+        capacity_parsers = PARSER_KEY_TO_DICT["productionCapacity"]
+        zone_key = next(iter(capacity_parsers))
+        self.assertTrue(
+            capacity_parsers[zone_key].__module__.startswith(
+                "electricitymap.contrib.capacity_parsers"
+            )
+        )
+
+
+class TestImportTime(unittest.TestCase):
+    def test_cold_import(self):
+        script = (
+            "import json, sys, time\n"
+            "started = time.perf_counter()\n"
+            "import parsers.lib.parsers\n"
+            "print(json.dumps([time.perf_counter() - started, sorted(sys.modules)]))\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=ROOT,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        seconds, modules = json.loads(output.splitlines()[-1])
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, modules)
+        self.assertEqual(
+            [module for module in modules if module.startswith("parsers.")],
+            ["parsers.lib", "parsers.lib.parsers"],
+        )
+        self.assertLess(seconds, IMPORT_TIME_BUDGET)
+
+
+if __name__ == "__main__":
+    unittest.main()
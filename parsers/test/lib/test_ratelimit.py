@@ -0,0 +1,112 @@
+import time
+import unittest
+
+from requests import Response
+
+from parsers.lib.ratelimit import (
+    RateLimiter,
+    get_rate_limiter,
+    is_key_failure,
+    is_throttled,
+)
+
+
+def response(status_code: int, headers: dict | None = None) -> Response:
+    res = Response()
+    res.status_code = status_code
+    res.headers.update(headers or {})
+    return res
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_is_throttled(self):
+        self.assertTrue(is_throttled(429))
+        self.assertTrue(is_throttled(503))
+        self.assertTrue(is_throttled(None))
+        self.assertFalse(is_throttled(200))
+        self.assertFalse(is_throttled(400))
+
+    def test_is_key_failure(self):
+        self.assertTrue(is_key_failure(401))
+        self.assertTrue(is_key_failure(403))
+        self.assertTrue(is_key_failure(429))
+        self.assertFalse(is_key_failure(400))
+        self.assertFalse(is_key_failure(404))
+
+    def test_least_loaded_key(self):
+        limiter = RateLimiter(["a", "b"], rate=100, burst=10)
+        first = limiter.acquire()
+        second = limiter.acquire()
+        self.assertNotEqual(first, second)
+        limiter.release(first, 200)
+        self.assertEqual(limiter.acquire(), first)
+
+    def test_bucket_refill(self):
+        limiter = RateLimiter(["a"], rate=20, burst=1)
+        limiter.release(limiter.acquire(), 200)
+        start = time.monotonic()
+        limiter.release(limiter.acquire(), 200)
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+    def test_throttled_keys_cool_down(self):
+        limiter = RateLimiter(["a", "b"], rate=100, burst=10, cooldown=60)
+        limiter.release(limiter.acquire(exclude=["b"]), 429)
+        for _ in range(5):
+            key = limiter.acquire()
+            self.assertEqual(key, "b")
+            limiter.release(key, 200)
+
+    def test_request_fails_over(self):
+        limiter = RateLimiter(["a", "b"], rate=100, burst=10, cooldown=60)
+        calls = []
+
+        def send(key):
+            calls.append(key)
+            return response(429 if len(calls) == 1 else 200)
+
+        self.assertEqual(limiter.request(send).status_code, 200)
+        self.assertEqual(len(calls), 2)
+        self.assertNotEqual(calls[0], calls[1])
+
+    def test_request_returns_errors(self):
+        limiter = RateLimiter(["a", "b"], rate=100, burst=10)
+        calls = []
+
+        def send(key):
+            calls.append(key)
+            return response(400)
+
+        self.assertEqual(limiter.request(send).status_code, 400)
+        self.assertEqual(len(calls), 1)
+
+    def test_rejected_key_is_put_aside(self):
+        limiter = RateLimiter(["bad", "good"], rate=100, burst=10, cooldown=0)
+        calls = []
+
+        def send(key):
+            calls.append(key)
+            return response(401 if key == "bad" else 200)
+
+        for _ in range(5):
+            self.assertEqual(limiter.request(send).status_code, 200)
+        # The bad key is tried at most once, then cools down despite the
+        # successful requests of the good key.
+        self.assertLessEqual(calls.count("bad"), 1)
+        self.assertEqual(calls.count("good"), 5)
+
+    def test_retry_after(self):
+        limiter = RateLimiter(["a", "b"], rate=100, burst=10, cooldown=0)
+        limiter.request(
+            lambda key: response(429 if key == "a" else 200, {"Retry-After": "60"})
+        )
+        self.assertEqual(limiter.acquire(), "b")
+
+    def test_shared_limiters(self):
+        limiter = get_rate_limiter("TEST_KEY", ["a", " b"], rate=1, burst=1)
+        self.assertIs(limiter, get_rate_limiter("TEST_KEY", ["a", "b"], 1, 1))
+        self.assertEqual(limiter.keys, ["a", "b"])
+        self.assertIsNot(limiter, get_rate_limiter("TEST_KEY", ["c"], 1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
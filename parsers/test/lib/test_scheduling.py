@@ -0,0 +1,326 @@
+import asyncio
+import os
+import threading
+import time
+import unittest
+
+from parsers.lib.history import JobHistory
+from parsers.lib.scheduling import (
+    HostLimits,
+    JobTimeouts,
+    RecyclingProcessPool,
+    WorkloadClassifier,
+    _acquire,
+    call_with_cpu_time,
+    create_process_pool,
+    longest_first,
+    parser_source,
+    run_async,
+    run_threads,
+)
+
+
+class TestHostLimits(unittest.TestCase):
+    def test_from_string(self):
+        limits = HostLimits.from_string("entsoe.eu=8, EIA=2", default=3)
+        self.assertEqual(limits.limit("entsoe.eu"), 8)
+        self.assertEqual(limits.limit("EIA"), 2)
+        self.assertEqual(limits.limit("ons.org.br"), 3)
+
+    def test_from_empty_string(self):
+        limits = HostLimits.from_string(None, default=5)
+        self.assertEqual(limits.overrides, {})
+        self.assertEqual(limits.limit("entsoe.eu"), 5)
+
+
+class TestJobTimeouts(unittest.TestCase):
+    def test_from_string(self):
+        timeouts = JobTimeouts.from_string("RU=60, IEMOP=0", default=300)
+        self.assertEqual(timeouts.timeout("RU"), 60)
+        self.assertIsNone(timeouts.timeout("IEMOP"))
+        self.assertEqual(timeouts.timeout("entsoe.eu"), 300)
+        self.assertIsNone(JobTimeouts.from_string(None, 0).timeout("RU"))
+
+
+class TestParserSource(unittest.TestCase):
+    def test_source_from_module(self):
+        self.assertEqual(parser_source("DE", "production"), "entsoe.eu")
+
+    def test_source_from_module_name(self):
+        self.assertEqual(parser_source("US-MIDA-PJM", "consumption"), "EIA")
+
+    def test_exchange_source(self):
+        self.assertEqual(parser_source("DE->FR", "exchange"), "entsoe.eu")
+
+
+class TestRunAsync(unittest.TestCase):
+    def test_results_keep_input_order(self):
+        results = run_async(range(20), lambda i: i * 2, lambda i: str(i % 3))
+        self.assertEqual(results, [i * 2 for i in range(20)])
+
+    def test_host_limit(self):
+        lock = threading.Lock()
+        running = {"a": 0, "b": 0}
+        peaks = {"a": 0, "b": 0}
+
+        def run(item):
+            host = item[0]
+            with lock:
+                running[host] += 1
+                peaks[host] = max(peaks[host], running[host])
+            time.sleep(0.01)
+            with lock:
+                running[host] -= 1
+            return item
+
+        items = [("a", i) for i in range(10)] + [("b", i) for i in range(10)]
+        run_async(
+            items,
+            run,
+            lambda item: item[0],
+            HostLimits(default=4, overrides={"a": 2}),
+        )
+        self.assertLessEqual(peaks["a"], 2)
+        self.assertLessEqual(peaks["b"], 4)
+        self.assertGreater(peaks["b"], 1)
+
+
+class TestDeadlines(unittest.TestCase):
+    @staticmethod
+    def _run(item):
+        time.sleep(item)
+        return item
+
+    def test_threads_abandon_slow_items(self):
+        start = time.monotonic()
+        results = run_threads(
+            [0, 1, 0.01],
+            self._run,
+            max_workers=3,
+            timeout_of=lambda item: 0.2,
+            on_timeout=lambda item: "timeout",
+        )
+        self.assertEqual(results, [0, "timeout", 0.01])
+        self.assertLess(time.monotonic() - start, 0.8)
+
+    def test_threads_budget(self):
+        start = time.monotonic()
+        results = run_threads(
+            [1, 0, 0],
+            self._run,
+            max_workers=1,
+            on_timeout=lambda item: "timeout",
+            budget=0.2,
+        )
+        self.assertEqual(results, ["timeout"] * 3)
+        self.assertLess(time.monotonic() - start, 0.8)
+
+    def test_threads_replace_abandoned_items(self):
+        start = time.monotonic()
+        results = run_threads(
+            [1, 0.01, 0.01],
+            self._run,
+            max_workers=1,
+            timeout_of=lambda item: 0.2,
+            on_timeout=lambda item: "timeout",
+        )
+        # The next items don't wait for the abandoned one to return.
+        self.assertEqual(results, ["timeout", 0.01, 0.01])
+        self.assertLess(time.monotonic() - start, 0.8)
+
+    def test_threads_without_deadlines(self):
+        self.assertEqual(run_threads([0.01, 0], self._run, 2), [0.01, 0])
+
+    def test_async_abandon_slow_items(self):
+        start = time.monotonic()
+        results = run_async(
+            [0, 1, 0.01],
+            self._run,
+            lambda item: "host",
+            timeout_of=lambda item: 0.2,
+            on_timeout=lambda item: "timeout",
+        )
+        self.assertEqual(results, [0, "timeout", 0.01])
+        self.assertLess(time.monotonic() - start, 0.8)
+
+    def test_async_replace_abandoned_items(self):
+        start = time.monotonic()
+        results = run_async(
+            [1, 0.01, 0.01],
+            self._run,
+            lambda item: "host",
+            max_in_flight=1,
+            timeout_of=lambda item: 0.2,
+            on_timeout=lambda item: "timeout",
+        )
+        self.assertEqual(results, ["timeout", 0.01, 0.01])
+        self.assertLess(time.monotonic() - start, 0.8)
+
+    def test_async_abandoned_items_keep_their_host_permit(self):
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def run(item):
+            with lock:
+                running.append(item)
+                peak.append(len(running))
+            time.sleep(item)
+            with lock:
+                running.remove(item)
+            return item
+
+        start = time.monotonic()
+        results = run_async(
+            [0.5, 0.01],
+            run,
+            lambda item: "host",
+            HostLimits(default=1),
+            timeout_of=lambda item: 0.1,
+            on_timeout=lambda item: "timeout",
+        )
+        self.assertEqual(results, ["timeout", 0.01])
+        self.assertEqual(max(peak), 1)
+        self.assertGreaterEqual(time.monotonic() - start, 0.5)
+
+    def test_async_budget(self):
+        start = time.monotonic()
+        results = run_async(
+            [1, 0],
+            self._run,
+            lambda item: "host",
+            HostLimits(default=1),
+            on_timeout=lambda item: "timeout",
+            budget=0.2,
+        )
+        self.assertEqual(results, ["timeout", "timeout"])
+        self.assertLess(time.monotonic() - start, 0.8)
+
+
+class TestAcquire(unittest.TestCase):
+    def test_timeout(self):
+        async def acquire():
+            semaphore = asyncio.Semaphore(0)
+            acquired = await _acquire(semaphore, 0.01)
+            semaphore.release()
+            return acquired, semaphore.locked()
+
+        self.assertEqual(asyncio.run(acquire()), (False, False))
+
+    def test_no_permit_leaks_when_released_at_the_timeout(self):
+        async def acquire():
+            semaphore = asyncio.Semaphore(0)
+            asyncio.get_running_loop().call_later(0.01, semaphore.release)
+            acquired = await _acquire(semaphore, 0.01)
+            # The permit was either acquired or is still available.
+            return acquired, semaphore.locked()
+
+        for _ in range(20):
+            acquired, locked = asyncio.run(acquire())
+            self.assertEqual(locked, acquired)
+
+    def test_no_permit_leaks_past_the_deadline(self):
+        async def acquire():
+            semaphore = asyncio.Semaphore(1)
+            acquired = await _acquire(semaphore, 0)
+            return acquired, semaphore.locked()
+
+        acquired, locked = asyncio.run(acquire())
+        self.assertEqual(locked, acquired)
+
+
+class TestWorkloadClassifier(unittest.TestCase):
+    def test_configured_parsers(self):
+        classifier = WorkloadClassifier(["SG"])
+        self.assertTrue(classifier.is_cpu_bound("SG", "production"))
+        self.assertFalse(classifier.is_cpu_bound("DE", "production"))
+        self.assertFalse(classifier.is_cpu_bound("XX", "production"))
+
+    def test_history(self):
+        history = JobHistory()
+        history.record("DE production", wall_seconds=2, cpu_seconds=1.5)
+        history.record("FR price", wall_seconds=2, cpu_seconds=0.1)
+        classifier = WorkloadClassifier([], history)
+        self.assertTrue(classifier.is_cpu_bound("DE", "production"))
+        self.assertFalse(classifier.is_cpu_bound("FR", "price"))
+
+    def test_configured_parsers_take_precedence(self):
+        history = JobHistory()
+        history.record("DE production", wall_seconds=2, cpu_seconds=0.1)
+        classifier = WorkloadClassifier(["ENTSOE"], history)
+        self.assertTrue(classifier.is_cpu_bound("DE", "production"))
+
+    def test_memory_heavy(self):
+        history = JobHistory()
+        history.record("DE production", wall_seconds=2, memory_bytes=500e6)
+        history.record("FR price", wall_seconds=2, memory_bytes=10e6)
+        classifier = WorkloadClassifier(
+            [], history, memory_heavy_parsers=["SG"], memory_ceiling=200e6
+        )
+        self.assertTrue(classifier.is_memory_heavy("SG", "production"))
+        self.assertTrue(classifier.is_memory_heavy("DE", "production"))
+        self.assertFalse(classifier.is_memory_heavy("FR", "price"))
+        self.assertFalse(classifier.is_memory_heavy("XX", "production"))
+        # Without a ceiling, only the configured parsers are memory-heavy
+        classifier = WorkloadClassifier([], history, memory_heavy_parsers=["SG"])
+        self.assertFalse(classifier.is_memory_heavy("DE", "production"))
+
+
+class TestLongestFirst(unittest.TestCase):
+    def test_order(self):
+        history = JobHistory()
+        history.record("DE production", wall_seconds=1)
+        history.record("SG production", wall_seconds=30)
+        history.record("FR price", wall_seconds=5)
+        history.record("IN-MH production", wall_seconds=10)
+        jobs = [
+            "DE production",
+            "FR price",
+            "XX consumption",
+            "SG production",
+            "IN-MH production",
+        ]
+        # XX has no history and takes the median time, 10s.
+        self.assertEqual(
+            longest_first(jobs, lambda job: job, history),
+            [
+                "SG production",
+                "XX consumption",
+                "IN-MH production",
+                "FR price",
+                "DE production",
+            ],
+        )
+
+    def test_without_history(self):
+        jobs = ["DE production", "FR price"]
+        self.assertEqual(longest_first(jobs, lambda job: job, JobHistory()), jobs)
+
+
+class TestProcessPool(unittest.TestCase):
+    def test_jobs_run_in_other_processes(self):
+        executor = create_process_pool(1, preload=["json"])
+        try:
+            self.assertNotEqual(executor.submit(os.getpid).result(), os.getpid())
+        finally:
+            executor.shutdown()
+
+    def test_recycled_workers(self):
+        pool = RecyclingProcessPool(1, max_jobs_per_worker=2, preload=["json"])
+        try:
+            pids = [pool.submit(os.getpid).result() for _ in range(5)]
+        finally:
+            pool.shutdown()
+        self.assertEqual(pids[0], pids[1])
+        self.assertEqual(pids[2], pids[3])
+        self.assertEqual(len(set(pids)), 3)
+        self.assertEqual(pool.recycled, 2)
+
+    def test_call_with_cpu_time(self):
+        result, cpu_time = call_with_cpu_time(sum, range(100_000))
+        self.assertEqual(result, sum(range(100_000)))
+        self.assertGreater(cpu_time, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import json
+import unittest
+from datetime import datetime, timedelta, timezone
+from importlib.util import find_spec
+from io import BytesIO
+
+import numpy as np
+
+from electricitymap.contrib.lib.models.events import EventSourceType
+from parsers.lib.serializers import (
+    JsonLinesSerializer,
+    ReprSerializer,
+    flatten_event,
+    get_serializer,
+)
+
+PRODUCTION = [
+    {
+        "zoneKey": "FR",
+        "datetime": datetime(2023, 5, 8, 7, 0, tzinfo=timezone.utc),
+        "production": {"nuclear": 35000.0, "wind": 1200.0},
+        "storage": {"hydro": -300.0},
+        "source": "entsoe.eu",
+        "sourceType": EventSourceType.measured,
+        "correctedModes": [],
+    },
+    {
+        "zoneKey": "FR",
+        "datetime": datetime(2023, 5, 8, 9, 0, tzinfo=timezone(timedelta(hours=1))),
+        "production": {"nuclear": 35100.0},
+        "storage": {},
+        "source": "entsoe.eu",
+        "sourceType": EventSourceType.measured,
+        "correctedModes": [],
+    },
+]
+
+
+class TestSerializers(unittest.TestCase):
+    def test_get_serializer(self):
+        self.assertIsInstance(get_serializer("repr"), ReprSerializer)
+        self.assertIsInstance(get_serializer("jsonl"), JsonLinesSerializer)
+        with self.assertRaises(ValueError):
+            get_serializer("csv")
+
+    def test_repr(self):
+        self.assertEqual(
+            ReprSerializer().serialize("production", PRODUCTION),
+            str(PRODUCTION).encode("utf-8"),
+        )
+
+    def test_json_lines(self):
+        lines = (
+            JsonLinesSerializer()
+            .serialize("production", PRODUCTION)
+            .decode("utf-8")
+            .splitlines()
+        )
+        self.assertEqual(len(lines), 2)
+        event = json.loads(lines[0])
+        self.assertEqual(event["datetime"], "2023-05-08T07:00:00+00:00")
+        self.assertEqual(event["sourceType"], "measured")
+        self.assertEqual(event["production"]["nuclear"], 35000.0)
+
+    def test_json_lines_single_event(self):
+        price = {
+            "zoneKey": "FR",
+            "datetime": datetime(2023, 5, 8, tzinfo=timezone.utc),
+            "price": 106.78,
+            "currency": "EUR",
+            "source": "entsoe.eu",
+        }
+        output = JsonLinesSerializer().serialize("price", price).decode("utf-8")
+        self.assertEqual(json.loads(output)["price"], 106.78)
+
+    def test_json_lines_numpy_and_nan(self):
+        event = {
+            "zoneKey": "FR",
+            "datetime": np.datetime64("2023-05-08T07:00:00"),
+            "production": {"nuclear": np.float32(35000.5), "wind": float("nan")},
+            "storage": {"hydro": np.float64("nan")},
+            "count": np.int64(3),
+        }
+        output = JsonLinesSerializer().serialize("production", [event])
+        self.assertEqual(
+            json.loads(output),
+            {
+                "zoneKey": "FR",
+                "datetime": "2023-05-08T07:00:00",
+                "production": {"nuclear": 35000.5, "wind": None},
+                "storage": {"hydro": None},
+                "count": 3,
+            },
+        )
+
+    def test_flatten_production(self):
+        row = flatten_event("production", PRODUCTION[0])
+        self.assertEqual(row["production_nuclear"], 35000.0)
+        self.assertEqual(row["production_wind"], 1200.0)
+        self.assertIsNone(row["production_coal"])
+        self.assertEqual(row["storage_hydro"], -300.0)
+        self.assertIsNone(row["storage_battery"])
+        self.assertEqual(row["sourceType"], "measured")
+        self.assertNotIn("correctedModes", row)
+
+
+@unittest.skipUnless(find_spec("pyarrow"), "pyarrow is not installed")
+class TestParquetSerializer(unittest.TestCase):
+    def test_production_table(self):
+        import pyarrow.parquet as pq
+
+        output = get_serializer("parquet").serialize("production", PRODUCTION)
+        table = pq.read_table(BytesIO(output))
+        self.assertEqual(table.num_rows, 2)
+        self.assertIn("production_geothermal", table.column_names)
+        self.assertEqual(table.column("production_nuclear").to_pylist(), [35000, 35100])
+        self.assertEqual(
+            table.column("datetime").to_pylist()[1],
+            datetime(2023, 5, 8, 8, 0, tzinfo=timezone.utc),
+        )
+
+    def test_nan_is_null(self):
+        price = {
+            "zoneKey": "FR",
+            "datetime": datetime(2023, 5, 8, tzinfo=timezone.utc),
+            "price": np.float64("nan"),
+        }
+        table = get_serializer("parquet").table("price", [price])
+        self.assertEqual(table.column("price").to_pylist(), [None])
+
+    def test_empty_table_keeps_schema(self):
+        serializer = get_serializer("parquet")
+        table = serializer.table("exchange", [])
+        self.assertEqual(table.num_rows, 0)
+        self.assertEqual(
+            table.column_names,
+            ["sortedZoneKeys", "datetime", "netFlow", "source", "sourceType"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
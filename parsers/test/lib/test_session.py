@@ -0,0 +1,79 @@
+import ssl
+import unittest
+
+from requests.adapters import HTTPAdapter
+from requests_mock import ANY, GET, Adapter
+
+from parsers.lib.session import (
+    OP_LEGACY_SERVER_CONNECT,
+    LegacyHttpAdapter,
+    PooledSession,
+    get_session,
+    get_session_with_legacy_adapter,
+    shared_ssl_context,
+)
+
+
+class TestSharedSslContext(unittest.TestCase):
+    def test_contexts_are_shared(self):
+        self.assertIs(shared_ssl_context(), shared_ssl_context())
+        self.assertIsNot(shared_ssl_context(), shared_ssl_context(legacy=True))
+
+    def test_legacy_context(self):
+        self.assertTrue(
+            shared_ssl_context(legacy=True).options & OP_LEGACY_SERVER_CONNECT
+        )
+        self.assertFalse(shared_ssl_context().options & OP_LEGACY_SERVER_CONNECT)
+
+    def test_unverified_context(self):
+        context = shared_ssl_context(verify=False)
+        self.assertEqual(context.verify_mode, ssl.CERT_NONE)
+        self.assertFalse(context.check_hostname)
+        self.assertEqual(shared_ssl_context().verify_mode, ssl.CERT_REQUIRED)
+
+    def test_cert_verify_uses_shared_contexts(self):
+        adapter = LegacyHttpAdapter()
+        conn = adapter.get_connection("https://example.com/")
+        adapter.cert_verify(conn, "https://example.com/", True, None)
+        self.assertIs(conn.conn_kw["ssl_context"], shared_ssl_context(legacy=True))
+        self.assertIsNone(conn.ca_certs)
+        adapter.cert_verify(conn, "https://example.com/", False, None)
+        self.assertIs(
+            conn.conn_kw["ssl_context"], shared_ssl_context(legacy=True, verify=False)
+        )
+
+
+class TestPooledSession(unittest.TestCase):
+    def test_one_adapter_per_host(self):
+        session = PooledSession(pool_maxsize=4, host_pool_sizes={"b.com": 8})
+        a = session.get_adapter("https://a.com/x")
+        self.assertIs(a, session.get_adapter("https://A.com/y?z=1"))
+        self.assertIsNot(a, session.get_adapter("http://a.com/x"))
+        b = session.get_adapter("https://b.com/x")
+        self.assertIsNot(a, b)
+        self.assertEqual(a._pool_maxsize, 4)
+        self.assertEqual(b._pool_maxsize, 8)
+
+    def test_mounted_adapters_take_precedence(self):
+        session = PooledSession()
+        adapter = HTTPAdapter()
+        session.mount("https://", adapter)
+        self.assertIs(session.get_adapter("https://a.com/x"), adapter)
+
+    def test_default_timeout(self):
+        session = PooledSession(timeout=3)
+        adapter = Adapter()
+        adapter.register_uri(GET, ANY, text="payload")
+        session.mount("https://", adapter)
+        self.assertEqual(session.get("https://a.com/x").text, "payload")
+        self.assertEqual(adapter.last_request.timeout, 3)
+
+    def test_shared_sessions(self):
+        self.assertIs(get_session(), get_session())
+        self.assertIs(get_session_with_legacy_adapter(), get_session(legacy=True))
+        self.assertTrue(get_session(legacy=True).legacy)
+        self.assertFalse(get_session().legacy)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import os
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from requests import Session
+
+from electricitymap.contrib.lib.types import ZoneKey
+from parsers import CA_ON, EIA, ENTSOE
+from parsers.lib.cassette import ReplayLatency
+from parsers.lib.ratelimit import get_rate_limiter
+from parsers.lib.session import PooledSession
+from parsers.lib.simulator import (
+    SimulatedResponse,
+    Upstream,
+    UpstreamSimulator,
+    install_simulator,
+    simulated_url,
+)
+from parsers.test.simulator import SIMULATED_HOSTS, simulated_upstreams
+
+TARGET_DATETIME = datetime(2024, 1, 10, tzinfo=timezone.utc)
+
+
+def _unthrottled(env_var: str):
+    os.environ[env_var] = "simulator"
+    get_rate_limiter(env_var, ["simulator"], rate=1e9, burst=1e9)
+
+
+class TestUpstreamSimulator(unittest.TestCase):
+    def start(self, upstreams, **kwargs) -> UpstreamSimulator:
+        simulator = UpstreamSimulator(upstreams, **kwargs).start()
+        self.addCleanup(simulator.stop)
+        return simulator
+
+    def test_routes_by_host(self):
+        upstream = Upstream(
+            "example.com",
+            lambda path, params: SimulatedResponse(200, f"{path} {params}".encode()),
+            aliases=("proxy.example.com",),
+        )
+        simulator = self.start([upstream])
+        response = Session().get(f"{simulator.url}/proxy.example.com/a/b?c=d")
+        self.assertEqual(response.text, "/a/b {'c': 'd'}")
+        self.assertEqual(Session().get(f"{simulator.url}/other.com/").status_code, 404)
+        self.assertEqual(
+            simulator.stats, {("proxy.example.com", 200): 1, ("other.com", 404): 1}
+        )
+
+    def test_errors_and_latency(self):
+        upstream = Upstream("example.com", lambda path, params: None)
+        simulator = self.start(
+            [upstream],
+            error_rate=1,
+            latency=ReplayLatency.from_string("example.com=0.5", "0"),
+        )
+        with patch("parsers.lib.simulator.sleep") as sleep:
+            response = Session().get(f"{simulator.url}/example.com/")
+        self.assertEqual(response.status_code, 503)
+        sleep.assert_called_once_with(0.5)
+
+    def test_rate_limit_per_key(self):
+        upstream = Upstream(
+            "example.com", lambda path, params: SimulatedResponse(200, b"")
+        )
+        simulator = self.start([upstream], rate_limit=(0.001, 2))
+        session = Session()
+        statuses = [
+            session.get(f"{simulator.url}/example.com/?api_key=a").status_code
+            for _ in range(3)
+        ]
+        self.assertEqual(statuses, [200, 200, 429])
+        throttled = session.get(f"{simulator.url}/example.com/?api_key=a")
+        self.assertGreater(float(throttled.headers["Retry-After"]), 0)
+        # Other keys have their own bucket.
+        response = session.get(f"{simulator.url}/example.com/?api_key=b")
+        self.assertEqual(response.status_code, 200)
+
+    def test_simulated_url(self):
+        self.assertEqual(
+            simulated_url(
+                "http://127.0.0.1:8090", "https://Api.EIA.gov/v2/data/?a=1&b=2"
+            ),
+            "http://127.0.0.1:8090/api.eia.gov/v2/data/?a=1&b=2",
+        )
+
+
+class TestSimulatedUpstreams(unittest.TestCase):
+    def session(self, scale: int = 1) -> PooledSession:
+        simulator = UpstreamSimulator(simulated_upstreams(scale)).start()
+        self.addCleanup(simulator.stop)
+        session = PooledSession()
+        install_simulator(session, simulator.url, SIMULATED_HOSTS)
+        self.addCleanup(session.close)
+        return session
+
+    def test_entsoe(self):
+        _unthrottled("ENTSOE_REFETCH_TOKEN")
+        session = self.session()
+        production = ENTSOE.fetch_production(
+            ZoneKey("DE"), session, target_datetime=TARGET_DATETIME
+        )
+        self.assertEqual(len(production), 48)
+        self.assertIn("nuclear", production[0]["production"])
+        exchanges = ENTSOE.fetch_exchange(
+            ZoneKey("DE"), ZoneKey("FR"), session, target_datetime=TARGET_DATETIME
+        )
+        self.assertTrue(any(exchange["netFlow"] for exchange in exchanges))
+
+    def test_scale(self):
+        _unthrottled("ENTSOE_REFETCH_TOKEN")
+        prices = ENTSOE.fetch_price(
+            ZoneKey("FR"), self.session(scale=3), target_datetime=TARGET_DATETIME
+        )
+        self.assertEqual(len(prices), 3 * 72)
+
+    def test_eia(self):
+        _unthrottled("EIA_KEY")
+        consumption = EIA.fetch_consumption(
+            ZoneKey("US-NW-BPAT"), self.session(), target_datetime=TARGET_DATETIME
+        )
+        self.assertEqual(len(consumption), 24)
+
+    def test_ieso(self):
+        prices = CA_ON.fetch_price(session=self.session())
+        self.assertEqual(len(prices), 24)
+
+
+if __name__ == "__main__":
+    unittest.main()
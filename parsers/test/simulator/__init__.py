@@ -0,0 +1,443 @@
+"""Synthetic upstreams served by the upstream simulator (`parsers.lib.simulator`).
+
+The payloads follow the schemas the parsers read, with made up values:
+
+- ENTSOE `/api` documents A75 (production per type), A65 (load), A44 (day
+  ahead prices) and A11 (physical flows), also behind the EU proxy,
+- EIA v2 `electricity/rto` region, fuel type and interchange data,
+- ELEXON BMRS B1620, FUELINST and INTERFUELHH reports, and the ESO datastore
+  queried alongside FUELINST,
+- IESO generator output, HOEP and intertie flow XML reports.
+
+Each payload covers the window requested, stretched backwards `scale` times
+(IESO reports cover a day, they list `scale` times more generators). Run the
+simulator with `poetry run simulate`.
+"""
+
+import json
+import math
+import re
+from collections.abc import Iterable
+from datetime import date, datetime, timedelta, timezone
+from urllib.parse import urlsplit
+
+from parsers import CA_ON, EIA, ELEXON, ENTSOE
+from parsers.lib.simulator import SimulatedResponse, Upstream
+
+ENTSOE_PSR_TYPES = [
+    "B01",
+    "B04",
+    "B05",
+    "B10",
+    "B11",
+    "B12",
+    "B14",
+    "B16",
+    "B18",
+    "B19",
+    "B20",
+]
+ENTSOE_DOCUMENTS = {
+    "A75": "GL_MarketDocument",
+    "A65": "GL_MarketDocument",
+    "A44": "Publication_MarketDocument",
+    "A11": "Publication_MarketDocument",
+}
+_ENTSOE_NAMESPACES = {
+    "GL_MarketDocument": "urn:iec62325.351:tc57wg16:451-6:generationloaddocument:3:0",
+    "Publication_MarketDocument": "urn:iec62325.351:tc57wg16:451-3:publicationdocument:7:0",
+}
+
+_XML = "application/xml"
+_CSV = "text/csv; charset=utf-8"
+_JSON = "application/json"
+
+
+def _host(url: str) -> str:
+    return urlsplit(url).netloc
+
+
+def _value(base: float, index: int, period: int = 24) -> float:
+    """A daily profile around `base`."""
+    return round(base * (1 + 0.25 * math.sin(2 * math.pi * index / period)), 2)
+
+
+def _hours(start: datetime, end: datetime, scale: int) -> tuple[datetime, int]:
+    """Returns the start and number of hours of `scale` times the window."""
+    hours = max(math.ceil((end - start).total_seconds() / 3600), 1) * scale
+    return end - timedelta(hours=hours), hours
+
+
+def _current_hour() -> datetime:
+    return datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def _entsoe_datetime(value: str) -> datetime:
+    return datetime.strptime(value, "%Y%m%d%H%M").replace(tzinfo=timezone.utc)
+
+
+def _format_entsoe_datetime(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%dT%H:%MZ")
+
+
+def _entsoe_acknowledgement(status: int, reason: str) -> SimulatedResponse:
+    body = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<Acknowledgement_MarketDocument xmlns="urn:iec62325.351:tc57wg16:451-1:'
+        'acknowledgementdocument:7:0"><Reason><code>999</code>'
+        f"<text>{reason}</text></Reason></Acknowledgement_MarketDocument>"
+    )
+    return SimulatedResponse(status, body.encode("utf-8"), _XML)
+
+
+def _entsoe_timeseries(
+    index: int,
+    domains: str,
+    start: datetime,
+    hours: int,
+    point: str,
+    base: float,
+    extra: str = "",
+) -> str:
+    interval = (
+        f"<start>{_format_entsoe_datetime(start)}</start>"
+        f"<end>{_format_entsoe_datetime(start + timedelta(hours=hours))}</end>"
+    )
+    points = "".join(
+        f"<Point><position>{position + 1}</position>"
+        f"<{point}>{_value(base, position)}</{point}></Point>"
+        for position in range(hours)
+    )
+    return (
+        f"<TimeSeries><mRID>{index}</mRID><businessType>A01</businessType>"
+        f"{domains}{extra}<curveType>A01</curveType><Period>"
+        f"<timeInterval>{interval}</timeInterval><resolution>PT60M</resolution>"
+        f"{points}</Period></TimeSeries>"
+    )
+
+
+def entsoe_document(params: dict[str, str], scale: int = 1) -> SimulatedResponse:
+    """An ENTSOE document answering the query `params`."""
+    document_type = params.get("documentType", "")
+    if document_type not in ENTSOE_DOCUMENTS:
+        return _entsoe_acknowledgement(400, "No matching data found")
+    try:
+        window_end = _entsoe_datetime(params["periodEnd"])
+        if document_type != "A44" and params.get("processType") != "A01":
+            # Only day ahead prices and forecasts are published in advance.
+            window_end = min(window_end, _current_hour())
+        start, hours = _hours(
+            _entsoe_datetime(params["periodStart"]), window_end, scale
+        )
+    except (KeyError, ValueError):
+        return _entsoe_acknowledgement(400, "Invalid periodStart or periodEnd")
+
+    def domain(tag: str, *names: str) -> str:
+        value = next((params[name] for name in names if name in params), "")
+        return f'<{tag}.mRID codingScheme="A01">{value}</{tag}.mRID>'
+
+    unit = "<quantity_Measure_Unit.name>MAW</quantity_Measure_Unit.name>"
+    if document_type == "A75":
+        psr_types = [params["psrType"]] if "psrType" in params else ENTSOE_PSR_TYPES
+        series = []
+        for psr_type in psr_types:
+            extra = f"{unit}<MktPSRType><psrType>{psr_type}</psrType></MktPSRType>"
+            zone = domain("inBiddingZone_Domain", "in_Domain")
+            series.append(
+                _entsoe_timeseries(
+                    len(series), zone, start, hours, "quantity", 3000, extra
+                )
+            )
+            if psr_type == "B10":
+                # Pumping is reported as consumption of the zone.
+                zone = domain("outBiddingZone_Domain", "in_Domain")
+                series.append(
+                    _entsoe_timeseries(
+                        len(series), zone, start, hours, "quantity", 200, extra
+                    )
+                )
+    elif document_type == "A65":
+        zone = domain("outBiddingZone_Domain", "outBiddingZone_Domain")
+        series = [_entsoe_timeseries(0, zone, start, hours, "quantity", 6000, unit)]
+    elif document_type == "A44":
+        domains = domain("in_Domain", "in_Domain") + domain("out_Domain", "out_Domain")
+        extra = (
+            "<currency_Unit.name>EUR</currency_Unit.name>"
+            "<price_Measure_Unit.name>MWH</price_Measure_Unit.name>"
+        )
+        series = [
+            _entsoe_timeseries(0, domains, start, hours, "price.amount", 90, extra)
+        ]
+    else:
+        domains = domain("in_Domain", "in_Domain") + domain("out_Domain", "out_Domain")
+        # Flows differ by direction, so that exchanges are not always null.
+        base = 100 + sum(map(ord, params.get("in_Domain", ""))) % 900
+        series = [_entsoe_timeseries(0, domains, start, hours, "quantity", base, unit)]
+
+    root = ENTSOE_DOCUMENTS[document_type]
+    interval_tag = (
+        "time_Period.timeInterval"
+        if root == "GL_MarketDocument"
+        else "period.timeInterval"
+    )
+    body = (
+        f'<?xml version="1.0" encoding="UTF-8"?>'
+        f'<{root} xmlns="{_ENTSOE_NAMESPACES[root]}">'
+        f"<mRID>simulated</mRID><revisionNumber>1</revisionNumber>"
+        f"<type>{document_type}</type>"
+        f"<createdDateTime>{_format_entsoe_datetime(window_end)}</createdDateTime>"
+        f"<{interval_tag}><start>{_format_entsoe_datetime(start)}</start>"
+        f"<end>{_format_entsoe_datetime(window_end)}</end></{interval_tag}>"
+        f"{''.join(series)}</{root}>"
+    )
+    return SimulatedResponse(200, body.encode("utf-8"), _XML)
+
+
+def _eia_hour(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m-%dT%H").replace(tzinfo=timezone.utc)
+
+
+def eia_payload(path: str, params: dict[str, str], scale: int = 1) -> SimulatedResponse:
+    """An EIA v2 response to a `region-data`, `fuel-type-data` or
+    `interchange-data` query."""
+    if "start" in params and "end" in params:
+        start, hours = _hours(
+            _eia_hour(params["start"]), _eia_hour(params["end"]), scale
+        )
+        periods = [start + timedelta(hours=hour) for hour in range(hours)]
+    else:
+        end = _current_hour()
+        length = int(params.get("length", 5000)) * scale
+        periods = [end - timedelta(hours=hour) for hour in range(length)]
+
+    if path.endswith("/region-data/data/"):
+        fields = {
+            "respondent": params.get("facets[respondent][]", ""),
+            "type": params.get("facets[type][]", ""),
+        }
+    elif path.endswith("/fuel-type-data/data/"):
+        fields = {
+            "respondent": params.get("facets[respondent][]", ""),
+            "fueltype": params.get("facets[fueltype][]", ""),
+        }
+    elif path.endswith("/interchange-data/data/"):
+        fields = {
+            "fromba": params.get("facets[fromba][]", ""),
+            "toba": params.get("facets[toba][]", ""),
+        }
+    else:
+        error = {"error": f"Invalid route {path}", "code": 404}
+        return SimulatedResponse(404, json.dumps(error).encode("utf-8"), _JSON)
+
+    data = [
+        {
+            "period": period.strftime("%Y-%m-%dT%H"),
+            **fields,
+            "value": _value(1000, period.hour),
+            "value-units": "megawatthours",
+        }
+        for period in periods
+    ]
+    payload = {
+        "response": {
+            "total": len(data),
+            "dateFormat": 'YYYY-MM-DD"T"HH24',
+            "frequency": "hourly",
+            "data": data,
+        }
+    }
+    return SimulatedResponse(200, json.dumps(payload).encode("utf-8"), _JSON)
+
+
+def _settlement_periods(start: date, days: int) -> Iterable[tuple[date, int]]:
+    for day in range(days):
+        for period in range(1, 49):
+            yield start + timedelta(days=day), period
+
+
+def _elexon_days(first: str, last: str, scale: int) -> tuple[date, int]:
+    first_day = datetime.strptime(first[:10], "%Y-%m-%d").date()
+    last_day = datetime.strptime(last[:10], "%Y-%m-%d").date()
+    days = ((last_day - first_day).days + 1) * scale
+    return last_day - timedelta(days=days - 1), days
+
+
+_B1620_TYPES = list(ELEXON.RESOURCE_TYPE_TO_FUEL)
+_B1620_HEADER = (
+    "*Document Type,Business Type,Process Type,Time Series ID,Quantity,Curve Type,"
+    "Resolution,Settlement Date,Settlement Period,Power System Resource  Type,"
+    "Active Flag,Document ID,Document RevNum"
+)
+
+
+def elexon_report(
+    path: str, params: dict[str, str], scale: int = 1
+) -> SimulatedResponse:
+    """An ELEXON BMRS report in the CSV format the parsers read."""
+    match = re.fullmatch(r"/BMRS/(\w+)/v1", path)
+    report = match.group(1) if match else None
+    if report == "B1620":
+        start, days = _elexon_days(
+            params["SettlementDate"], params["SettlementDate"], scale
+        )
+        rows = [
+            "*",
+            "*Actual Aggregated Generation Per Type (B1620) Data",
+            "*",
+            "*",
+            _B1620_HEADER,
+        ]
+        for day, period in _settlement_periods(start, days):
+            for index, resource_type in enumerate(_B1620_TYPES):
+                rows.append(
+                    f"Actual Generation Per Type,Solar generation,Realised,"
+                    f"ELX-EMFIP-AGOG-TS-{index},{_value(1500, period, 48)},Sequential "
+                    f"fixed size block,PT30M,{day:%Y-%m-%d},{period},{resource_type},"
+                    f"Y,ELX-EMFIP-AGOG-22495386,1"
+                )
+        rows.append("<EOF>")
+    elif report == "FUELINST":
+        start, days = _elexon_days(params["FromDateTime"], params["ToDateTime"], scale)
+        rows = ["HDR,FUELINST"]
+        for day, period in _settlement_periods(start, days):
+            published = datetime.combine(day, datetime.min.time()) + timedelta(
+                minutes=30 * period - 25
+            )
+            values = ",".join(
+                str(int(_value(2000, period + index, 48)))
+                for index in range(len(ELEXON.FUEL_INST_MAPPING))
+            )
+            rows.append(
+                f"FUELINST,{day:%Y%m%d},{period},{published:%Y%m%d%H%M%S},{values}"
+            )
+        rows.append(f"FTR,{len(rows) - 1}")
+    elif report == "INTERFUELHH":
+        start, days = _elexon_days(params["FromDate"], params["ToDate"], scale)
+        rows = ["HDR,INTERFUELHH"]
+        for day, period in _settlement_periods(start, days):
+            values = ",".join(
+                str(int(_value(500, period + index, 48))) for index in range(9)
+            )
+            rows.append(f"INTERFUELHH,{day:%Y%m%d},{period},{values}")
+        rows.append(f"FTR,{len(rows) - 1}")
+    else:
+        return SimulatedResponse(
+            404, b"<httpCode>404</httpCode><errorType>Not Found</errorType>"
+        )
+    # The parsers drop the last line, without a trailing newline.
+    return SimulatedResponse(200, "\n".join(rows).encode("utf-8"), _CSV)
+
+
+def eso_payload(path: str, params: dict[str, str], scale: int = 1) -> SimulatedResponse:
+    """The ESO datastore records of embedded generation and pumping queried
+    alongside the FUELINST report."""
+    if path.endswith("datapackage.json"):
+        resources = [
+            {"name": f"historic_demand_data_{year}", "id": f"simulated-{year}"}
+            for year in range(2009, date.today().year + 1)
+        ]
+        return SimulatedResponse(
+            200, json.dumps({"resources": resources}).encode("utf-8"), _JSON
+        )
+    match = re.search(
+        r"BETWEEN '(\d{4}-\d{2}-\d{2})' AND '(\d{4}-\d{2}-\d{2})'",
+        params.get("sql", ""),
+    )
+    if match is None:
+        return SimulatedResponse(409, b'{"success": false}', _JSON)
+    start, days = _elexon_days(match.group(1), match.group(2), scale)
+    records = [
+        {
+            "SETTLEMENT_DATE": f"{day:%Y-%m-%d}",
+            "SETTLEMENT_PERIOD": period,
+            "EMBEDDED_WIND_GENERATION": int(_value(1500, period, 48)),
+            "EMBEDDED_SOLAR_GENERATION": int(_value(800, period, 48)),
+            "PUMP_STORAGE_PUMPING": int(_value(100, period, 48)),
+        }
+        for day, period in _settlement_periods(start, days)
+    ]
+    payload = {"success": True, "result": {"records": records}}
+    return SimulatedResponse(200, json.dumps(payload).encode("utf-8"), _JSON)
+
+
+def _ieso_document(body: str) -> bytes:
+    namespace = CA_ON.XML_NS_TEXT.strip("{}")
+    return (
+        f'<?xml version="1.0" encoding="UTF-8"?><IMODocument xmlns="{namespace}">'
+        f"<IMODocBody>{body}</IMODocBody></IMODocument>"
+    ).encode()
+
+
+def ieso_report(path: str, params: dict[str, str], scale: int = 1) -> SimulatedResponse:
+    """An IESO XML report of a day: generator output, HOEP or intertie flows."""
+    if "/GenOutputCapability/" in path:
+        generators = []
+        for index in range(len(CA_ON.MAP_GENERATION) * 4 * scale):
+            fuel = list(CA_ON.MAP_GENERATION)[index % len(CA_ON.MAP_GENERATION)]
+            outputs = "".join(
+                f"<Output><Hour>{hour}</Hour>"
+                f"<EnergyMW>{_value(300, hour + index)}</EnergyMW></Output>"
+                for hour in range(1, 25)
+            )
+            generators.append(
+                f"<Generator><GeneratorName>SIMULATED-{index}</GeneratorName>"
+                f"<FuelType>{fuel}</FuelType><Outputs>{outputs}</Outputs></Generator>"
+            )
+        body = f"<Generators>{''.join(generators)}</Generators>"
+    elif "/DispUnconsHOEP/" in path:
+        prices = "".join(
+            f"<HOEP><Hour>{hour}</Hour><Price>{_value(30, hour)}</Price></HOEP>"
+            for hour in range(1, 25)
+        )
+        body = f"<HOEPs>{prices}</HOEPs>"
+    elif "/IntertieScheduleFlow/" in path:
+        zones = []
+        for name in CA_ON.MAP_EXCHANGE:
+            actuals = "".join(
+                f"<Actual><Hour>{hour}</Hour><Interval>{interval}</Interval>"
+                f"<Flow>{_value(-150, hour)}</Flow></Actual>"
+                for hour in range(1, 25)
+                for interval in range(1, 13)
+            )
+            zones.append(
+                f"<IntertieZone><IntertieZoneName>{name}</IntertieZoneName>"
+                f"<Actuals>{actuals}</Actuals></IntertieZone>"
+            )
+        body = "".join(zones)
+    else:
+        return SimulatedResponse(404, b"Not Found", "text/html")
+    return SimulatedResponse(200, _ieso_document(body), _XML)
+
+
+def simulated_upstreams(scale: int = 1) -> list[Upstream]:
+    assert scale >= 1, "scale must be at least 1"
+    return [
+        Upstream(
+            _host(ENTSOE.ENTSOE_HOST),
+            lambda path, params: entsoe_document(params, scale),
+            aliases=(_host(ENTSOE.ENTSOE_EU_PROXY_ENDPOINT),),
+            error=_entsoe_acknowledgement(503, "Service temporarily unavailable"),
+        ),
+        Upstream(
+            _host(EIA.BASE_URL), lambda path, params: eia_payload(path, params, scale)
+        ),
+        Upstream(
+            _host(ELEXON.ELEXON_ENDPOINT),
+            lambda path, params: elexon_report(path, params, scale),
+        ),
+        Upstream(
+            _host(ELEXON.ESO_NATIONAL_GRID_ENDPOINT),
+            lambda path, params: eso_payload(path, params, scale),
+            aliases=("data.nationalgrideso.com",),
+        ),
+        Upstream(
+            _host(CA_ON.PRODUCTION_URL),
+            lambda path, params: ieso_report(path, params, scale),
+        ),
+    ]
+
+
+# Hosts redirected to the simulator, see `install_simulator`.
+SIMULATED_HOSTS = [
+    host for upstream in simulated_upstreams() for host in upstream.hosts
+]
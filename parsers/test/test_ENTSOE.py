@@ -8,8 +8,10 @@ from unittest.mock import patch
 from requests import Session
 from requests_mock import ANY, GET, Adapter
 
+from electricitymap.contrib.lib.models.events import EventSourceType
 from electricitymap.contrib.lib.types import ZoneKey
 from parsers import ENTSOE
+from parsers.lib.exceptions import ParserException
 
 
 class TestENTSOE(unittest.TestCase):
@@ -161,6 +163,166 @@ class TestFetchProduction(TestENTSOE):
                 mock_warning.assert_called()
 
 
+class TestFetchProductionPerUnits(TestENTSOE):
+    def setUp(self) -> None:
+        super().setUp()
+        os.environ["ENTSOE_REFETCH_TOKEN"] = "token"
+        self.addCleanup(ENTSOE._empty_psr_types.clear)
+        # Psr types without any unit are answered with an acknowledgement.
+        self.adapter.register_uri(
+            GET,
+            ANY,
+            status_code=400,
+            text="<Acknowledgement_MarketDocument><Reason><text>No matching data found</text></Reason></Acknowledgement_MarketDocument>",
+        )
+        with open(
+            "parsers/test/mocks/ENTSOE/FI_production_per_units.xml", "rb"
+        ) as production_per_units_data:
+            self.adapter.register_uri(
+                GET,
+                ANY,
+                content=production_per_units_data.read(),
+                additional_matcher=lambda request: "psrType=B14" in request.url,
+            )
+
+    def test_fetch_production_per_units(self):
+        target_datetime = datetime(2023, 5, 6, tzinfo=timezone.utc)
+        production = ENTSOE.fetch_production_per_units(
+            ZoneKey("FI"), self.session, target_datetime
+        )
+        self.assertEqual(len(production), 2)
+        self.assertEqual(production[0]["unitName"], "Loviisa 1 G11")
+        self.assertEqual(production[0]["zoneKey"], "FI")
+        self.assertEqual(production[0]["productionType"], "nuclear")
+        self.assertEqual(production[0]["production"], 252)
+        self.assertEqual(production[0]["source"], "entsoe.eu")
+        psr_types = len(ENTSOE.ENTSOE_PARAMETER_DESC)
+        self.assertEqual(self.adapter.call_count, psr_types)
+
+        # Psr types found without any unit are not queried again.
+        ENTSOE.fetch_production_per_units(ZoneKey("FI"), self.session, target_datetime)
+        self.assertEqual(self.adapter.call_count, psr_types + 1)
+        # Unless for another year.
+        ENTSOE.fetch_production_per_units(
+            ZoneKey("FI"), self.session, datetime(2022, 5, 6, tzinfo=timezone.utc)
+        )
+        self.assertEqual(self.adapter.call_count, 2 * psr_types + 1)
+
+    def test_failed_psr_type(self):
+        self.adapter.register_uri(
+            GET,
+            ANY,
+            status_code=400,
+            additional_matcher=lambda request: "psrType=B01" in request.url,
+        )
+        with self.assertRaisesRegex(ParserException, "B01"):
+            ENTSOE.fetch_production_per_units(
+                ZoneKey("FI"), self.session, datetime(2023, 5, 6, tzinfo=timezone.utc)
+            )
+
+
+class TestFetchExchange(TestENTSOE):
+    def register_exchanges(self):
+        for direction, in_domain in [
+            ("import", ENTSOE.ENTSOE_DOMAIN_MAPPINGS["DE"]),
+            ("export", ENTSOE.ENTSOE_DOMAIN_MAPPINGS["FR"]),
+        ]:
+            with open(
+                f"parsers/test/mocks/ENTSOE/DE_FR_exchange_{direction}.xml", "rb"
+            ) as exchange_data:
+                self.adapter.register_uri(
+                    GET,
+                    ANY,
+                    content=exchange_data.read(),
+                    additional_matcher=lambda request, in_domain=in_domain: (
+                        f"in_Domain={in_domain}" in request.url
+                    ),
+                )
+
+    def test_fetch_exchange(self):
+        self.register_exchanges()
+        exchanges = ENTSOE.fetch_exchange(ZoneKey("DE"), ZoneKey("FR"), self.session)
+        self.assertEqual(len(exchanges), 8)
+        self.assertEqual(
+            [exchange["datetime"] for exchange in exchanges],
+            sorted(exchange["datetime"] for exchange in exchanges),
+        )
+        self.assertEqual(exchanges[0]["sortedZoneKeys"], "DE->FR")
+        self.assertEqual(exchanges[0]["source"], "entsoe.eu")
+        self.assertEqual(
+            exchanges[0]["datetime"], datetime(2023, 5, 6, 0, 0, tzinfo=timezone.utc)
+        )
+        # Both A05 series are summed, the A01 series is ignored and the
+        # export is subtracted.
+        self.assertEqual(exchanges[0]["netFlow"], -(100 + 10 - 300))
+        self.assertEqual(exchanges[1]["netFlow"], -20)
+        self.assertEqual(exchanges[4]["netFlow"], -(200 + 50 - 50))
+
+    def test_fetch_exchange_forecast(self):
+        self.register_exchanges()
+        exchanges = ENTSOE.fetch_exchange_forecast(
+            ZoneKey("DE"), ZoneKey("FR"), self.session
+        )
+        self.assertEqual(len(exchanges), 8)
+        self.assertEqual(exchanges[0]["sourceType"], EventSourceType.forecasted)
+
+    def test_no_exchange_data(self):
+        self.adapter.register_uri(GET, ANY, content=b"")
+        with self.assertRaises(ParserException):
+            ENTSOE.fetch_exchange(ZoneKey("DE"), ZoneKey("FR"), self.session)
+
+
+class TestFetchForAllZones(TestENTSOE):
+    def test_fetch_price_for_all_zones(self):
+        with open("parsers/test/mocks/ENTSOE/FR_prices.xml", "rb") as price_fr_data:
+            self.adapter.register_uri(GET, ANY, content=price_fr_data.read())
+        prices = ENTSOE.fetch_price_for_all_zones(
+            self.session, zone_keys=["DE", "LU", "FR", "not-a-zone"]
+        )
+        # DE and LU share the same price domain, which is queried once.
+        self.assertEqual(self.adapter.call_count, 2)
+        for zone_key in ["DE", "LU", "FR"]:
+            self.assertEqual(
+                prices[zone_key], ENTSOE.fetch_price(ZoneKey(zone_key), self.session)
+            )
+        self.assertEqual(prices["DE"][0]["zoneKey"], "DE")
+        # A failing zone doesn't fail the others.
+        self.assertIsInstance(prices["not-a-zone"], KeyError)
+
+    def test_fetch_production_for_all_zones(self):
+        with open(
+            "parsers/test/mocks/ENTSOE/NO-NO5_production.xml", "rb"
+        ) as production_no_data:
+            self.adapter.register_uri(GET, ANY, content=production_no_data.read())
+        production = ENTSOE.fetch_production_for_all_zones(
+            self.session, zone_keys=["NO-NO5"]
+        )
+        self.assertEqual(
+            production,
+            {"NO-NO5": ENTSOE.fetch_production(ZoneKey("NO-NO5"), self.session)},
+        )
+
+
+class TestQueryENTSOE(TestENTSOE):
+    def test_revoked_token_fails_over(self):
+        os.environ["ENTSOE_TOKEN"] = "revoked-token,valid-token"
+        tokens = []
+        with open("parsers/test/mocks/ENTSOE/FR_prices.xml", "rb") as price_fr_data:
+            content = price_fr_data.read()
+
+        def respond(request, context):
+            token = request.qs["securitytoken"][0]
+            tokens.append(token)
+            context.status_code = 401 if token == "revoked-token" else 200
+            return content if context.status_code == 200 else b"Unauthorized"
+
+        self.adapter.register_uri(GET, ANY, content=respond)
+        for _ in range(3):
+            self.assertEqual(len(ENTSOE.fetch_price(ZoneKey("FR"), self.session)), 48)
+        self.assertLessEqual(tokens.count("revoked-token"), 1)
+        self.assertEqual(tokens.count("valid-token"), 3)
+
+
 class TestENTSOE_Refetch(unittest.TestCase):
     def test_refetch_token(self) -> None:
         token = mock.Mock(return_value="token")
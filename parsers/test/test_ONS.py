@@ -134,5 +134,37 @@ class RegionTestcase(unittest.TestCase):
         self.assertEqual(data["source"], "ons.org.br")
 
 
+class ForAllZonesTestcase(unittest.TestCase):
+    """
+    Tests for the fetch_*_for_all_zones batch entry points.
+    """
+
+    def setUp(self):
+        with open("parsers/test/mocks/ONS/BR.json") as f:
+            self.fake_data = json.load(f)
+
+    def test_exchange_keys(self):
+        with patch("parsers.ONS.get_data", return_value=self.fake_data) as gd:
+            data = ONS.fetch_exchange_for_all_zones()
+            gd.assert_called_once()
+            self.assertEqual(data["AR->BR-S"], ONS.fetch_exchange("AR", "BR-S"))
+        # BR-S->UY is fetched by the UY parser
+        self.assertNotIn("BR-S->UY", data)
+
+    def test_zone_failing_to_parse(self):
+        del self.fake_data["sul"]
+        with patch("parsers.ONS.get_data", return_value=self.fake_data):
+            data = ONS.fetch_production_for_all_zones()
+        self.assertIsInstance(data["BR-S"], KeyError)
+        self.assertEqual(data["BR-CS"][0]["zoneKey"], "BR-CS")
+
+    def test_failed_download(self):
+        error = ConnectionError()
+        with patch("parsers.ONS.get_data", side_effect=error):
+            data = ONS.fetch_production_for_all_zones()
+        self.assertEqual(set(data), set(ONS.REGIONS))
+        self.assertTrue(all(events is error for events in data.values()))
+
+
 if __name__ == "__main__":
     unittest.main()
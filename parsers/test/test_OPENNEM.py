@@ -1,9 +1,14 @@
 import unittest
+from datetime import datetime, timezone
+from logging import getLogger
+from unittest.mock import patch
 
 import arrow
 import numpy as np
 import pandas as pd
+from requests import HTTPError
 
+from parsers import OPENNEM
 from parsers.OPENNEM import filter_production_objs, process_solar_rooftop, sum_vector
 
 
@@ -94,5 +99,40 @@ class TestOPENNEM(unittest.TestCase):
         assert len(filtered_objs) == 1
 
 
+class TestFetchForAllZones(unittest.TestCase):
+    @staticmethod
+    def _fetch(zone_key, session, target_datetime, logger, datasets):
+        return datasets
+
+    def _fetch_for_all_zones(self, keys, target_datetime=None):
+        return OPENNEM._fetch_for_all_zones(
+            self._fetch, keys, False, None, target_datetime, getLogger(__name__)
+        )
+
+    def test_failed_download_only_fails_its_zones(self):
+        def fetch_datasets(url, session, logger):
+            if "/WEM/" in url:
+                raise HTTPError("503 Server Error")
+            return [url]
+
+        with patch("parsers.OPENNEM._fetch_datasets", side_effect=fetch_datasets):
+            results = self._fetch_for_all_zones(
+                ["AU-WA", "AU-NSW", "AU-VIC"],
+                datetime(2023, 5, 8, tzinfo=timezone.utc),
+            )
+        self.assertIsInstance(results["AU-WA"], HTTPError)
+        self.assertIn("/NEM/NSW1", results["AU-NSW"][0])
+        self.assertIn("/NEM/VIC1", results["AU-VIC"][0])
+
+    def test_shared_download_fails_each_zone(self):
+        error = HTTPError("503 Server Error")
+        with patch(
+            "parsers.OPENNEM._fetch_datasets", side_effect=error
+        ) as fetch_datasets:
+            results = self._fetch_for_all_zones(["AU-NSW", "AU-VIC"])
+        self.assertEqual(results, {"AU-NSW": error, "AU-VIC": error})
+        fetch_datasets.assert_called_once()
+
+
 if __name__ == "__main__":
     unittest.main()
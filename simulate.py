@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Usage: poetry run simulate --port 8090 --latency 0.2:0.1 --error-rate 0.05 --rate-limit 6:40
+
+Then run fetchall with UPSTREAM_SIMULATOR_URL=http://127.0.0.1:8090
+"""
+
+import click
+
+from parsers.lib.cassette import ReplayLatency
+from parsers.lib.simulator import UpstreamSimulator
+from parsers.test.simulator import simulated_upstreams
+
+
+def _rate_limit(ctx, param, value):
+    if not value:
+        return None
+    try:
+        rate, _, burst = value.partition(":")
+        return float(rate), float(burst or rate)
+    except ValueError:
+        raise click.BadParameter("expected RATE or RATE:BURST, e.g. 6:40")
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", default=8090, show_default=True)
+@click.option(
+    "--scale",
+    default=1,
+    show_default=True,
+    help="Payloads hold this many times the data of the window requested",
+)
+@click.option(
+    "--latency",
+    default="0",
+    show_default=True,
+    help="Seconds each response is delayed by, e.g. 0.2:0.1 for 0.2s +/- 0.1s",
+)
+@click.option(
+    "--host-latency",
+    default=None,
+    help="Delays of some upstream hosts, e.g. api.eia.gov=0.5:0.2",
+)
+@click.option(
+    "--error-rate",
+    default=0.0,
+    show_default=True,
+    help="Share of the requests failing with a 503",
+)
+@click.option(
+    "--rate-limit",
+    default=None,
+    callback=_rate_limit,
+    help="Requests per second (and burst) allowed per API key and host, e.g. 6:40",
+)
+@click.option("--seed", default=0, show_default=True)
+def simulate(host, port, scale, latency, host_latency, error_rate, rate_limit, seed):
+    """Serves synthetic ENTSOE, EIA, ELEXON and IESO payloads locally, to load
+    test parsers without reaching the upstreams."""
+    simulator = UpstreamSimulator(
+        simulated_upstreams(scale),
+        latency=ReplayLatency.from_string(host_latency, latency),
+        error_rate=error_rate,
+        rate_limit=rate_limit,
+        host=host,
+        port=port,
+        seed=seed,
+    )
+    click.echo(f"Simulating {', '.join(simulator.upstreams)} on {simulator.url}")
+    try:
+        simulator.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for (upstream, status), count in sorted(simulator.stats.items()):
+            click.echo(f"{upstream} {status}: {count}")
+
+
+if __name__ == "__main__":
+    # pylint: disable=no-value-for-parameter
+    simulate()
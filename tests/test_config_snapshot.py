@@ -0,0 +1,96 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from electricitymap.contrib import config
+from electricitymap.contrib.config import _resolve_config
+from electricitymap.contrib.config.snapshot import (
+    config_hash,
+    load_snapshot,
+    read_snapshot,
+    snapshot_dir,
+    write_snapshot,
+)
+
+CONFIG_DIR = Path(__file__).parent.parent.joinpath("config").resolve()
+
+
+class ConfigSnapshotTestcase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        patcher = patch.dict(os.environ, {"CONFIG_SNAPSHOT_DIR": str(self.tmp)})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_snapshot_matches_yaml(self):
+        resolved = _resolve_config(CONFIG_DIR)
+        key = config_hash(CONFIG_DIR)
+        write_snapshot(self.tmp / "config.pickle", key, resolved)
+        snapshot = read_snapshot(self.tmp / "config.pickle", key)
+        self.assertEqual(snapshot, resolved)
+        self.assertEqual(snapshot["exchanges"], config.EXCHANGES_CONFIG)
+        self.assertEqual(snapshot["neighbours"], config.ZONE_NEIGHBOURS)
+        self.assertEqual(snapshot["co2eq_parameters"][0], config.co2eq_parameters_all)
+        self.assertNotIn("emissionFactors", snapshot["zones"]["DE"])
+
+    def test_stale_snapshot_is_rebuilt(self):
+        builds = []
+
+        def build():
+            builds.append(1)
+            return {"built": len(builds)}
+
+        self.assertEqual(load_snapshot("test", CONFIG_DIR, "a", build), {"built": 1})
+        self.assertEqual(load_snapshot("test", CONFIG_DIR, "a", build), {"built": 1})
+        self.assertEqual(load_snapshot("test", CONFIG_DIR, "b", build), {"built": 2})
+        self.assertEqual(len(builds), 2)
+
+    def test_unreadable_snapshot_is_rebuilt(self):
+        (self.tmp / "test.pickle").write_bytes(b"not a pickle")
+        with self.assertLogs("electricitymap.contrib.config.snapshot", "WARNING"):
+            self.assertEqual(load_snapshot("test", CONFIG_DIR, "a", lambda: 1), 1)
+        self.assertEqual(read_snapshot(self.tmp / "test.pickle", "a"), 1)
+
+    def test_disabled(self):
+        with patch.dict(os.environ, {"CONFIG_SNAPSHOT_DIR": ""}):
+            self.assertEqual(load_snapshot("test", CONFIG_DIR, "a", lambda: 1), 1)
+        self.assertEqual(list(self.tmp.iterdir()), [])
+
+    def test_hash_follows_config_files(self):
+        config_dir = self.tmp / "config"
+        for name in ["zones", "exchanges"]:
+            config_dir.joinpath(name).mkdir(parents=True)
+        config_dir.joinpath("defaults.yaml").write_text("a: 1\n")
+        config_dir.joinpath("zones", "DE.yaml").write_text("b: 1\n")
+        zone = config_dir.joinpath("zones", "DE.yaml")
+        os.utime(zone, ns=(1_000_000_000, 1_000_000_000))
+        key = config_hash(config_dir)
+        self.assertEqual(config_hash(config_dir), key)
+        # Files are told apart by their size and modification time.
+        os.utime(zone, ns=(2_000_000_000, 2_000_000_000))
+        self.assertNotEqual(config_hash(config_dir), key)
+        os.utime(zone, ns=(1_000_000_000, 1_000_000_000))
+        self.assertEqual(config_hash(config_dir), key)
+        zone.write_text("b: 12\n")
+        os.utime(zone, ns=(1_000_000_000, 1_000_000_000))
+        self.assertNotEqual(config_hash(config_dir), key)
+        zone.rename(config_dir.joinpath("exchanges", "DE.yaml"))
+        self.assertNotEqual(config_hash(config_dir), key)
+
+    def test_default_snapshot_dir(self):
+        cache = self.tmp / "cache"
+        with patch.dict(os.environ, {"XDG_CACHE_HOME": str(cache)}):
+            del os.environ["CONFIG_SNAPSHOT_DIR"]
+            directory = snapshot_dir(CONFIG_DIR)
+            self.assertTrue(directory.is_relative_to(cache))
+            self.assertNotEqual(directory, snapshot_dir(self.tmp / "config"))
+            load_snapshot("test", CONFIG_DIR, "a", lambda: 1)
+        self.assertTrue(directory.joinpath("test.pickle").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()